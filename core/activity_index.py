@@ -0,0 +1,310 @@
+"""
+Preservr Data Visualizations - Activity Index
+
+Description: Inverted index from username to everything the archive records about
+             that account: the posts and stories of theirs the user liked, the
+             comments on their posts, and when they followed or were followed. For
+             each dataset the index keeps compact arrays of record byte offsets,
+             lengths and timestamps, sorted by username and then time, plus one
+             start position per username, so an account's records are one slice.
+             The index is saved in OUTPUT_FOLDER/activity_index as .npy files that
+             are memory-mapped on load, with the sizes and modification times of the
+             files it was built from; a changed file makes it stale and it is rebuilt.
+             A lookup reads only the account's own records, by seeking to them.
+Input: An Instagram archive folder and a username
+Output: The account's activity per dataset, with timestamps and the raw records
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+import numpy as np
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_numbered_files, from_latin1, iter_record_spans, read_record_at
+from core.progress import ProgressReporter
+from core.registry import DATASETS, OUTPUT_FOLDER_NAME
+from core.schemas import get_schema
+from core.usernames import UsernameDictionary
+from core.window import record_timestamps
+
+INDEX_DIR_NAME = "activity_index"
+INDEX_VERSION = 1
+# Per-record arrays saved for each dataset, and the start of each username's slice.
+RECORD_FIELDS = ("offsets", "lengths", "timestamps", "files")
+
+ActivityEntry = namedtuple("ActivityEntry", ["dataset", "timestamp", "path", "offset", "length"])
+
+
+_post_href = get_schema("liked_posts").getter("href")
+_comment_text = get_schema("post_comments").getter("comment")
+
+# Dataset key -> (schema field naming the account of a record, description of a record).
+INDEXED_DATASETS = {
+    "liked_posts": ("owner", lambda record: "Liked their post " + str(_post_href(record) or "").strip()),
+    "story_likes": ("owner", lambda record: "Liked their story"),
+    "post_comments": ("owner", lambda record: "Commented: " + str(_comment_text(record) or "")),
+    "followers_1": ("username", lambda record: "Started following you"),
+    "following": ("username", lambda record: "You started following them"),
+}
+
+DATASET_LABELS = {
+    "liked_posts": "Post likes",
+    "story_likes": "Story likes",
+    "post_comments": "Comments",
+    "followers_1": "Follows you",
+    "following": "You follow",
+}
+
+
+def index_folder(folder_path):
+    return os.path.join(folder_path, OUTPUT_FOLDER_NAME, INDEX_DIR_NAME)
+
+
+def dataset_files(folder_path, paths):
+    """{dataset: [file paths]} for the indexed datasets present; comments include every shard."""
+    files = {}
+    for dataset in INDEXED_DATASETS:
+        if not paths.get(dataset):
+            continue
+        if dataset == "post_comments":
+            # post_comments_1.json -> every post_comments_N.json shard.
+            files[dataset] = find_numbered_files(folder_path, DATASETS[dataset].rsplit("_", 1)[0])
+        else:
+            files[dataset] = [paths[dataset]]
+    return files
+
+
+def _signature(folder_path, files):
+    """Relative path, size and modification time of every indexed file."""
+    signature = {}
+    for dataset, paths in files.items():
+        signature[dataset] = []
+        for path in paths:
+            stat = os.stat(path)
+            signature[dataset].append([os.path.relpath(path, folder_path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+class ActivityIndex:
+    """A saved or freshly built index; look accounts up with entries() and record()."""
+
+    def __init__(self, folder_path, names, datasets, files, signature=None):
+        self.folder_path = folder_path
+        # Sorted usernames; a username's position is its ID in the index.
+        self.names = names
+        # Dataset -> {"starts": array of len(names) + 1, and one array per RECORD_FIELDS}.
+        self.datasets = datasets
+        # Dataset -> relative paths of its files, indexed by the "files" array.
+        self.files = files
+        # Dataset -> [relative path, size, mtime_ns] of the files the index was built from.
+        self.signature = signature
+        self._handles = {}
+
+    @classmethod
+    def build(cls, folder_path, paths, reporter=None):
+        """Scan every indexed dataset once and build the index in memory."""
+        reporter = reporter or ProgressReporter(enabled=False)
+        files = dataset_files(folder_path, paths)
+        usernames = UsernameDictionary()
+        columns = {}
+        for dataset, dataset_paths in files.items():
+            schema = get_schema(dataset)
+            username_of = schema.getter(INDEXED_DATASETS[dataset][0])
+            names, offsets, lengths, stamps, file_ids = [], [], [], [], []
+            for file_id, path in enumerate(dataset_paths):
+                for offset, length, record in iter_record_spans(path, schema.records_key, reporter):
+                    if not isinstance(record, dict):
+                        continue
+                    name = username_of(record)
+                    if not name:
+                        continue
+                    names.append(from_latin1(name))
+                    offsets.append(offset)
+                    lengths.append(length)
+                    record_stamps = record_timestamps(record)
+                    stamps.append(min(record_stamps) if record_stamps else -1)
+                    file_ids.append(file_id)
+            columns[dataset] = (usernames.intern_many(names), np.array(offsets, dtype=np.int64),
+                                np.array(lengths, dtype=np.int32), np.array(stamps, dtype=np.int64),
+                                np.array(file_ids, dtype=np.int16))
+
+        # Renumber usernames in sorted order so lookups are a binary search.
+        order = sorted(range(len(usernames)), key=usernames.names.__getitem__)
+        names = [usernames.names[i] for i in order]
+        renumber = np.empty(len(order), dtype=np.int32)
+        renumber[order] = np.arange(len(order), dtype=np.int32)
+
+        datasets = {}
+        for dataset, (ids, offsets, lengths, stamps, file_ids) in columns.items():
+            ids = renumber[ids] if len(ids) else ids
+            ranked = np.lexsort((stamps, ids))
+            ids = ids[ranked]
+            datasets[dataset] = {
+                "starts": np.searchsorted(ids, np.arange(len(names) + 1)).astype(np.int64),
+                "offsets": offsets[ranked], "lengths": lengths[ranked],
+                "timestamps": stamps[ranked], "files": file_ids[ranked],
+            }
+        relative = {dataset: [os.path.relpath(path, folder_path) for path in dataset_paths]
+                    for dataset, dataset_paths in files.items()}
+        return cls(folder_path, names, datasets, relative, _signature(folder_path, files))
+
+    def save(self):
+        """Write the index to OUTPUT_FOLDER/activity_index."""
+        directory = index_folder(self.folder_path)
+        os.makedirs(directory, exist_ok=True)
+        for dataset, arrays in self.datasets.items():
+            for field, array in arrays.items():
+                np.save(os.path.join(directory, f"{dataset}.{field}.npy"), array)
+        with open(os.path.join(directory, "names.json"), "w", encoding="utf-8") as f:
+            json.dump(self.names, f, ensure_ascii=False)
+        # The manifest goes last: an index without one is never loaded.
+        manifest = {"version": INDEX_VERSION, "files": self.files, "signature": self.signature}
+        with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def load(cls, folder_path, paths):
+        """Load the saved index, or return None if there is none or its files changed since."""
+        directory = index_folder(folder_path)
+        try:
+            with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if (manifest.get("version") != INDEX_VERSION
+                    or manifest["signature"] != _signature(folder_path, dataset_files(folder_path, paths))):
+                return None
+            with open(os.path.join(directory, "names.json"), encoding="utf-8") as f:
+                names = json.load(f)
+            datasets = {
+                dataset: {field: np.load(os.path.join(directory, f"{dataset}.{field}.npy"), mmap_mode="r")
+                          for field in ("starts",) + RECORD_FIELDS}
+                for dataset in manifest["files"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(folder_path, names, datasets, manifest["files"], manifest["signature"])
+
+    @classmethod
+    def open(cls, folder_path, paths=None, reporter=None):
+        """Load the saved index, building and saving it first if it is missing or stale."""
+        if paths is None:
+            from core.scheduler import locate_datasets
+            paths = locate_datasets(folder_path, reporter)
+        index = cls.load(folder_path, paths)
+        if index is None:
+            index = cls.build(folder_path, paths, reporter)
+            index.save()
+        return index
+
+    def user_id(self, username):
+        """Position of a username in the index, or None if it never appears."""
+        position = bisect_left(self.names, username)
+        if position < len(self.names) and self.names[position] == username:
+            return position
+        return None
+
+    def _slice(self, dataset, user_id):
+        starts = self.datasets[dataset]["starts"]
+        return int(starts[user_id]), int(starts[user_id + 1])
+
+    def counts(self, username):
+        """{dataset: number of records} for an account; empty if it never appears."""
+        user_id = self.user_id(username)
+        if user_id is None:
+            return {}
+        counts = {}
+        for dataset in self.datasets:
+            start, stop = self._slice(dataset, user_id)
+            if stop > start:
+                counts[dataset] = stop - start
+        return counts
+
+    def entries(self, username, datasets=None, window=None):
+        """An account's ActivityEntries across datasets (default: all), oldest first."""
+        user_id = self.user_id(username)
+        if user_id is None:
+            return []
+        entries = []
+        for dataset in datasets or self.datasets:
+            if dataset not in self.datasets:
+                continue
+            start, stop = self._slice(dataset, user_id)
+            # One copy per field; indexing a memory-mapped array element by element is slow.
+            columns = {field: np.asarray(self.datasets[dataset][field][start:stop]) for field in RECORD_FIELDS}
+            stamps = columns["timestamps"]
+            keep = np.ones(len(stamps), dtype=bool)
+            if window is not None and window.since is not None:
+                keep &= stamps >= window.since
+            if window is not None and window.until is not None:
+                keep &= stamps < window.until
+            files = self.files[dataset]
+            entries.extend(
+                ActivityEntry(dataset, stamp, files[file_id], offset, length)
+                for stamp, file_id, offset, length in zip(*(columns[field][keep].tolist() for field in
+                                                            ("timestamps", "files", "offsets", "lengths"))))
+        entries.sort(key=lambda entry: entry.timestamp)
+        return entries
+
+    def record(self, entry):
+        """Read an entry's record from its archive file."""
+        handle = self._handles.get(entry.path)
+        if handle is None:
+            handle = self._handles[entry.path] = open(os.path.join(self.folder_path, entry.path), "rb")
+        return read_record_at(handle, entry.offset, entry.length)
+
+    def describe(self, entry):
+        """One line of text for an entry, e.g. for a list of an account's activity."""
+        when = time.strftime("%Y-%m-%d %H:%M", time.gmtime(entry.timestamp)) if entry.timestamp >= 0 else "unknown"
+        try:
+            detail = INDEXED_DATASETS[entry.dataset][1](self.record(entry))
+        except (OSError, ValueError, KeyError, AttributeError):
+            detail = "(record unavailable)"
+        return f"{when}  {detail}"
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+
+def main():
+    from core.window import TimeWindow
+
+    parser = argparse.ArgumentParser(description="Show everything an archive records about one account.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("username", nargs="?", help="account to look up (default: only build the index)")
+    parser.add_argument("--since", metavar="DATE", help="only activity from this date on (see pipeline.py)")
+    parser.add_argument("--until", metavar="DATE", help="only activity up to and including this date")
+    args = parser.parse_args()
+    try:
+        window = TimeWindow.parse(args.since, args.until)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    index = ActivityIndex.open(args.folder_path, reporter=ProgressReporter.from_env())
+    print(f"Index of {len(index.names)} accounts ready in {time.perf_counter() - started:.2f}s")
+    if not args.username:
+        return
+
+    started = time.perf_counter()
+    entries = index.entries(args.username.lstrip("@"), window=window)
+    lines = [f"[{DATASET_LABELS[entry.dataset]}] {index.describe(entry)}" for entry in entries]
+    elapsed = time.perf_counter() - started
+    for line in lines:
+        print(line)
+    print(f"{len(entries)} records for {args.username} in {elapsed * 1000:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
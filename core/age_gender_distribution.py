@@ -11,18 +11,17 @@ Date: 2025-04-16
 
 import os
 import sys
-import json
-import matplotlib.pyplot as plt
 import numpy as np
 
-def find_file_in_subdirectories(folder_path, filename):
-    """
-    Recursively search for the specified file in subdirectories.
-    """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_file_in_subdirectories, load_json
+from core.encoders import finish_charts
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.schemas import get_schema
 
 def parse_percentage_string(raw_str):
     """
@@ -34,38 +33,26 @@ def parse_percentage_string(raw_str):
         for age, percent in [segment.split(':') for segment in raw_str.split(',')]
     }
 
-def generate_age_distribution_chart(folder_path):
+def extract_age_gender_counts(data):
     """
-    Generate a grouped bar chart of follower age distribution by gender.
-    Saves it in OUTPUT_FOLDER inside the provided folder_path.
+    Extract follower counts per age group for men and women from parsed audience_insights.json.
+    Returns (age_groups, men_counts, women_counts).
     """
-    # Locate the JSON file
-    input_path = find_file_in_subdirectories(folder_path, "audience_insights.json")
-    if input_path is None:
-        print(f"Error: audience_insights.json not found in {folder_path} or its subdirectories")
-        return
-
-    # Define OUTPUT_FOLDER path
-    output_folder = os.path.join(folder_path, "OUTPUT_FOLDER")
-    os.makedirs(output_folder, exist_ok=True)  # Create folder if it doesn't exist
-
-    # Define output file path
-    output_path = os.path.join(output_folder, "age_gender_distribution.png")
-
-    # Load JSON data
-    with open(input_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-
-    string_data = data["organic_insights_audience"][0]["string_map_data"]
+    schema = get_schema("audience_insights")
+    record = schema.records(data)[0]
+    followers, men_by_age, women_by_age = (schema.getter(name)(record)
+                                           for name in ("followers", "men_by_age", "women_by_age"))
+    if None in (followers, men_by_age, women_by_age):
+        raise KeyError("audience_insights.json has no follower count or age breakdown")
 
     # Extract total followers and gender distribution
-    total_followers = int(string_data["Followers"]["value"].replace(',', ''))
+    total_followers = int(followers.replace(',', ''))
     men_ratio = 0.43  # 43%
     women_ratio = 0.569  # 56.9%
 
     # Extract age distributions for each gender
-    men_data = parse_percentage_string(string_data["Follower Percentage by Age for Men"]["value"])
-    women_data = parse_percentage_string(string_data["Follower Percentage by Age for Women"]["value"])
+    men_data = parse_percentage_string(men_by_age)
+    women_data = parse_percentage_string(women_by_age)
 
     # Ensure consistent age group ordering
     age_groups = list(men_data.keys())
@@ -74,27 +61,70 @@ def generate_age_distribution_chart(folder_path):
     men_counts = [round((pct / 100) * total_followers * men_ratio) for pct in men_data.values()]
     women_counts = [round((pct / 100) * total_followers * women_ratio) for pct in women_data.values()]
 
-    # Plot grouped bar chart
+    return age_groups, men_counts, women_counts
+
+def draw_age_distribution(ax, age_groups, men_counts, women_counts):
+    """
+    Draw grouped men/women bars per age group on ax; shared with the dashboard panel.
+    """
     x = np.arange(len(age_groups))
     width = 0.35
 
     men_color = "#4A90E2"
     women_color = "#F15A5A"
 
-    plt.figure(figsize=(10, 6))
-    plt.bar(x - width/2, men_counts, width, label="Men", color=men_color)
-    plt.bar(x + width/2, women_counts, width, label="Women", color=women_color)
+    ax.bar(x - width/2, men_counts, width, label="Men", color=men_color)
+    ax.bar(x + width/2, women_counts, width, label="Women", color=women_color)
+
+    ax.set_xticks(x, age_groups)
+    ax.set_xlabel("Age Group")
+    ax.set_ylabel("Number of Followers")
+    ax.set_title("Age Distribution by Gender")
+    ax.legend()
+
+def render_age_distribution_chart(age_groups, men_counts, women_counts, output_path, reporter=None):
+    """
+    Draw the grouped bar chart of follower age distribution by gender and save it to output_path.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+
+    # Plot grouped bar chart
+    reporter.start("render", 1)
+    with get_template("grouped_bar_chart").render() as (fig, ax):
+        draw_age_distribution(ax, age_groups, men_counts, women_counts)
+
+        # Save the figure in OUTPUT_FOLDER
+        save_figure(fig, output_path, message="Saved: {path}")
+    reporter.update("render", 1, 1)
+
+def generate_age_distribution_chart(folder_path, reporter=None):
+    """
+    Generate a grouped bar chart of follower age distribution by gender.
+    Saves it in OUTPUT_FOLDER inside the provided folder_path.
+    """
+    reporter = reporter or ProgressReporter.from_env()
+
+    # Locate the JSON file
+    input_path = find_file_in_subdirectories(folder_path, "audience_insights.json", reporter)
+    if input_path is None:
+        print(f"Error: audience_insights.json not found in {folder_path} or its subdirectories")
+        return
+
+    # Define OUTPUT_FOLDER path
+    output_folder = os.path.join(folder_path, "OUTPUT_FOLDER")
+    os.makedirs(output_folder, exist_ok=True)  # Create folder if it doesn't exist
+
+    # Define output file path
+    output_path = os.path.join(output_folder, "age_gender_distribution.png")
+
+    # Load JSON data
+    data = load_json(input_path, reporter)
 
-    plt.xticks(x, age_groups)
-    plt.xlabel("Age Group")
-    plt.ylabel("Number of Followers")
-    plt.title("Age Distribution by Gender")
-    plt.legend()
-    plt.tight_layout()
+    reporter.start("aggregate", 1)
+    age_groups, men_counts, women_counts = extract_age_gender_counts(data)
+    reporter.update("aggregate", 1, 1)
 
-    # Save the figure in OUTPUT_FOLDER
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    print(f"Saved: {output_path}")
+    render_age_distribution_chart(age_groups, men_counts, women_counts, output_path, reporter)
 
 # Entry point for CLI usage
 if __name__ == "__main__":
@@ -104,3 +134,4 @@ if __name__ == "__main__":
 
     folder = sys.argv[1]
     generate_age_distribution_chart(folder)
+    sys.exit(finish_charts())
@@ -0,0 +1,361 @@
+"""
+Preservr Data Visualizations - Archive Access
+
+Description: Shared helpers for locating and reading files inside an Instagram
+             archive folder. Walking and parsing report progress through an
+             optional ProgressReporter. Record lists can also be streamed one
+             record at a time when a MemoryBudget cannot hold the parsed file,
+             and restricted to a TimeWindow while they are parsed.
+Input: An Instagram archive folder
+Output: Paths to archive files and their parsed JSON contents
+Date: 2026-10-19
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+
+# Size of each read when loading JSON, so parse progress can be reported in bytes.
+READ_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+# Where one object in an array ends and the next begins.
+_OBJECT_BOUNDARY = re.compile(r"\}[ \t\r\n]*,[ \t\r\n]*\{")
+# Boundaries tried, last first, before decoding buffered objects one at a time.
+BATCH_ATTEMPTS = 3
+# Characters at the end of the buffer searched for those boundaries first.
+BOUNDARY_SEARCH_CHARS = 64 * 1024
+
+
+def find_file_in_subdirectories(folder_path, filename, reporter=None):
+    """
+    Recursively search for the specified file in subdirectories.
+    """
+    for visited, (root, dirs, files) in enumerate(os.walk(folder_path), start=1):
+        if reporter is not None:
+            reporter.update("walk", visited)
+        if filename in files:
+            return os.path.join(root, filename)
+    return None
+
+
+def locate_files(folder_path, filenames, reporter=None):
+    """
+    Find several files in one recursive walk.
+    Returns {filename: path or None}, keeping the first match for each name.
+    """
+    wanted = set(filenames)
+    found = dict.fromkeys(filenames)
+    for visited, (root, dirs, files) in enumerate(os.walk(folder_path), start=1):
+        if reporter is not None:
+            reporter.update("walk", visited)
+        for filename in wanted.intersection(files):
+            if found[filename] is None:
+                found[filename] = os.path.join(root, filename)
+        if all(found.values()):
+            break
+    return found
+
+
+def find_numbered_files(folder_path, stem, reporter=None):
+    """
+    Find every shard of a dataset split across files named <stem>_1.json,
+    <stem>_2.json, ... anywhere in the archive.
+    Returns their paths ordered by shard number.
+    """
+    pattern = _shard_pattern(stem)
+    shards = {}
+    for visited, (root, dirs, files) in enumerate(os.walk(folder_path), start=1):
+        if reporter is not None:
+            reporter.update("walk", visited)
+        _add_shards(shards, pattern, root, files)
+    return [shards[number] for number in sorted(shards)]
+
+
+def list_numbered_files(directories, stem):
+    """
+    Like find_numbered_files, but only looks directly inside the given
+    directories, which is cheap enough to repeat on every watch poll.
+    """
+    pattern = _shard_pattern(stem)
+    shards = {}
+    for directory in sorted(directories):
+        try:
+            files = os.listdir(directory)
+        except OSError:
+            continue
+        _add_shards(shards, pattern, directory, files)
+    return [shards[number] for number in sorted(shards)]
+
+
+def _shard_pattern(stem):
+    return re.compile(re.escape(stem) + r"_(\d+)\.json$")
+
+
+def _add_shards(shards, pattern, directory, filenames):
+    """Record the shard files among filenames as {shard number: path}, keeping the first of each."""
+    for filename in filenames:
+        match = pattern.match(filename)
+        if match:
+            shards.setdefault(int(match.group(1)), os.path.join(directory, filename))
+
+
+def load_json(path, reporter=None, object_hook=None):
+    """
+    Load a JSON file. With an enabled reporter the file is decoded a chunk of
+    array elements at a time, reporting the position reached as parse progress,
+    so the bar follows decoding rather than the read that precedes it.
+    `object_hook` is passed to the decoder (see json.load).
+    """
+    if reporter is None or not reporter.enabled:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file, object_hook=object_hook)
+
+    total = os.path.getsize(path)
+    reporter.start("parse", total)
+    with open(path, "r", encoding="utf-8") as file:
+        stream = _JsonStream(file, total, object_hook=object_hook)
+        data = _decode_reporting(stream, reporter)
+        if stream.peek() != "":
+            raise ValueError(f"Extra data at character {stream.offset()} of {path}")
+    reporter.update("parse", total, total)
+    return data
+
+
+def _decode_reporting(stream, reporter):
+    """
+    Decode the next value of a stream for load_json. Objects are decoded member
+    by member and arrays a buffered batch of elements at a time; the elements
+    themselves are decoded whole. Progress is the position reached, reported
+    once per chunk read.
+    """
+    char = stream.peek()
+    if char == "{":
+        stream.expect("{")
+        members = {}
+        while stream.peek() != "}":
+            name = stream.value()
+            stream.expect(":")
+            members[name] = _decode_reporting(stream, reporter)
+            if stream.peek() == ",":
+                stream.expect(",")
+        stream.expect("}")
+        return stream.object_hook(members) if stream.object_hook is not None else members
+    if char == "[":
+        stream.expect("[")
+        items = []
+        reported = 0
+        more = stream.peek() != "]"
+        while more:
+            batch = stream.objects()
+            if batch:
+                items.extend(batch)
+            else:
+                items.append(stream.value())
+            if stream.consumed != reported:
+                reported = stream.consumed
+                reporter.update("parse", min(stream.offset(), stream.total), stream.total)
+            more = stream.peek() == ","
+            if more:
+                stream.expect(",")
+        stream.expect("]")
+        return items
+    return stream.value()
+
+
+class _JsonStream:
+    """Incremental reader over a JSON text file for decoding one value at a time."""
+
+    def __init__(self, file, total, reporter=None, object_hook=None):
+        self.file = file
+        self.total = total
+        self.reporter = reporter
+        self.object_hook = object_hook
+        self.decoder = json.JSONDecoder(object_hook=object_hook)
+        self.buffer = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+        # Whether objects() may look for a batch in the current buffer.
+        self.batchable = True
+
+    def _read_more(self, size=None):
+        chunk = self.file.read(size or READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.consumed += len(chunk)
+        self.batchable = True
+        if self.reporter is not None:
+            self.reporter.update("parse", min(self.consumed, self.total), self.total)
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def offset(self):
+        """Characters consumed so far; bytes when the file is opened as latin-1."""
+        return self.consumed - len(self.buffer) + self.pos
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at character {self.consumed - len(self.buffer) + self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        size = READ_CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._read_more(size):
+                continue
+            # Grow reads for values much larger than one chunk.
+            size *= 2
+
+    def objects(self):
+        """
+        Decode the array elements from the current position up to the last
+        complete object in the buffer in one decoder pass, which is much
+        faster than one value() call each and shares their keys, and leave
+        the position at the separator after them. Returns [] when no batch
+        is found; value() then decodes the next element on its own.
+        """
+        if not self.batchable or self.peek() != "{":
+            return []
+        tail = max(self.pos, len(self.buffer) - BOUNDARY_SEARCH_CHARS)
+        ends = [match.start() + 1 for match in _OBJECT_BOUNDARY.finditer(self.buffer, tail)]
+        if len(ends) < BATCH_ATTEMPTS and tail > self.pos:
+            ends = [match.start() + 1 for match in _OBJECT_BOUNDARY.finditer(self.buffer, self.pos)]
+        # A boundary inside an element (an array of objects in a record) fails to decode.
+        for end in reversed(ends[-BATCH_ATTEMPTS:]):
+            try:
+                values = self.decoder.decode("[" + self.buffer[self.pos:end] + "]")
+            except json.JSONDecodeError:
+                continue
+            self.pos = end
+            return values
+        self.batchable = False
+        return []
+
+
+def iter_json_records(path, key=None, reporter=None, object_hook=None):
+    """
+    Yield the elements of a JSON array one at a time without parsing the whole
+    file. The array is the top-level value, or the value of `key` in a
+    top-level object; nothing is yielded if the object has no such key.
+    Elements that `object_hook` turns into None are skipped.
+    """
+    total = os.path.getsize(path)
+    if reporter is not None:
+        reporter.start("parse", total)
+    with open(path, "r", encoding="utf-8") as file:
+        stream = _JsonStream(file, total, reporter, object_hook)
+        for _, record in _iter_array(stream, key):
+            if record is not None:
+                yield record
+    if reporter is not None:
+        reporter.update("parse", total, total)
+
+
+def _iter_array(stream, key):
+    """Yield (start offset, element) for the record array of a JSON stream (see iter_json_records)."""
+    if stream.peek() == "{":
+        stream.expect("{")
+        while stream.peek() not in ("}", ""):
+            name = stream.value()
+            stream.expect(":")
+            if name == key and stream.peek() == "[":
+                break
+            stream.value()
+            if stream.peek() == ",":
+                stream.expect(",")
+        else:
+            return
+    stream.expect("[")
+    while stream.peek() != "]":
+        start = stream.offset()
+        yield start, stream.value()
+        if stream.peek() == ",":
+            stream.expect(",")
+
+
+def iter_record_spans(path, key=None, reporter=None):
+    """
+    Like iter_json_records, but yield (byte offset, byte length, record) so a
+    record can later be read back on its own with read_record_at. Strings in
+    the records are returned as latin-1 text (one character per byte); pass
+    them through from_latin1 to get the real text.
+    """
+    total = os.path.getsize(path)
+    if reporter is not None:
+        reporter.start("parse", total)
+    # latin-1 maps every byte to one character, so stream offsets are byte offsets.
+    with open(path, "r", encoding="latin-1", newline="") as file:
+        stream = _JsonStream(file, total, reporter)
+        for start, record in _iter_array(stream, key):
+            yield start, stream.offset() - start, record
+    if reporter is not None:
+        reporter.update("parse", total, total)
+
+
+def from_latin1(text):
+    """Undo reading UTF-8 JSON as latin-1 (see iter_record_spans)."""
+    if text.isascii():
+        return text
+    try:
+        return text.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        # Already real text, e.g. from a \u escape.
+        return text
+
+
+def read_record_at(file, offset, length):
+    """Decode the record at a byte offset of an open binary file."""
+    file.seek(offset)
+    return json.loads(file.read(length).decode("utf-8"))
+
+
+@contextmanager
+def open_records(path, key=None, reporter=None, budget=None, window=None):
+    """
+    Provide the record list of a JSON file: the top-level array, or the array
+    under `key` in a top-level object (empty if the key is missing).
+
+    The file is parsed in one go, giving a list, when `budget` is None or can
+    hold the parsed file; the reservation is kept until the block exits.
+    Otherwise the records are streamed one at a time (see iter_json_records).
+    With a TimeWindow, records outside it are dropped as they are decoded.
+    """
+    from core.memory import estimate_json_footprint
+    footprint = estimate_json_footprint(path)
+    object_hook = window.object_hook if window is not None else None
+    if budget is not None and not budget.try_reserve_file(footprint):
+        yield iter_json_records(path, key, reporter, object_hook)
+        return
+    try:
+        data = load_json(path, reporter, object_hook)
+        records = data.get(key, []) if isinstance(data, dict) else data
+        if window is not None:
+            records = [record for record in records if record is not None]
+        yield records
+    finally:
+        if budget is not None:
+            budget.release(footprint)
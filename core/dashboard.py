@@ -0,0 +1,96 @@
+"""
+Preservr Data Visualizations - Archive Overview Dashboard
+
+Description: Draws the overview charts as panels of one figure in a single render
+             pass: the top liked accounts, the topic word cloud, the follower age and
+             gender bars and a follow-back summary. Panels are drawn from the tables
+             the scheduler builds for the individual charts, so every archive file is
+             read once, and the figure is laid out and saved once instead of once
+             per chart. A panel whose files are missing from the archive says so
+             rather than failing the whole dashboard.
+Input: Like counts, topics, age/gender counts and follower/following IDs
+Output: dashboard.png in OUTPUT_FOLDER
+Date: 2026-10-19
+"""
+
+from core.age_gender_distribution import draw_age_distribution
+from core.followers_following import FOLLOW_CATEGORY_HEADINGS
+from core.most_liked_users import draw_like_bars
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.top_topics import topic_wordcloud
+
+# Panels in reading order, with the title shown when a panel has no data.
+PANELS = {
+    "likes": "Top 5 Users by Combined Likes",
+    "topics": "Top Post Topics",
+    "age_gender": "Age Distribution by Gender",
+    "follows": "Follow-Back Summary",
+}
+FOLLOW_LABELS = {
+    "mutual": "Mutuals",
+    "follows_me_only": "Follow me,\nnot followed back",
+    "i_follow_only": "I follow,\nnot following back",
+}
+FOLLOW_COLORS = {"mutual": "#6AAA64", "follows_me_only": "#4A90E2", "i_follow_only": "#F15A5A"}
+
+
+def draw_topics(ax, topics):
+    """Draw the topic word cloud on ax."""
+    ax.imshow(topic_wordcloud(topics), interpolation="bilinear")
+    ax.axis("off")
+    ax.set_title(PANELS["topics"])
+
+
+def draw_follow_summary(ax, counts):
+    """Draw one horizontal bar per follow category, labeled with its count."""
+    categories = [category for category in FOLLOW_CATEGORY_HEADINGS if category in counts]
+    bars = ax.barh([FOLLOW_LABELS[category] for category in categories],
+                   [counts[category] for category in categories],
+                   color=[FOLLOW_COLORS[category] for category in categories])
+    ax.bar_label(bars, fmt="{:,.0f}", padding=4)
+    # Room for the count labels right of the longest bar.
+    ax.margins(x=0.12)
+    ax.invert_yaxis()
+    ax.set_xlabel("Accounts")
+    followers = counts["mutual"] + counts["follows_me_only"]
+    following = counts["mutual"] + counts["i_follow_only"]
+    ax.set_title(f"{PANELS['follows']} ({followers:,} followers, {following:,} following)")
+
+
+def draw_missing(ax, panel):
+    """Mark a panel whose data is not in the archive."""
+    ax.axis("off")
+    ax.set_title(PANELS[panel])
+    ax.text(0.5, 0.5, "Not found in this archive", ha="center", va="center", color="gray",
+            transform=ax.transAxes)
+
+
+def render_dashboard(panels, output_path, reporter=None, note=None):
+    """
+    Draw every panel on the shared dashboard figure and save it once to output_path.
+
+    `panels` maps panel names (see PANELS) to their data, or to None when missing:
+    "likes": (combined like DataFrame, title note or None); "topics": topic names;
+    "age_gender": (age groups, men counts, women counts); "follows": the counts of
+    follow_set_counts. `note`, such as the date range, is added to the title.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    reporter.start("render", 1)
+    draw = {
+        "likes": lambda ax, data: draw_like_bars(ax, data[0].head(5), data[1]),
+        "topics": draw_topics,
+        "age_gender": lambda ax, data: draw_age_distribution(ax, *data),
+        "follows": draw_follow_summary,
+    }
+
+    with get_template("dashboard").render() as (fig, axes):
+        for panel, ax in zip(PANELS, axes):
+            data = panels.get(panel)
+            if data is None:
+                draw_missing(ax, panel)
+            else:
+                draw[panel](ax, data)
+        fig.suptitle(f"Archive Overview ({note})" if note else "Archive Overview", fontsize=16)
+        save_figure(fig, output_path, message="Dashboard saved to: {path}")
+    reporter.update("render", 1, 1)
@@ -0,0 +1,222 @@
+"""
+Preservr Data Visualizations - Chart Encoders
+
+Description: Writes rendered charts in the chosen output format (--format): PNG with
+             a tunable compression level, WebP, JPEG, or SVG/PDF vector files, at a
+             chosen DPI. Raster charts are handed over as raw pixels the moment
+             they are drawn and are compressed and written by a small pool of
+             encoder threads, so the chart template is free for the next chart
+             while the previous one is still being encoded. Every write records
+             its size and timings for the batch summary, and a chart's "saved"
+             message is printed only once its file is on disk.
+Input: Rendered pixels or vector file contents from core/rendering.py
+Output: Chart files in OUTPUT_FOLDER, and EncodeJobs describing each write
+Date: 2026-10-19
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+# Output format -> file extension. Analyses declare their charts as .png; the
+# extension is swapped for the chosen format.
+IMAGE_FORMATS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg", "svg": ".svg", "pdf": ".pdf"}
+VECTOR_FORMATS = ("svg", "pdf")
+DEFAULT_FORMAT = "png"
+DEFAULT_DPI = 300
+# zlib level for PNG (0 = store, 9 = smallest); 6 is what PNG writers use by default.
+DEFAULT_PNG_LEVEL = 6
+# JPEG and WebP quality; WebP at 100 is lossless.
+DEFAULT_QUALITY = 90
+DEFAULT_ENCODERS = 2
+
+
+def image_artifact(name, image_format=DEFAULT_FORMAT):
+    """The file name a declared .png chart is written under in image_format."""
+    stem, extension = os.path.splitext(name)
+    return stem + IMAGE_FORMATS[image_format] if extension == ".png" else name
+
+
+class OutputOptions:
+    """How charts are written: format, resolution and compression settings."""
+
+    def __init__(self, image_format=DEFAULT_FORMAT, dpi=DEFAULT_DPI, png_level=DEFAULT_PNG_LEVEL,
+                 quality=DEFAULT_QUALITY):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown format '{image_format}'. Choices: {', '.join(IMAGE_FORMATS)}")
+        if not 0 <= png_level <= 9:
+            raise ValueError("PNG compression level must be between 0 and 9")
+        if not 1 <= quality <= 100:
+            raise ValueError("Quality must be between 1 and 100")
+        if dpi <= 0:
+            raise ValueError("DPI must be positive")
+        self.image_format = image_format
+        self.dpi = dpi
+        self.png_level = png_level
+        self.quality = quality
+
+    @property
+    def vector(self):
+        return self.image_format in VECTOR_FORMATS
+
+    def path_for(self, output_path):
+        """The path a chart declared as output_path is written to."""
+        folder, name = os.path.split(output_path)
+        return os.path.join(folder, image_artifact(name, self.image_format))
+
+    def pil_options(self, dpi):
+        """Image.save arguments for a raster format."""
+        if self.image_format == "png":
+            return {"format": "PNG", "compress_level": self.png_level, "dpi": (dpi, dpi)}
+        if self.image_format == "jpeg":
+            return {"format": "JPEG", "quality": self.quality, "dpi": (dpi, dpi), "optimize": False}
+        return {"format": "WEBP", "quality": self.quality, "lossless": self.quality == 100}
+
+    def describe(self):
+        if self.image_format == "png":
+            detail = f", compression level {self.png_level}"
+        elif self.image_format in ("jpeg", "webp"):
+            detail = f", quality {self.quality}"
+        else:
+            detail = ""
+        return f"{self.image_format.upper()} at {self.dpi} dpi{detail}"
+
+
+class EncodeJob:
+    """One chart write: where it goes, and once done its size and timings."""
+
+    def __init__(self, path, render_seconds, message=None):
+        self.path = path
+        # Seconds the caller spent drawing the chart to pixels or vector data.
+        self.render_seconds = render_seconds
+        # Printed, with {path} filled in, once the file is written.
+        self.message = message
+        self.encode_seconds = None
+        self.bytes = None
+        self.future = None
+
+    def describe(self):
+        return (f"{os.path.basename(self.path)}: {self.bytes / 1024:,.0f} KB, "
+                f"render {self.render_seconds:.2f}s, encode {self.encode_seconds:.2f}s")
+
+
+class ChartEncoder:
+    """
+    Encodes and writes charts on a pool of background threads.
+
+    Jobs submitted inside a `collect()` block are also recorded for the
+    calling thread, so a scheduler can wait for the charts of one analysis.
+    """
+
+    def __init__(self, options=None, workers=DEFAULT_ENCODERS):
+        self.options = options or OutputOptions()
+        self.workers = max(1, int(workers))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._collecting = threading.local()
+        # (job, exception) of every write that failed.
+        self.failures = []
+
+    def _submit(self, job, write):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chart-encode")
+            job.future = self._executor.submit(self._run, job, write)
+        collected = getattr(self._collecting, "jobs", None)
+        if collected is not None:
+            collected.append(job)
+        return job
+
+    def _run(self, job, write):
+        started = time.perf_counter()
+        # Written beside the target and renamed, so nobody sees a half-written chart.
+        temporary = f"{job.path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(job.path) or ".", exist_ok=True)
+            with open(temporary, "wb") as f:
+                write(f)
+            os.replace(temporary, job.path)
+        except BaseException as e:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            with self._lock:
+                self.failures.append((job, e))
+            raise
+        job.encode_seconds = time.perf_counter() - started
+        job.bytes = os.path.getsize(job.path)
+        if job.message is not None:
+            print(job.message.format(path=job.path), flush=True)
+        return job
+
+    def submit_pixels(self, pixels, size, path, dpi, render_seconds=0.0, message=None):
+        """Queue raw RGBA pixels of the given (width, height) for encoding in the chosen raster format."""
+        options = self.options.pil_options(dpi)
+        keep_alpha = self.options.image_format != "jpeg"
+
+        def write(f):
+            from PIL import Image
+            image = Image.frombuffer("RGBA", size, pixels, "raw", "RGBA", 0, 1)
+            (image if keep_alpha else image.convert("RGB")).save(f, **options)
+
+        return self._submit(EncodeJob(path, render_seconds, message), write)
+
+    def submit_bytes(self, data, path, render_seconds=0.0, message=None):
+        """Queue an already encoded file (e.g. SVG or PDF) to be written."""
+        return self._submit(EncodeJob(path, render_seconds, message), lambda f: f.write(data))
+
+    @contextmanager
+    def collect(self):
+        """Yield the list of jobs the calling thread submits inside the block."""
+        previous = getattr(self._collecting, "jobs", None)
+        self._collecting.jobs = jobs = []
+        try:
+            yield jobs
+        finally:
+            self._collecting.jobs = previous
+            if previous is not None:
+                previous.extend(jobs)
+
+    @staticmethod
+    def wait(jobs):
+        """Block until the jobs are written; re-raises the first failure."""
+        wait([job.future for job in jobs])
+        for job in jobs:
+            job.future.result()
+        return jobs
+
+    def close(self):
+        """Finish every queued write and stop the encoder threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_encoder = ChartEncoder()
+
+
+def get_encoder():
+    """The process' chart encoder."""
+    return _encoder
+
+
+def configure_output(options=None, workers=None):
+    """Set how this process writes charts from now on; returns the encoder."""
+    _encoder.options = options or OutputOptions()
+    if workers is not None and max(1, int(workers)) != _encoder.workers:
+        _encoder.close()
+        _encoder.workers = max(1, int(workers))
+    return _encoder
+
+
+def finish_charts():
+    """
+    Wait for every chart this process queued, printing each write that failed.
+    Standalone scripts exit with the result: 1 if any chart failed, else 0.
+    """
+    _encoder.close()
+    for job, error in _encoder.failures:
+        print(f"Error: could not write {job.path}: {error}", flush=True)
+    return 1 if _encoder.failures else 0
@@ -0,0 +1,63 @@
+"""
+Preservr Data Visualizations - Table Export
+
+Description: Streams an analysis' aggregated numbers to CSV or NDJSON next to its
+             chart. Rows are written one at a time as they are produced, so the
+             whole output is never held in memory as one string, and files can be
+             gzip-compressed for very large follower lists.
+Input: Column names and an iterable of rows from an analysis
+Output: <name>.csv or <name>.ndjson (optionally .gz) in the 'OUTPUT_FOLDER' directory
+Date: 2026-10-19
+"""
+
+import csv
+import gzip
+import json
+import os
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+def export_filename(name, fmt, compress=False):
+    """File name for an export, e.g. follow_categories.csv.gz."""
+    return f"{name}.{fmt}" + (".gz" if compress else "")
+
+
+def open_export(path, compress=False):
+    """Open a text file for writing, gzip-compressed when `compress` is set."""
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def write_table(path, columns, rows, fmt="csv", compress=False):
+    """
+    Write rows to `path` one at a time and return the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    count = 0
+    with open_export(path, compress) as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for count, row in enumerate(rows, start=1):
+                writer.writerow(row)
+        else:
+            for count, row in enumerate(rows, start=1):
+                out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                out.write("\n")
+    return count
+
+
+def count_rows(usernames, ids, *columns):
+    """
+    Yield (username, value, ...) for each ID, reading the values from the
+    given count arrays. Values are converted to plain ints for JSON output.
+    """
+    names = usernames.names
+    columns = [column.tolist() for column in columns]
+    for position, user_id in enumerate(ids.tolist()):
+        yield (names[user_id],) + tuple(column[position] for column in columns)
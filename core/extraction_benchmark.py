@@ -0,0 +1,186 @@
+"""
+Preservr Data Visualizations - Extraction Benchmark
+
+Description: Measures how fast the compiled field extractors of core/schemas.py pull
+             values out of every Instagram export file type. Each file is parsed
+             once; then every field is extracted from the parsed records with the
+             compiled extractor and, for comparison, with a generic path walk that
+             guards each record with try/except, as the loaders used to. All fields
+             of a file are also read in one columnar pass, and the file is streamed
+             record by record to time extraction end to end. Timings are the best of
+             several repeats and are reported as records per second.
+Input: An Instagram archive folder or a synthetic scale
+Output: A throughput table on stderr and a JSON report on stdout or in --output
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_numbered_files, iter_json_records, load_json
+from core.schemas import SCHEMAS
+from core.synthetic import SCALES, make_archive
+
+DEFAULT_SCALE = "small"
+DEFAULT_REPEATS = 3
+
+
+def _interpreted_values(records, field):
+    """Reference extraction: walk the path of every record, skipping records it does not fit."""
+    for record in records:
+        try:
+            value = record
+            for step in field.path:
+                value = value[step]
+        except (KeyError, IndexError, TypeError):
+            continue
+        if field.strip:
+            value = value.strip()
+        if value is not None and value not in field.skip:
+            yield value
+
+
+def _best_time(function, repeats):
+    """Shortest of `repeats` timed calls of function(); returns (seconds, its result)."""
+    best, result = None, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _drain(iterator):
+    """Consume an iterator without keeping its values; returns how many there were."""
+    counter = deque(enumerate(iterator, start=1), maxlen=1)
+    return counter[0][0] if counter else 0
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else None
+
+
+def dataset_paths(folder_path):
+    """{dataset: [file paths]} of the archive's export files; comments include every shard."""
+    from core.scheduler import locate_datasets
+    located = locate_datasets(folder_path)
+    paths = {}
+    for dataset, schema in SCHEMAS.items():
+        if dataset == "post_comments":
+            found = find_numbered_files(folder_path, schema.filename.rsplit("_", 1)[0])
+        else:
+            found = [located[dataset]] if located.get(dataset) else []
+        if found:
+            paths[dataset] = found
+    return paths
+
+
+def benchmark_dataset(dataset, paths, repeats=DEFAULT_REPEATS):
+    """Time every way of extracting a dataset's fields; returns its report dict."""
+    schema = SCHEMAS[dataset]
+    parse_seconds, records = _best_time(
+        lambda: [record for path in paths for record in schema.records(load_json(path))], 1)
+    report = {"dataset": dataset, "files": len(paths), "bytes": sum(os.path.getsize(path) for path in paths),
+              "records": len(records), "parse_seconds": round(parse_seconds, 4), "fields": {}}
+
+    for name, field in schema.fields.items():
+        compiled, values = _best_time(lambda: _drain(schema.values(name, records)), repeats)
+        interpreted, reference = _best_time(lambda: _drain(_interpreted_values(records, field)), repeats)
+        if values != reference:
+            raise AssertionError(f"{dataset}.{name}: compiled extractor found {values} values, path walk {reference}")
+        report["fields"][name] = {
+            "values": values,
+            "compiled_per_second": _rate(len(records), compiled),
+            "interpreted_per_second": _rate(len(records), interpreted),
+            "speedup": round(interpreted / compiled, 2) if compiled > 0 else None,
+        }
+
+    names = tuple(schema.fields)
+    columnar, _ = _best_time(lambda: schema.columns(records, *names), repeats)
+    report["columns_per_second"] = _rate(len(records), columnar)
+
+    first = names[0]
+    streamed, _ = _best_time(
+        lambda: sum(_drain(schema.values(first, iter_json_records(path, schema.records_key))) for path in paths), 1)
+    report["streamed_per_second"] = _rate(len(records), streamed)
+    report["streamed_mb_per_second"] = _rate(report["bytes"] / 1024 ** 2, streamed)
+    return report
+
+
+def print_table(reports, stream=sys.stderr):
+    """One line per field: compiled and interpreted records per second, and per dataset the columnar rate."""
+    print(f"{'file / field':<40} {'records':>9} {'compiled/s':>12} {'path walk/s':>12} {'speedup':>8}", file=stream)
+    for report in reports:
+        print(f"{SCHEMAS[report['dataset']].filename} ({report['files']} file(s), "
+              f"{report['bytes'] / 1024 ** 2:.1f} MB, parsed in {report['parse_seconds']:.2f}s)", file=stream)
+        for name, field in report["fields"].items():
+            print(f"  {name:<38} {report['records']:>9,} {field['compiled_per_second'] or 0:>12,.0f} "
+                  f"{field['interpreted_per_second'] or 0:>12,.0f} {field['speedup'] or 0:>7.2f}x", file=stream)
+        print(f"  {'all fields, one columnar pass':<38} {report['records']:>9,} "
+              f"{report['columns_per_second'] or 0:>12,.0f}", file=stream)
+        print(f"  {'streamed from disk (' + next(iter(report['fields'])) + ')':<38} {report['records']:>9,} "
+              f"{report['streamed_per_second'] or 0:>12,.0f}   {report['streamed_mb_per_second'] or 0:.1f} MB/s",
+              file=stream)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="extraction_benchmark.py",
+                                     description="Benchmark field extraction for every archive file type.")
+    parser.add_argument("folder_path", nargs="?",
+                        help="Instagram archive folder (default: a synthetic archive of --scale)")
+    parser.add_argument("--scale", help=f"benchmark a synthetic archive of this size: {', '.join(SCALES)} "
+                                        f"(default when no folder is given: {DEFAULT_SCALE})")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic archive (default: 0)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEATS,
+                        help=f"timed runs per measurement, the fastest is kept (default: {DEFAULT_REPEATS})")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    if args.folder_path is None and args.scale is None:
+        args.scale = DEFAULT_SCALE
+    if args.folder_path is not None and args.scale is not None:
+        parser.error("give either an archive folder or --scale, not both")
+    if args.scale is not None and args.scale not in SCALES:
+        parser.error(f"unknown scale '{args.scale}'. Choices: {', '.join(SCALES)}")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def main():
+    args = parse_args()
+    folder_path = args.folder_path
+    if folder_path is None:
+        folder_path = tempfile.mkdtemp(prefix="preservr_benchmark_")
+        print(f"Writing a {args.scale} synthetic archive ({SCALES[args.scale]} post likes)...", file=sys.stderr)
+        make_archive(folder_path, args.scale, args.seed)
+    try:
+        reports = []
+        for dataset, paths in dataset_paths(folder_path).items():
+            print(f"Benchmarking {SCHEMAS[dataset].filename}...", file=sys.stderr, flush=True)
+            reports.append(benchmark_dataset(dataset, paths, args.repeat))
+    finally:
+        if args.folder_path is None:
+            shutil.rmtree(folder_path, ignore_errors=True)
+
+    print_table(reports)
+    document = {"folder": args.folder_path, "scale": args.scale, "datasets": reports}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,78 +9,183 @@ Output: txt file with the aforementioned information saved to the 'OUTPUT_FOLDER
 Date: 2025-04-16
 """
 import os
-import json
 import sys
+import numpy as np
 
-def find_file_in_subdirectories(folder_path, filename):
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_file_in_subdirectories, open_records
+from core.memory import STREAM_CHUNK_RECORDS, ExternalIdSorter
+from core.progress import ProgressReporter, print_line
+from core.schemas import get_schema
+from core.usernames import ID_DTYPE, UsernameDictionary, for_archive, unique_ids, intersect, difference
+
+# followers_1.json and following.json share one record layout.
+FOLLOW_SCHEMA = get_schema("following")
+
+def _entry_usernames(entries):
     """
-    Recursively search for the specified file in subdirectories.
+    Yield the username of every follower/following entry that has one.
     """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+    return FOLLOW_SCHEMA.values("username", entries)
 
-def load_usernames(filepath, label):
+def load_usernames(filepath, label, reporter=None, usernames=None, budget=None, window=None):
     """
     Load usernames from Instagram JSON file. Supports top-level lists and nested keys.
+    Returns an array of username IDs interned into `usernames`.
+    With a TimeWindow, only accounts followed inside it are loaded.
     """
-    usernames = []
+    reporter = reporter or ProgressReporter(enabled=False)
+    usernames = usernames if usernames is not None else UsernameDictionary()
+    ids = np.zeros(0, dtype=ID_DTYPE)
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        with open_records(filepath, FOLLOW_SCHEMA.records_key, reporter, budget, window) as data:
+            ids = usernames.intern_many(_entry_usernames(reporter.iterate("aggregate", data)))
 
-            if isinstance(data, dict) and "relationships_following" in data:
-                data = data["relationships_following"]
+        print_line(f"[{label}] Loaded {len(ids)} usernames from {filepath}")
+    except Exception as e:
+        print_line(f"Error loading {label}: {e}")
+    return ids
 
-            for entry in data:
-                if "string_list_data" in entry and entry["string_list_data"]:
-                    username = entry["string_list_data"][0]["value"].strip()
-                    usernames.append(username)
+def load_follow_ids(filepath, label, reporter=None, usernames=None, budget=None, window=None):
+    """
+    Load the sorted distinct username IDs in a followers/following file.
+    With a limited memory budget the file is interned in chunks and the IDs
+    are sorted externally, spilling to disk if needed; the result is the same.
+    """
+    if budget is None or not budget.limited:
+        return unique_ids(load_usernames(filepath, label, reporter, usernames, budget, window))
 
-            print(f"[{label}] Loaded {len(usernames)} usernames from {filepath}")
+    reporter = reporter or ProgressReporter(enabled=False)
+    usernames = usernames if usernames is not None else UsernameDictionary()
+    sorter = ExternalIdSorter(budget, ID_DTYPE)
+    loaded = 0
+    try:
+        with open_records(filepath, FOLLOW_SCHEMA.records_key, reporter, budget, window) as data:
+            names = _entry_usernames(reporter.iterate("aggregate", data))
+            for ids in usernames.intern_chunks(names, STREAM_CHUNK_RECORDS):
+                sorter.add(ids)
+                loaded += len(ids)
+
+        print_line(f"[{label}] Loaded {loaded} usernames from {filepath}")
     except Exception as e:
-        print(f"Error loading {label}: {e}")
-    return usernames
+        print_line(f"Error loading {label}: {e}")
+        return np.zeros(0, dtype=ID_DTYPE)
+    return sorter.result()
 
-def analyze_follow_data(folder_path):
+def analyze_follow_data(folder_path, reporter=None):
     """
     Locate files and analyze followers vs. following data.
     Save results to OUTPUT_FOLDER.
     """
-    followers_file = find_file_in_subdirectories(folder_path, "followers_1.json")
-    following_file = find_file_in_subdirectories(folder_path, "following.json")
+    reporter = reporter or ProgressReporter.from_env()
+
+    followers_file = find_file_in_subdirectories(folder_path, "followers_1.json", reporter)
+    following_file = find_file_in_subdirectories(folder_path, "following.json", reporter)
 
     if not followers_file or not following_file:
         print("Error: One or both required JSON files not found.")
         return
 
-    followers = load_usernames(followers_file, "Followers")
-    following = load_usernames(following_file, "Following")
+    usernames = for_archive(folder_path)
+    followers = load_follow_ids(followers_file, "Followers", reporter, usernames)
+    following = load_follow_ids(following_file, "Following", reporter, usernames)
+
+    write_follow_analysis(folder_path, followers, following, usernames, reporter)
+
+def compare_follow_sets(followers, following, usernames):
+    """
+    Compare sorted unique follower and following ID arrays.
+    Returns sorted username lists (mutuals, fans, not_following_back).
+    """
+    # Set comparisons on sorted ID arrays; names are only looked up for the results
+    mutuals = sorted(usernames.names_for(intersect(followers, following)))
+    fans = sorted(usernames.names_for(difference(followers, following)))
+    not_following_back = sorted(usernames.names_for(difference(following, followers)))
+    return mutuals, fans, not_following_back
+
+def follow_set_counts(followers, following):
+    """
+    Count mutuals, fans and accounts not following back without looking up any names.
+    Returns {category: count} in FOLLOW_CATEGORY_HEADINGS order.
+    """
+    return {
+        "mutual": len(intersect(followers, following)),
+        "follows_me_only": len(difference(followers, following)),
+        "i_follow_only": len(difference(following, followers)),
+    }
+
+# Result categories in file order, with the heading each one has in follow_analysis.txt.
+FOLLOW_CATEGORY_HEADINGS = {
+    "mutual": "Mutuals:",
+    "follows_me_only": "People who follow me but I don’t follow back:",
+    "i_follow_only": "People I follow but who don’t follow me back:",
+}
+
+def iter_follow_categories(followers, following, usernames):
+    """
+    Yield (username, category) for every account, one category at a time,
+    in the order they appear in follow_analysis.txt.
+    """
+    for category, ids in (("mutual", intersect(followers, following)),
+                          ("follows_me_only", difference(followers, following)),
+                          ("i_follow_only", difference(following, followers))):
+        for name in sorted(usernames.names_for(ids)):
+            yield name, category
 
-    followers_set = set(followers)
-    following_set = set(following)
+def _write_lines(out, names):
+    """
+    Write names separated by newlines without joining them into one string.
+    """
+    for index, name in enumerate(names):
+        if index:
+            out.write("\n")
+        out.write(name)
 
-    mutuals = sorted(followers_set & following_set)
-    fans = sorted(followers_set - following_set)
-    not_following_back = sorted(following_set - followers_set)
+def write_follow_analysis(folder_path, followers, following, usernames, reporter=None):
+    """
+    Write mutuals, fans and accounts not following back to OUTPUT_FOLDER/follow_analysis.txt.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    mutuals, fans, not_following_back = compare_follow_sets(followers, following, usernames)
 
     # Create OUTPUT_FOLDER if it doesn't exist
     output_folder = os.path.join(folder_path, "OUTPUT_FOLDER")
     os.makedirs(output_folder, exist_ok=True)
 
     output_file = os.path.join(output_folder, "follow_analysis.txt")
+    reporter.start("render", 1)
 
     with open(output_file, "w", encoding="utf-8") as out:
-        out.write("Mutuals:\n")
-        out.write("\n".join(mutuals) + "\n\n")
-        out.write("People who follow me but I don’t follow back:\n")
-        out.write("\n".join(fans) + "\n\n")
-        out.write("People I follow but who don’t follow me back:\n")
-        out.write("\n".join(not_following_back))
-
+        for index, (heading, names) in enumerate(zip(FOLLOW_CATEGORY_HEADINGS.values(),
+                                                     (mutuals, fans, not_following_back))):
+            if index:
+                out.write("\n\n")
+            out.write(heading + "\n")
+            _write_lines(out, names)
+
+    reporter.update("render", 1, 1)
     print(f"\n✅ Analysis written to {output_file}")
 
+def read_follow_analysis(path):
+    """
+    Read follow_analysis.txt back into {category: sorted usernames}, with the
+    categories of FOLLOW_CATEGORY_HEADINGS.
+    """
+    categories = {heading: category for category, heading in FOLLOW_CATEGORY_HEADINGS.items()}
+    results = {category: [] for category in FOLLOW_CATEGORY_HEADINGS}
+    names = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line in categories:
+                names = results[categories[line]]
+            elif line and names is not None:
+                names.append(line)
+    return results
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python followers_following.py <folder_path>")
@@ -0,0 +1,117 @@
+"""
+Preservr Data Visualizations - Approximate Heavy Hitters
+
+Description: Space-Saving sketch for finding the most frequent usernames in a stream
+             with a fixed memory budget. The sketch tracks at most `capacity` names.
+             Every reported count is an upper bound on the true count, and
+             `count - error` is a lower bound. The error of any entry is at most
+             total / capacity.
+Input: A stream of usernames, e.g. like titles from liked_posts.json or story_likes.json
+Output: Top-k usernames with estimated counts and per-entry error bounds
+Date: 2026-10-19
+"""
+
+import heapq
+from collections import namedtuple
+
+# Default number of usernames tracked by an approximate run. WordCloud draws at
+# most 200 words and the bar chart shows 5, so this leaves plenty of headroom.
+DEFAULT_CAPACITY = 1000
+
+HeavyHitter = namedtuple("HeavyHitter", ["item", "count", "error"])
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch (Metwally et al.).
+
+    When a new item arrives and the sketch is full, the item with the smallest
+    count is replaced; the newcomer inherits that count as its error.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        # One (count, item) entry per tracked item; counts may be stale (too low)
+        # and are refreshed lazily when the entry reaches the top of the heap.
+        self._heap = []
+
+    def __len__(self):
+        return len(self._counts)
+
+    def update(self, item, weight=1):
+        """Add `weight` occurrences of `item` to the sketch."""
+        self.total += weight
+        counts = self._counts
+        if item in counts:
+            counts[item] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[item] = weight
+            self._errors[item] = 0
+            heapq.heappush(self._heap, (weight, item))
+            return
+
+        # Evict the current minimum.
+        count, victim = self._refresh_min()
+        del counts[victim]
+        del self._errors[victim]
+        counts[item] = count + weight
+        self._errors[item] = count
+        heapq.heapreplace(self._heap, (count + weight, item))
+
+    def _refresh_min(self):
+        """Refresh stale heap entries until the top holds the true minimum."""
+        heap, counts = self._heap, self._counts
+        while True:
+            count, item = heap[0]
+            if counts[item] == count:
+                return count, item
+            heapq.heapreplace(heap, (counts[item], item))
+
+    def extend(self, items):
+        """Add every item of an iterable to the sketch."""
+        update = self.update
+        for item in items:
+            update(item)
+
+    def min_count(self):
+        """Smallest tracked count; an upper bound for any untracked item."""
+        if len(self._counts) < self.capacity:
+            return 0
+        return self._refresh_min()[0]
+
+    def estimate(self, item):
+        """Return (count, error) for an item, tracked or not."""
+        if item in self._counts:
+            return self._counts[item], self._errors[item]
+        floor = self.min_count()
+        return floor, floor
+
+    def items(self):
+        """Return the tracked items."""
+        return self._counts.keys()
+
+    def top(self, n=None):
+        """Return the `n` largest entries as HeavyHitter tuples, largest first."""
+        ranked = sorted(self._counts.items(), key=lambda pair: (-pair[1], pair[0]))
+        if n is not None:
+            ranked = ranked[:n]
+        return [HeavyHitter(item, count, self._errors[item]) for item, count in ranked]
+
+    def frequencies(self, n=None):
+        """Return {item: estimated count} for the top `n` entries (for WordCloud)."""
+        return {entry.item: entry.count for entry in self.top(n)}
+
+
+def guaranteed_top(entries, k):
+    """
+    Return the entries among the first `k` whose rank is certain: their lower
+    bound (count - error) is at least the estimated count of entry k + 1.
+    """
+    threshold = entries[k].count if len(entries) > k else 0
+    return [entry for entry in entries[:k] if entry.count - entry.error >= threshold]
@@ -0,0 +1,224 @@
+"""
+Preservr Data Visualizations - Interaction Graph
+
+Description: Joins every per-user source (post likes, story likes, comments and
+             both follow lists) into one feature matrix keyed by the archive's
+             username IDs. Only users with at least one interaction get a row, so
+             the matrix stays small even for archives with huge follower lists.
+             Engagement scores are a weighted sum over the columns, and queries
+             such as "accounts I engage with most that don't follow me back" are
+             boolean masks over the cached matrix, with no reparsing.
+Input: Count and ID tables built by the other analyses
+Output: Engagement chart and rankings saved to the 'OUTPUT_FOLDER' directory
+Date: 2026-10-19
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.usernames import align
+
+# Matrix columns, in order.
+FEATURES = ("post_likes", "story_likes", "comments", "follows_me", "i_follow")
+# Columns that measure how much I engage with an account.
+ENGAGEMENT_FEATURES = ("post_likes", "story_likes", "comments")
+# A comment takes more effort than a story like, which is rarer than a post like.
+DEFAULT_WEIGHTS = {"post_likes": 1.0, "story_likes": 2.0, "comments": 3.0, "follows_me": 0.0, "i_follow": 0.0}
+
+FEATURE_LABELS = {
+    "post_likes": "Post Likes",
+    "story_likes": "Story Likes",
+    "comments": "Comments",
+    "follows_me": "Follows Me",
+    "i_follow": "I Follow",
+}
+
+
+def _membership(ids, size):
+    """0/1 array of length size marking the given IDs."""
+    flags = np.zeros(size, dtype=np.int64)
+    flags[np.asarray(ids)] = 1
+    return flags
+
+
+class InteractionGraph:
+    """
+    Per-user interaction features for one archive.
+
+    `user_ids` lists the username IDs with at least one non-zero feature, in
+    ascending order; `matrix[i]` holds their FEATURES counts.
+    """
+
+    def __init__(self, user_ids, matrix, usernames):
+        self.user_ids = user_ids
+        self.matrix = matrix
+        self.usernames = usernames
+
+    @classmethod
+    def build(cls, usernames, post_likes=(), story_likes=(), comment_counts=(), followers=(), following=()):
+        """Join count arrays and follow ID arrays (all indexed by username ID) into a graph."""
+        size = len(usernames)
+        columns = [
+            align(np.asarray(post_likes, dtype=np.int64), size)[:size],
+            align(np.asarray(story_likes, dtype=np.int64), size)[:size],
+            align(np.asarray(comment_counts, dtype=np.int64), size)[:size],
+            _membership(followers, size),
+            _membership(following, size),
+        ]
+        dense = np.column_stack(columns) if size else np.zeros((0, len(FEATURES)), dtype=np.int64)
+        user_ids = np.flatnonzero(dense.any(axis=1))
+        return cls(user_ids, dense[user_ids], usernames)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def column(self, feature):
+        """One feature for every row."""
+        return self.matrix[:, FEATURES.index(feature)]
+
+    def weight_vector(self, weights=None):
+        """DEFAULT_WEIGHTS overridden by `weights`, as a vector over FEATURES."""
+        merged = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        unknown = set(merged) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown feature(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(FEATURES)}")
+        return np.array([merged[feature] for feature in FEATURES], dtype=np.float64)
+
+    def scores(self, weights=None):
+        """Weighted engagement score for every row."""
+        return self.matrix @ self.weight_vector(weights)
+
+    def engagement(self):
+        """Total likes and comments I gave each row's account."""
+        return self.matrix[:, [FEATURES.index(feature) for feature in ENGAGEMENT_FEATURES]].sum(axis=1)
+
+    def rank(self, mask=None, weights=None, n=None):
+        """
+        Row indices ordered by score descending (ties by username), optionally
+        restricted to rows where `mask` is true and to the first n.
+        """
+        scores = self.scores(weights)
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        names = np.array(self.usernames.names_for(self.user_ids[rows]), dtype=object)
+        by_name = rows[np.argsort(names, kind="stable")]
+        ranked = by_name[np.argsort(-scores[by_name], kind="stable")]
+        return ranked if n is None else ranked[:n]
+
+    def top_engaged(self, n=None, weights=None):
+        """Accounts I engage with most."""
+        return self.rank(self.engagement() > 0, weights, n)
+
+    def not_following_back(self, n=None, weights=None, only_followed=True):
+        """
+        Accounts I engage with that don't follow me; by default only those I
+        follow, i.e. relationships that are not returned.
+        """
+        mask = (self.engagement() > 0) & (self.column("follows_me") == 0)
+        if only_followed:
+            mask &= self.column("i_follow") == 1
+        return self.rank(mask, weights, n)
+
+    def unengaged_following(self, n=None):
+        """Accounts I follow but never like or comment on."""
+        mask = (self.column("i_follow") == 1) & (self.engagement() == 0)
+        return self.rank(mask, None, n)
+
+    def names(self, rows):
+        return self.usernames.names_for(self.user_ids[rows])
+
+    def rows(self, rows, weights=None):
+        """Yield (username, features..., score) for the given row indices, for export."""
+        scores = self.scores(weights)
+        for row in np.asarray(rows).tolist():
+            yield (self.usernames.names[self.user_ids[row]],) + tuple(self.matrix[row].tolist()) + (float(scores[row]),)
+
+
+def export_columns():
+    return ["Username"] + [FEATURE_LABELS[feature] for feature in FEATURES] + ["Score"]
+
+
+def render_not_following_back_chart(graph, output_path, n=10, reporter=None):
+    """
+    Draw a stacked bar chart of the accounts I engage with most that don't
+    follow me back, split into post likes, story likes and comments.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    reporter.start("render", 1)
+    rows = graph.not_following_back(n)[::-1]
+    names = graph.names(rows)
+    colors = {"post_likes": "red", "story_likes": "blue", "comments": "green"}
+
+    with get_template("bar_chart").render() as (fig, ax):
+        left = np.zeros(len(rows))
+        for feature in ENGAGEMENT_FEATURES:
+            values = graph.column(feature)[rows]
+            ax.barh(names, values, left=left, color=colors[feature], label=FEATURE_LABELS[feature])
+            left += values
+        ax.set_xlabel("Interactions (accounts ordered by weighted engagement score)")
+        ax.set_title(f"Top {len(rows)} Accounts You Engage With That Don't Follow You Back")
+        if len(rows):
+            ax.legend()
+        else:
+            ax.text(0.5, 0.5, "Everyone you engage with follows you back", ha="center", va="center",
+                    transform=ax.transAxes)
+        save_figure(fig, output_path, message="Visualization saved to: {path}")
+    reporter.update("render", 1, 1)
+
+
+QUERIES = {
+    "top-engaged": InteractionGraph.top_engaged,
+    "not-following-back": InteractionGraph.not_following_back,
+    "unengaged-following": InteractionGraph.unengaged_following,
+}
+
+
+def parse_weights(text):
+    """Parse "comments=5,story_likes=1" into a weights dict."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        feature, _, value = item.partition("=")
+        feature = feature.strip()
+        if feature not in FEATURES:
+            raise argparse.ArgumentTypeError(f"unknown feature '{feature}'; choose from {', '.join(FEATURES)}")
+        try:
+            weights[feature] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {feature}: '{value}'") from None
+    return weights
+
+
+def main():
+    from core.scheduler import AnalysisScheduler
+
+    parser = argparse.ArgumentParser(description="Query the interaction graph of an Instagram archive.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("--query", choices=QUERIES, default="not-following-back",
+                        help="which accounts to list (default: not-following-back)")
+    parser.add_argument("--top", type=int, default=20, help="number of accounts to list (default: 20)")
+    parser.add_argument("--weights", type=parse_weights, default={},
+                        help="score weights, e.g. comments=5,story_likes=1 "
+                             f"(default: {','.join(f'{k}={v:g}' for k, v in DEFAULT_WEIGHTS.items())})")
+    args = parser.parse_args()
+
+    scheduler = AnalysisScheduler(args.folder_path, reporter=ProgressReporter.from_env())
+    graph = scheduler.table("interaction_graph")
+    if args.query == "unengaged-following":
+        rows = graph.unengaged_following(args.top)
+    else:
+        rows = QUERIES[args.query](graph, args.top, args.weights)
+
+    print("\t".join(export_columns()))
+    for row in graph.rows(rows, args.weights):
+        print("\t".join(f"{value:g}" if isinstance(value, float) else str(value) for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Preservr Data Visualizations - Memory Budget
+
+Description: Tracks the approximate memory footprint of loading and aggregation
+             against an optional limit (--max-memory). Loaders ask the budget before
+             parsing a whole JSON file into memory; when it would not fit they
+             stream the file's records instead. Sorted ID sets that outgrow the
+             budget are built with an external sort whose runs are spilled to a
+             temporary directory and merged into a disk-backed array. Results are
+             identical to the in-memory path.
+Input: A memory limit such as "512M" and size requests from the loaders
+Output: Decisions between in-memory and disk-backed processing, and spill files
+Date: 2026-10-19
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+# Rough bytes of Python objects per byte of JSON text once a file is parsed.
+JSON_FOOTPRINT_FACTOR = 8
+# Records interned per chunk when a file is streamed.
+STREAM_CHUNK_RECORDS = 65536
+# IDs merged per block when combining spilled runs or comparing disk-backed sets.
+MERGE_BLOCK_IDS = 1 << 20
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text):
+    """Parse a size such as "750M", "2G" or "1048576" into bytes."""
+    value = str(text).strip().upper().removesuffix("B").removesuffix("I")
+    unit = value[-1:] if value[-1:] in _SIZE_UNITS else ""
+    try:
+        number = float(value[:len(value) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid size '{text}'. Use a number of bytes or a value like 512M or 2G.") from None
+    if number <= 0:
+        raise ValueError(f"Size must be positive, got '{text}'")
+    return int(number * _SIZE_UNITS[unit])
+
+
+def estimate_json_footprint(path):
+    """Approximate memory needed to hold a JSON file's parsed contents."""
+    return os.path.getsize(path) * JSON_FOOTPRINT_FACTOR
+
+
+def physical_memory():
+    """Total physical memory in bytes, or None where it cannot be determined."""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class MemoryBudget:
+    """
+    Approximate accounting of memory held by loaders. An unlimited budget
+    (limit=None) accepts every reservation.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+        self._spill_dir = None
+        self._spill_count = 0
+
+    @property
+    def limited(self):
+        return self.limit is not None
+
+    def try_reserve(self, nbytes):
+        """Reserve nbytes if they fit in the budget; returns whether they did."""
+        with self._lock:
+            if self.limit is not None and self.used + nbytes > self.limit:
+                return False
+            self.used += nbytes
+            return True
+
+    def reserve(self, nbytes):
+        """Account for nbytes that must be held regardless of the limit."""
+        with self._lock:
+            self.used += nbytes
+
+    def release(self, nbytes):
+        with self._lock:
+            self.used = max(0, self.used - nbytes)
+
+    def try_reserve_file(self, nbytes):
+        """Reserve the parsed footprint of a whole file; False means stream it instead."""
+        return self.try_reserve(nbytes)
+
+    def spill_path(self, suffix=".bin"):
+        """Return a new file path in this budget's spill directory."""
+        with self._lock:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="preservr-spill-")
+                atexit.register(self.cleanup)
+            self._spill_count += 1
+            return os.path.join(self._spill_dir, f"spill-{self._spill_count}{suffix}")
+
+    def cleanup(self):
+        """Delete all spill files."""
+        with self._lock:
+            spill_dir, self._spill_dir = self._spill_dir, None
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+class BudgetView:
+    """
+    A MemoryBudget whose choice between parsing files whole and streaming
+    them is fixed in advance by an execution plan (see core/planner.py):
+    parse="stream" streams every file, parse="memory" parses every file whole.
+    Everything else is delegated to the underlying budget.
+    """
+
+    def __init__(self, budget, parse):
+        self.budget = budget
+        self.parse = parse
+
+    def try_reserve_file(self, nbytes):
+        if self.parse == "stream":
+            return False
+        self.budget.reserve(nbytes)
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self.budget, name)
+
+
+class ExternalIdSorter:
+    """
+    Collects ID arrays and returns their sorted distinct values, like
+    np.unique(np.concatenate(chunks)). Buffered IDs are sorted and spilled
+    to disk as runs whenever the budget cannot hold more of them; the runs
+    are then merged block by block into a disk-backed array.
+    """
+
+    def __init__(self, budget, dtype):
+        self.budget = budget
+        self.dtype = np.dtype(dtype)
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._runs = []
+
+    def add(self, ids):
+        ids = np.asarray(ids, dtype=self.dtype)
+        if not self.budget.try_reserve(ids.nbytes):
+            self._spill()
+            # A single chunk is always accepted once the buffer is empty.
+            self.budget.reserve(ids.nbytes)
+        self._buffer.append(ids)
+        self._buffered_bytes += ids.nbytes
+
+    def _release_buffer(self):
+        self.budget.release(self._buffered_bytes)
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def _spill(self):
+        if not self._buffer:
+            return
+        run = np.unique(np.concatenate(self._buffer))
+        path = self.budget.spill_path(".npy")
+        np.save(path, run)
+        self._runs.append(np.load(path, mmap_mode="r"))
+        self._release_buffer()
+
+    def result(self):
+        """Return the sorted distinct IDs; a np.memmap if any run was spilled."""
+        if not self._runs:
+            ids = np.unique(np.concatenate(self._buffer)) if self._buffer else np.zeros(0, dtype=self.dtype)
+            self._release_buffer()
+            return ids
+        self._spill()
+        return self._merge_runs()
+
+    def _merge_runs(self):
+        runs = self._runs
+        upper = max((int(run[-1]) for run in runs if len(run)), default=-1) + 1
+        total = sum(len(run) for run in runs)
+        # Split the ID range so each block holds about MERGE_BLOCK_IDS values.
+        blocks = max(1, -(-total // MERGE_BLOCK_IDS))
+        edges = np.linspace(0, upper, blocks + 1).astype(np.int64)
+
+        path = self.budget.spill_path(".ids")
+        written = 0
+        with open(path, "wb") as out:
+            for lo, hi in zip(edges[:-1], edges[1:]):
+                parts = [run[np.searchsorted(run, lo):np.searchsorted(run, hi)] for run in runs]
+                block = np.unique(np.concatenate(parts))
+                block.tofile(out)
+                written += len(block)
+        self._runs = []
+        if not written:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r", shape=(written,))
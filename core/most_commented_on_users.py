@@ -1,126 +1,283 @@
 """
-DEPRECATED: Preservr Data Visualizations
+Preservr Data Visualizations - Most Commented On Users
 Author: Luca Carnegie
 Description: This module provides visualization tools for analyzing and displaying
-             comment data for the Preservr project. It processes comment datasets
-             and generates a word cloud to visualize the most commented media owners by
-             the user.
-Input: Comment data files stored in the 'data' directory
+             comment data for the Preservr project. It counts comments per media owner
+             across every post_comments_N.json shard and generates a word cloud of the
+             media owners the user commented on most. Shards are counted in parallel
+             worker processes and the per-shard counters merged (map-reduce); optional
+             breakdowns count comments per month and per owner per month.
+Input: post_comments_1.json, post_comments_2.json, ... from the Instagram data archive
 Output: Visualization files saved to the 'OUTPUT_FOLDER' directory
 Date: 2025-04-16
 """
 
-import json
-import pandas as pd
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import argparse
 import os
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from wordcloud import WordCloud
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def find_file_in_subdirectories(folder_path, filename):
+from core.archive import find_numbered_files, open_records
+from core.encoders import finish_charts
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.sampling import DEFAULT_SAMPLE_SIZE, sample_records
+from core.schemas import get_schema
+from core.usernames import UsernameDictionary, for_archive, top_ids
+
+COMMENT_SHARD_STEM = "post_comments"
+# Below this many bytes of comment files, starting worker processes costs more than it saves.
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Upper bound on worker processes used to parse shards.
+MAX_PARSE_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+class CommentStats:
     """
-    Recursively search for the specified file in subdirectories.
+    Merged comment counts for an archive.
+
+    owner_counts is a Counter of comments per media owner; month_counts and
+    owner_month_counts ("YYYY-MM" keys, UTC) are only filled in when
+    breakdowns were requested.
+    """
+
+    def __init__(self, owner_counts=None, month_counts=None, owner_month_counts=None, comments=0, shards=0):
+        self.owner_counts = owner_counts if owner_counts is not None else Counter()
+        self.month_counts = month_counts if month_counts is not None else Counter()
+        self.owner_month_counts = owner_month_counts if owner_month_counts is not None else Counter()
+        self.comments = comments
+        self.shards = shards
+        # SampleInfo when the counts come from a preview sample (see sample_comment_stats).
+        self.sample = None
+
+    def merge(self, other):
+        """Add another set of counts (e.g. one shard's) into this one."""
+        self.owner_counts.update(other.owner_counts)
+        self.month_counts.update(other.month_counts)
+        self.owner_month_counts.update(other.owner_month_counts)
+        self.comments += other.comments
+        self.shards += other.shards
+        return self
+
+    def owner_count_array(self, usernames):
+        """Comments per owner as a count array indexed by username ID."""
+        ids = usernames.intern_many(self.owner_counts)
+        counts = np.zeros(len(usernames), dtype=np.int64)
+        counts[ids] = np.fromiter(self.owner_counts.values(), dtype=np.int64, count=len(ids))
+        return counts
+
+def count_comments(records, breakdowns=False):
+    """
+    Count comments per media owner in an iterable of comment records.
+    Comments without a media owner (or with owner "Unknown") are skipped.
+    """
+    months = Counter()
+    owner_months = Counter()
+    if not breakdowns:
+        comments, (owners,) = get_schema("post_comments").columns(records, "owner")
+        return CommentStats(Counter(owners), months, owner_months, comments, 1)
+
+    comments, (owners, stamps) = get_schema("post_comments").columns(records, "owner", "timestamp")
+    day_months = {}
+    for owner, timestamp in zip(owners, stamps):
+        if timestamp is None:
+            continue
+        # Comments cluster on few days; format each day's month only once.
+        day = int(timestamp) // 86400
+        month = day_months.get(day)
+        if month is None:
+            month = day_months[day] = time.strftime("%Y-%m", time.gmtime(day * 86400))
+        months[month] += 1
+        owner_months[owner, month] += 1
+    return CommentStats(Counter(owners), months, owner_months, comments, 1)
+
+def count_comment_shard(path, breakdowns=False, window=None):
+    """
+    Map step: parse one post_comments_N.json shard and count its comments.
+    Runs in a worker process, so it only returns plain picklable data.
+    """
+    with open_records(path, window=window) as records:
+        return count_comments(records, breakdowns)
+
+def load_comment_stats(paths, reporter=None, breakdowns=False, workers=None, budget=None, parallel=None,
+                       window=None):
     """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+    Count comments across all shards and merge the results in shard order.
 
-def most_commented_barchart(owner_counts, output_path):
+    Shards are parsed in parallel processes when there are several of them
+    and they are large enough to be worth it; under a limited memory budget
+    they are read one at a time (and streamed if a shard does not fit).
+    `parallel` overrides that choice, e.g. from an execution plan. With a
+    TimeWindow, only comments inside it are parsed into records and counted.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    sizes = [os.path.getsize(path) for path in paths]
+    total_bytes = sum(sizes)
+    workers = min(workers or MAX_PARSE_WORKERS, len(paths))
+    if parallel is None:
+        parallel = (workers > 1 and total_bytes >= PARALLEL_MIN_BYTES
+                    and (budget is None or not budget.limited))
+    parallel = parallel and len(paths) > 1
+
+    stats = CommentStats()
+    if not parallel:
+        for path in paths:
+            with open_records(path, None, reporter, budget, window) as records:
+                stats.merge(count_comments(reporter.iterate("aggregate", records), breakdowns))
+        return stats
+
+    reporter.start("parse", total_bytes)
+    partials = [None] * len(paths)
+    done_bytes = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(count_comment_shard, path, breakdowns, window): index
+                   for index, path in enumerate(paths)}
+        for future in as_completed(futures):
+            index = futures[future]
+            partials[index] = future.result()
+            done_bytes += sizes[index]
+            reporter.update("parse", done_bytes, total_bytes)
+
+    # Reduce step: merging in shard order keeps first-seen order deterministic.
+    for partial in reporter.iterate("aggregate", partials):
+        stats.merge(partial)
+    return stats
+
+def sample_comment_stats(paths, sample_size=DEFAULT_SAMPLE_SIZE, reporter=None, breakdowns=False, window=None):
+    """
+    Preview version of load_comment_stats: counts a sample of the comments in
+    every shard. The counts are those of the sample; `sample` holds its size
+    and the estimated number of comments.
+    """
+    records, info = sample_records(paths, sample_size, get_schema("post_comments").is_record, reporter=reporter)
+    if window is not None:
+        records = [record for record in records if window.contains_record(record)]
+    stats = count_comments(records, breakdowns)
+    stats.shards = len(paths)
+    stats.sample = info
+    return stats
+
+def most_commented_barchart(owner_counts, output_path, note=None):
     """
     Create a bar chart showing the number of comments per user.
 
     Args:
         owner_counts (DataFrame): DataFrame containing media owners and comment counts
         output_path (str): Path to save the visualization
+        note (str, optional): Added to the title, e.g. "preview from a 2% sample"
     """
     wordcloud_data = dict(zip(owner_counts["Media Owner"], owner_counts["Comment Count"]))
 
     wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(wordcloud_data)
 
-    plt.figure(figsize=(12, 8))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis("off")
-    plt.title("Accounts You Commented On Most")
-    plt.tight_layout()
+    with get_template("wordcloud_large").render() as (fig, ax):
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis("off")
+        ax.set_title("Accounts You Commented On Most" + (f" ({note})" if note else ""))
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path)
-    plt.close()
+        save_figure(fig, output_path, dpi="figure", bbox_inches=None)
+
+def owner_count_frame(stats, usernames):
+    """
+    Comments per media owner as a DataFrame, most commented first (ties by name).
+    """
+    counts = stats.owner_count_array(usernames)
+    ranked = top_ids(counts, usernames=usernames)
+    return pd.DataFrame({"Media Owner": usernames.names_for(ranked), "Comment Count": counts[ranked]})
 
-def load_data(data_path):
+def load_data(data_paths, reporter=None, usernames=None):
     """
-    Load the comment data from the JSON file.
+    Load the comment data from one or more post_comments JSON files.
 
     Args:
-        data_path (str): Path to the post_comments JSON file
+        data_paths (str or list): Path(s) to the post_comments_N JSON files
+        reporter (ProgressReporter, optional): Receives parse and aggregate progress
+        usernames (UsernameDictionary, optional): Archive-wide username IDs to intern into
 
     Returns:
         DataFrame: DataFrame containing media owners and comment counts
     """
+    if isinstance(data_paths, str):
+        data_paths = [data_paths]
+    usernames = usernames if usernames is not None else UsernameDictionary()
     try:
-        with open(data_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        media_owners = []
-        for comment in data:
-            try:
-                media_owner = comment["string_map_data"].get("Media Owner", {}).get("value", "Unknown")
-                media_owners.append(media_owner)
-            except (KeyError, TypeError):
-                media_owners.append("Unknown")
-
-        df = pd.DataFrame({"Media Owner": media_owners})
-        owner_counts = df["Media Owner"].value_counts().reset_index()
-        owner_counts.columns = ["Media Owner", "Comment Count"]
-        owner_counts = owner_counts[owner_counts["Media Owner"] != "Unknown"]
-
-        return owner_counts
-
+        return owner_count_frame(load_comment_stats(data_paths, reporter), usernames)
     except Exception as e:
         print(f"Error loading data: {e}")
         return pd.DataFrame(columns=["Media Owner", "Comment Count"])
 
-def process_comments(input_folder, output_path=None):
+def write_breakdowns(stats, output_folder, fmt="csv"):
+    """
+    Write the per-month and per-owner-per-month comment counts; returns the written paths.
+    """
+    from core.export import export_filename, write_table
+    by_month = os.path.join(output_folder, export_filename("comments_by_month", fmt))
+    by_owner_month = os.path.join(output_folder, export_filename("comments_by_owner_month", fmt))
+    write_table(by_month, ["Month", "Comments"], sorted(stats.month_counts.items()), fmt)
+    write_table(by_owner_month, ["Media Owner", "Month", "Comments"],
+                ((owner, month, count) for (owner, month), count in sorted(stats.owner_month_counts.items())), fmt)
+    return [by_month, by_owner_month]
+
+def process_comments(input_folder, output_path=None, reporter=None, breakdowns=False):
     """
     Process comments data and generate visualization.
 
     Args:
         input_folder (str): Path to the folder containing the data files
         output_path (str, optional): Path to save the visualization
+        reporter (ProgressReporter, optional): Receives progress for each stage
+        breakdowns (bool, optional): Also write per-month and per-owner-per-month counts
     """
+    reporter = reporter or ProgressReporter.from_env()
+    output_folder = os.path.join(input_folder, "OUTPUT_FOLDER")
     if output_path is None:
-        output_folder = os.path.join(input_folder, "OUTPUT_FOLDER")
-        os.makedirs(output_folder, exist_ok=True)
         output_path = os.path.join(output_folder, "post_comments.png")
 
-    comments_path = find_file_in_subdirectories(input_folder, "post_comments_1.json")
+    comment_paths = find_numbered_files(input_folder, COMMENT_SHARD_STEM, reporter)
 
-    if comments_path is None:
+    if not comment_paths:
         print(f"Error: Could not find post_comments_1.json in {input_folder} or its subdirectories")
         return False
 
-    owner_counts = load_data(comments_path)
+    stats = load_comment_stats(comment_paths, reporter, breakdowns)
+    owner_counts = owner_count_frame(stats, for_archive(input_folder))
+    print(f"Counted {stats.comments} comments in {stats.shards} file(s)")
+
+    if breakdowns:
+        for path in write_breakdowns(stats, output_folder):
+            print(f"Breakdown saved to: {path}")
 
     if not owner_counts.empty:
+        reporter.start("render", 1)
         most_commented_barchart(owner_counts, output_path)
+        reporter.update("render", 1, 1)
         return True
     else:
         return False
 
 def main():
-    if len(sys.argv) > 1:
-        input_folder = sys.argv[1]
-        output_folder = os.path.join(input_folder, "OUTPUT_FOLDER")
-        output_path = os.path.join(output_folder, "post_comments.png")
+    parser = argparse.ArgumentParser(description="Generate a word cloud of the accounts you commented on most.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("--breakdowns", action="store_true",
+                        help="also write comment counts per month and per account per month as CSV")
+    args = parser.parse_args()
 
-        success = process_comments(input_folder, output_path)
-        if success:
-            print(f"Visualization created at {output_path}")
-        else:
-            print("Failed to create visualization")
+    output_path = os.path.join(args.folder_path, "OUTPUT_FOLDER", "post_comments.png")
+    # The chart is written in the background; it exists once finish_charts() succeeds.
+    success = process_comments(args.folder_path, output_path, breakdowns=args.breakdowns) and finish_charts() == 0
+    if success:
+        print(f"Visualization created at {output_path}")
     else:
-        print("Please provide a folder path as a command-line argument")
+        print("Failed to create visualization")
 
 if __name__ == "__main__":
     main()
@@ -8,128 +8,281 @@ Output: Bar chart visualization saved in the output folder
 Date: 2025-04-16
 """
 
-import json
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+import argparse
 import sys
 import os
-from collections import Counter
 
-def find_file_in_subdirectories(folder_path, filename):
-    """
-    Recursively search for the specified file in subdirectories.
-    """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_file_in_subdirectories, iter_json_records, open_records
+from core.encoders import finish_charts
+from core.progress import ProgressReporter, print_line
+from core.rendering import get_template, save_figure
+from core.usernames import for_archive, align, top_ids
+from core.heavy_hitters import DEFAULT_CAPACITY, SpaceSaving, HeavyHitter, guaranteed_top
+from core.memory import STREAM_CHUNK_RECORDS
+from core.sampling import DEFAULT_SAMPLE_SIZE, CountEstimate, SampleInfo, print_estimates, sample_records
+from core.schemas import get_schema
+
+def _no_counts():
+    """Empty count array returned when a file is missing or unreadable."""
+    return np.zeros(0, dtype=np.int64)
+
+def _chunk_size(budget):
+    """Count in chunks only when a memory budget is in force."""
+    return STREAM_CHUNK_RECORDS if budget is not None and budget.limited else None
+
+def _owners(path, schema, reporter, budget, window, stream):
+    """Generator over the owner of every like record in a file (see story_like_titles)."""
+    if stream:
+        object_hook = window.object_hook if window is not None else None
+        yield from schema.values("owner", reporter.iterate("aggregate", iter_json_records(
+            path, schema.records_key, reporter, object_hook)))
+        return
+    with open_records(path, schema.records_key, reporter, budget, window) as entries:
+        yield from schema.values("owner", reporter.iterate("aggregate", entries))
 
-def load_story_likes_data(folder_path):
+def story_like_titles(folder_path, reporter=None, budget=None, window=None, stream=False):
     """
-    Load and parse story likes data from story_likes.json
-    Returns a dictionary of usernames and their like counts
+    Locate and parse story_likes.json
+    Returns a generator over the username of every story like, or None if the file is missing
+    The file is streamed instead of parsed whole when `budget` cannot hold it, or always with stream=True
+    With a TimeWindow, only likes inside it are parsed into records
     """
+    reporter = reporter or ProgressReporter(enabled=False)
+
     # Find story_likes.json file
-    story_likes_path = find_file_in_subdirectories(folder_path, "story_likes.json")
+    story_likes_path = find_file_in_subdirectories(folder_path, "story_likes.json", reporter)
     
     if story_likes_path is None:
-        print(f"Warning: Could not find story_likes.json in {folder_path} or its subdirectories")
-        return {}
+        print_line(f"Warning: Could not find story_likes.json in {folder_path} or its subdirectories")
+        return None
     
-    # Load and parse the JSON data
-    try:
-        with open(story_likes_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-        
-        # Extract story likes
-        likes = [entry["title"] for entry in data.get("story_activities_story_likes", [])]
-        
-        # Count occurrences of each username
-        return dict(Counter(likes))
-    
-    except Exception as e:
-        print(f"Error loading story likes data: {e}")
-        return {}
+    return _owners(story_likes_path, get_schema("story_likes"), reporter, budget, window, stream)
 
-def load_post_likes_data(folder_path):
+def post_like_titles(folder_path, reporter=None, budget=None, window=None, stream=False):
     """
-    Load and parse post likes data from liked_posts.json
-    Returns a dictionary of usernames and their like counts
+    Locate and parse liked_posts.json
+    Returns a generator over the media owner of every liked post, or None if the file is missing
+    The file is streamed instead of parsed whole when `budget` cannot hold it, or always with stream=True
+    With a TimeWindow, only likes inside it are parsed into records
     """
+    reporter = reporter or ProgressReporter(enabled=False)
+
     # Find liked_posts.json file
-    liked_posts_path = find_file_in_subdirectories(folder_path, "liked_posts.json")
+    liked_posts_path = find_file_in_subdirectories(folder_path, "liked_posts.json", reporter)
     
     if liked_posts_path is None:
-        print(f"Warning: Could not find liked_posts.json in {folder_path} or its subdirectories")
-        return {}
+        print_line(f"Warning: Could not find liked_posts.json in {folder_path} or its subdirectories")
+        return None
     
-    # Load and parse the JSON data
+    return _owners(liked_posts_path, get_schema("liked_posts"), reporter, budget, window, stream)
+
+def load_story_likes_data(folder_path, reporter=None, usernames=None, budget=None, window=None):
+    """
+    Load and parse story likes data from story_likes.json
+    Returns an array of like counts indexed by username ID in the archive's
+    UsernameDictionary; with a memory budget, counts are merged chunk by chunk
+    """
+    usernames = usernames if usernames is not None else for_archive(folder_path)
     try:
-        with open(liked_posts_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        titles = story_like_titles(folder_path, reporter, budget, window)
+        if titles is None:
+            return _no_counts()
         
-        # Extract titles (media owners) from the data
-        media_titles = []
-        for item in data.get("likes_media_likes", []):
-            title = item.get("title", "")
-            if title and title != "Unknown":
-                media_titles.append(title)
+        # Intern story likers as they are extracted and count each username
+        return usernames.count_names(titles, _chunk_size(budget))
+    
+    except Exception as e:
+        print_line(f"Error loading story likes data: {e}")
+        return _no_counts()
+
+def load_post_likes_data(folder_path, reporter=None, usernames=None, budget=None, window=None):
+    """
+    Load and parse post likes data from liked_posts.json
+    Returns an array of like counts indexed by username ID in the archive's
+    UsernameDictionary; with a memory budget, counts are merged chunk by chunk
+    """
+    usernames = usernames if usernames is not None else for_archive(folder_path)
+    try:
+        titles = post_like_titles(folder_path, reporter, budget, window)
+        if titles is None:
+            return _no_counts()
         
-        # Count occurrences of each username
-        return dict(Counter(media_titles))
+        # Intern media owners as they are extracted and count each username
+        return usernames.count_names(titles, _chunk_size(budget))
     
     except Exception as e:
-        print(f"Error loading post likes data: {e}")
-        return {}
+        print_line(f"Error loading post likes data: {e}")
+        return _no_counts()
+
+def load_story_likes_sketch(folder_path, reporter=None, capacity=DEFAULT_CAPACITY, window=None):
+    """
+    Approximate version of load_story_likes_data with a fixed memory budget
+    Returns a SpaceSaving sketch tracking at most `capacity` usernames
+    The file is always streamed, so memory stays fixed however large it is
+    """
+    try:
+        sketch = SpaceSaving(capacity)
+        titles = story_like_titles(folder_path, reporter, window=window, stream=True)
+        if titles is not None:
+            sketch.extend(titles)
+        return sketch
+    except Exception as e:
+        print_line(f"Error loading story likes data: {e}")
+        return SpaceSaving(capacity)
 
-def combine_like_data(story_likes, post_likes):
+def load_post_likes_sketch(folder_path, reporter=None, capacity=DEFAULT_CAPACITY, window=None):
     """
-    Combine story likes and post likes data and find the top users by total likes
+    Approximate version of load_post_likes_data with a fixed memory budget
+    Returns a SpaceSaving sketch tracking at most `capacity` usernames
+    The file is always streamed, so memory stays fixed however large it is
+    """
+    try:
+        sketch = SpaceSaving(capacity)
+        titles = post_like_titles(folder_path, reporter, window=window, stream=True)
+        if titles is not None:
+            sketch.extend(titles)
+        return sketch
+    except Exception as e:
+        print_line(f"Error loading post likes data: {e}")
+        return SpaceSaving(capacity)
+
+def sketch_count_estimate(sketch, usernames):
+    """
+    Convert a SpaceSaving sketch into a CountEstimate indexed by username ID
+    Untracked usernames get a count of 0 with the sketch's minimum as upper bound
+    """
+    ids = usernames.intern_many(sketch.items())
+    size = len(usernames)
+    counts = np.zeros(size, dtype=np.int64)
+    lower = np.zeros(size, dtype=np.int64)
+    upper = np.full(size, sketch.min_count(), dtype=np.int64)
+    entries = [sketch.estimate(name) for name in sketch.items()]
+    counts[ids] = upper[ids] = [count for count, _ in entries]
+    lower[ids] = [count - error for count, error in entries]
+    return CountEstimate.from_bounds(counts, lower, upper, note="approximate")
+
+def _sample_like_counts(path, dataset, sample_size, usernames, reporter, window=None):
+    """
+    Estimate like counts per username from a sample of a likes file
+    Returns a CountEstimate indexed by username ID; all zeros if the file is missing
+    With a TimeWindow, sampled likes outside it count as zero
+    """
+    if not path:
+        return CountEstimate(np.zeros(len(usernames), dtype=np.int64), SampleInfo(0, 0, True))
+    schema = get_schema(dataset)
+    records, info = sample_records([path], sample_size, schema.is_record, schema.records_key, reporter)
+    if window is not None:
+        records = [record for record in records if window.contains_record(record)]
+    counts = usernames.count_names(schema.values("owner", records))
+    return CountEstimate(align(counts, len(usernames)), info)
+
+def sample_story_likes(path, sample_size=DEFAULT_SAMPLE_SIZE, usernames=None, reporter=None, window=None):
+    """
+    Preview version of load_story_likes_data for a story_likes.json path
+    """
+    return _sample_like_counts(path, "story_likes", sample_size, usernames, reporter, window)
+
+def sample_post_likes(path, sample_size=DEFAULT_SAMPLE_SIZE, usernames=None, reporter=None, window=None):
+    """
+    Preview version of load_post_likes_data for a liked_posts.json path
+    """
+    return _sample_like_counts(path, "liked_posts", sample_size, usernames, reporter, window)
+
+def combine_like_data(story_likes, post_likes, usernames):
+    """
+    Combine story likes and post likes count arrays and find the top users by total likes
     Returns a DataFrame with columns for username, story likes, post likes, and total likes
     """
-    # Get all unique usernames
-    all_users = set(story_likes.keys()) | set(post_likes.keys())
-    
-    # Create lists for DataFrame
-    usernames = []
-    story_like_counts = []
-    post_like_counts = []
-    total_likes = []
-    
-    # Populate the lists
-    for user in all_users:
-        story_count = story_likes.get(user, 0)
-        post_count = post_likes.get(user, 0)
-        total = story_count + post_count
-        
-        usernames.append(user)
-        story_like_counts.append(story_count)
-        post_like_counts.append(post_count)
-        total_likes.append(total)
+    # Both arrays share the archive's IDs; pad them to the same length
+    size = len(usernames)
+    story_counts = align(story_likes, size)
+    post_counts = align(post_likes, size)
+    total_counts = story_counts + post_counts
+
+    # Users with at least one like, by total likes in descending order (ties by name)
+    ranked = top_ids(total_counts, usernames=usernames)
     
-    # Create DataFrame
     df = pd.DataFrame({
-        "Username": usernames,
-        "Story Likes": story_like_counts,
-        "Post Likes": post_like_counts,
-        "Total Likes": total_likes
+        "Username": usernames.names_for(ranked),
+        "Story Likes": story_counts[ranked],
+        "Post Likes": post_counts[ranked],
+        "Total Likes": total_counts[ranked]
     })
     
-    # Sort by total likes in descending order
-    df = df.sort_values(by="Total Likes", ascending=False)
-    
     return df
 
-def create_bar_chart(data, folder_path):
+def combine_like_estimates(story_estimate, post_estimate, usernames):
     """
-    Create a side-by-side bar chart showing the top 5 users by total likes
+    Combine story likes and post likes CountEstimates from a preview
+    Returns the columns of combine_like_data plus the low and high end of
+    each estimate's confidence interval, and prints those of the top 5 users
     """
-    # Get the top 5 users
-    top_users = data.head(5)
+    size = len(usernames)
+    story = {name: align(getattr(story_estimate, name), size) for name in ("counts", "lower", "upper")}
+    post = {name: align(getattr(post_estimate, name), size) for name in ("counts", "lower", "upper")}
+    ranked = top_ids(story["counts"] + post["counts"], usernames=usernames)
+
+    for estimate, unit in ((story_estimate, "story likes"), (post_estimate, "post likes")):
+        print_estimates(estimate, usernames, ranked[:5], unit)
+
+    return pd.DataFrame({
+        "Username": usernames.names_for(ranked),
+        "Story Likes": story["counts"][ranked],
+        "Post Likes": post["counts"][ranked],
+        "Total Likes": story["counts"][ranked] + post["counts"][ranked],
+        "Story Likes Low": story["lower"][ranked],
+        "Story Likes High": story["upper"][ranked],
+        "Post Likes Low": post["lower"][ranked],
+        "Post Likes High": post["upper"][ranked],
+    })
+
+def combine_like_sketches(story_sketch, post_sketch):
+    """
+    Combine story likes and post likes sketches into approximate totals
+    Returns the same columns as combine_like_data plus "Error": each total may
+    overstate the true total by at most that much
+    """
+    rows = []
+    for user in set(story_sketch.items()) | set(post_sketch.items()):
+        story_count, story_error = story_sketch.estimate(user)
+        post_count, post_error = post_sketch.estimate(user)
+        rows.append((user, story_count, post_count, story_count + post_count, story_error + post_error))
     
-    # Set up the figure
-    fig, ax = plt.subplots(figsize=(12, 8))
+    df = pd.DataFrame(rows, columns=["Username", "Story Likes", "Post Likes", "Total Likes", "Error"])
+    df = df.sort_values(by=["Total Likes", "Username"], ascending=[False, True], kind="stable")
     
+    return df.reset_index(drop=True)
+
+def report_error_bounds(data, top_n=5):
+    """
+    Print the error bounds of the top approximate entries
+    """
+    entries = [
+        HeavyHitter(user, total, error)
+        for user, total, error in zip(data["Username"], data["Total Likes"], data["Error"])
+    ]
+    certain = {entry.item for entry in guaranteed_top(entries, top_n)}
+    for entry in entries[:top_n]:
+        marker = "" if entry.item in certain else " (rank uncertain)"
+        print(f"{entry.item}: {entry.count - entry.error}..{entry.count} likes{marker}")
+
+def _error_bars(data, column):
+    """Distances from each estimate to its interval ends, or None for exact counts"""
+    if f"{column} Low" not in data:
+        return None
+    return [data[column] - data[f"{column} Low"], data[f"{column} High"] - data[column]]
+
+def draw_like_bars(ax, top_users, note=None):
+    """
+    Draw side-by-side story and post like bars for top_users on ax
+    Shared by the bar chart and the dashboard panel (see core/dashboard.py)
+    """
     # Set width of bars
     bar_width = 0.35
     
@@ -138,45 +291,80 @@ def create_bar_chart(data, folder_path):
     positions2 = [x + bar_width for x in positions1]
     
     # Create bars with blue and red colors as requested
-    ax.bar(positions1, top_users["Story Likes"], width=bar_width, color='blue', label='Story Likes')
-    ax.bar(positions2, top_users["Post Likes"], width=bar_width, color='red', label='Post Likes')
+    ax.bar(positions1, top_users["Story Likes"], width=bar_width, color='blue', label='Story Likes',
+           yerr=_error_bars(top_users, "Story Likes"), capsize=4)
+    ax.bar(positions2, top_users["Post Likes"], width=bar_width, color='red', label='Post Likes',
+           yerr=_error_bars(top_users, "Post Likes"), capsize=4)
     
     # Add labels, title, and legend
     ax.set_xlabel('Users')
     ax.set_ylabel('Number of Likes')
-    ax.set_title('Top 5 Users by Combined Likes')
+    title = 'Top 5 Users by Combined Likes'
+    if note:
+        title += f' ({note})'
+    elif "Error" in top_users:
+        title += ' (approximate)'
+    ax.set_title(title)
     ax.set_xticks([r + bar_width/2 for r in range(len(top_users))])
     ax.set_xticklabels(top_users["Username"], rotation=45, ha='right')
     ax.legend()
-    
-    plt.tight_layout()
+
+def create_bar_chart(data, folder_path, reporter=None, note=None):
+    """
+    Create a side-by-side bar chart showing the top 5 users by total likes
+    A note such as "preview from a 2% sample" is added to the title; preview
+    data (see combine_like_estimates) gets error bars
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    reporter.start("render", 1)
+
+    # Get the top 5 users
+    top_users = data.head(5)
     
     # Define the output path inside OUTPUT_FOLDER
     output_folder = os.path.join(folder_path, "OUTPUT_FOLDER")
-    os.makedirs(output_folder, exist_ok=True)
     output_path = os.path.join(output_folder, "most_liked_users_barchart.png")
     
-    # Save as PNG
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    print(f"Visualization saved to: {output_path}")
-    plt.close()
+    # Draw on the reusable bar chart figure
+    with get_template("bar_chart").render() as (fig, ax):
+        draw_like_bars(ax, top_users, note)
+        
+        # Save as PNG
+        save_figure(fig, output_path, message="Visualization saved to: {path}")
+    reporter.update("render", 1, 1)
 
-def process_likes_data(folder_path):
+def process_likes_data(folder_path, reporter=None, approximate=False, capacity=DEFAULT_CAPACITY):
     """
     Main function to process likes data and generate visualization
+    With approximate=True, counts are kept in fixed-size sketches of `capacity` usernames
     """
+    reporter = reporter or ProgressReporter.from_env()
+
+    if approximate:
+        story_sketch = load_story_likes_sketch(folder_path, reporter, capacity)
+        post_sketch = load_post_likes_sketch(folder_path, reporter, capacity)
+        if not story_sketch.total and not post_sketch.total:
+            print("Error: No data found in either story_likes.json or liked_posts.json")
+            return False
+        combined_data = combine_like_sketches(story_sketch, post_sketch)
+        report_error_bounds(combined_data)
+        create_bar_chart(combined_data, folder_path, reporter)
+        return True
+
+    usernames = for_archive(folder_path)
+
     # Load data
-    story_likes = load_story_likes_data(folder_path)
-    post_likes = load_post_likes_data(folder_path)
+    story_likes = load_story_likes_data(folder_path, reporter, usernames)
+    post_likes = load_post_likes_data(folder_path, reporter, usernames)
     
     # Check if we have any data
-    if not story_likes and not post_likes:
+    if not story_likes.any() and not post_likes.any():
         print("Error: No data found in either story_likes.json or liked_posts.json")
         return False
     
     # Combine data and create visualization
-    combined_data = combine_like_data(story_likes, post_likes)
-    create_bar_chart(combined_data, folder_path)
+    combined_data = combine_like_data(story_likes, post_likes, usernames)
+    create_bar_chart(combined_data, folder_path, reporter)
     
     return True
 
@@ -184,12 +372,16 @@ def main():
     """
     Entry point for the script
     """
-    if len(sys.argv) < 2:
-        print("Usage: python most_liked_users.py <folder_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Chart the top 5 users by combined story and post likes.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("--approximate", action="store_true",
+                        help="use a fixed-memory heavy-hitters sketch instead of exact counts")
+    parser.add_argument("--sketch-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help=f"usernames tracked in approximate mode (default: {DEFAULT_CAPACITY})")
+    args = parser.parse_args()
 
-    folder = sys.argv[1]
-    process_likes_data(folder)
+    process_likes_data(args.folder_path, approximate=args.approximate, capacity=args.sketch_capacity)
+    sys.exit(finish_charts())
 
 if __name__ == "__main__":
     main()
@@ -12,28 +12,32 @@ Date: 2025-04-16
 """
 
 
-import json
-import matplotlib.pyplot as plt
 import pandas as pd
 from wordcloud import WordCloud
+import argparse
 import sys
 import os
 
-titles = []
-title_counts = None
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from core.archive import find_file_in_subdirectories, iter_json_records, load_json
+from core.encoders import finish_charts
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.schemas import get_schema
+from core.usernames import for_archive, top_ids
+from core.heavy_hitters import DEFAULT_CAPACITY, SpaceSaving
 
-def find_file_in_subdirectories(folder_path, filename):
-    """
-    Recursively search for the specified file in subdirectories.
-    """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+# WordCloud draws at most this many words, so approximate runs only keep the top ones.
+WORDCLOUD_MAX_WORDS = 200
 
+titles = []
+title_counts = None
 
-def most_liked_wordcloud(folder_path):
+
+def most_liked_wordcloud(folder_path, reporter=None):
     """
     Create a wordcloud showing the number of likes per title (media owner).
     Saves output image to OUTPUT_FOLDER.
@@ -42,69 +46,89 @@ def most_liked_wordcloud(folder_path):
 
     # Create a dictionary of titles and their like counts
     wordcloud_data = dict(zip(title_counts["Title"], title_counts["Like Count"]))
+    render_liked_posts_wordcloud(wordcloud_data, folder_path, "Error" in title_counts, reporter)
+
+
+def render_liked_posts_wordcloud(wordcloud_data, folder_path, approximate=False, reporter=None, note=None):
+    """
+    Draw the liked posts wordcloud from {title: like count} and save it to OUTPUT_FOLDER.
+    A note such as "preview from a 2% sample" is added to the title.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+    reporter.start("render", 1)
 
     # Generate the wordcloud
     wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(wordcloud_data)
 
-    # Plot the wordcloud
-    plt.figure(figsize=(12, 8))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis("off")
-    plt.title("Most Liked Users (Posts)")
-    plt.tight_layout()
-
     # Define the output path inside OUTPUT_FOLDER
     output_folder = os.path.join(folder_path, "OUTPUT_FOLDER")
-    os.makedirs(output_folder, exist_ok=True)
     output_path = os.path.join(output_folder, "liked_posts_wordcloud.png")
 
-    # Save as PNG
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    print(f"Visualization saved to: {output_path}")
-    plt.close()
+    # Plot the wordcloud and save as PNG
+    with get_template("wordcloud_large").render() as (fig, ax):
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis("off")
+        note = note or ("approximate" if approximate else None)
+        ax.set_title("Most Liked Users (Posts)" + (f" ({note})" if note else ""))
+        save_figure(fig, output_path, message="Visualization saved to: {path}")
+    reporter.update("render", 1, 1)
 
 
-def load_data(folder_path):
+def load_data(folder_path, reporter=None, approximate=False, capacity=DEFAULT_CAPACITY):
     """
     Load the liked posts data from the JSON file in the specified folder.
+    With approximate=True, likes are counted in a fixed-size sketch of `capacity`
+    usernames and title_counts gets an extra "Error" column.
     """
     global titles, title_counts
+    reporter = reporter or ProgressReporter(enabled=False)
 
-    liked_posts_path = find_file_in_subdirectories(folder_path, "liked_posts.json")
+    liked_posts_path = find_file_in_subdirectories(folder_path, "liked_posts.json", reporter)
 
     if liked_posts_path is None:
         print(f"Error: Could not find liked_posts.json in {folder_path} or its subdirectories")
         return
 
-    with open(liked_posts_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-
-    media_titles = []
-    for item in data.get("likes_media_likes", []):
-        try:
-            title = item.get("title", "Unknown")
-            if title:
-                media_titles.append(title)
-        except (KeyError, TypeError):
-            continue
+    # Approximate runs stream the file so memory stays fixed
+    schema = get_schema("liked_posts")
+    if approximate:
+        records = iter_json_records(liked_posts_path, schema.records_key, reporter)
+    else:
+        records = schema.records(load_json(liked_posts_path, reporter))
+    media_titles = schema.values("owner", reporter.iterate("aggregate", records))
+
+    if approximate:
+        # Count titles in a fixed-memory sketch; only the top words are drawn
+        sketch = SpaceSaving(capacity)
+        sketch.extend(media_titles)
+        titles = None
+        title_counts = pd.DataFrame(sketch.top(WORDCLOUD_MAX_WORDS), columns=["Title", "Like Count", "Error"])
+        return
 
-    df = pd.DataFrame({"Title": media_titles})
-    title_counts = df["Title"].value_counts().reset_index()
-    title_counts.columns = ["Title", "Like Count"]
-    titles = df
+    # Count likes per interned username ID instead of per string
+    usernames = for_archive(folder_path)
+    title_ids = usernames.intern_many(media_titles)
+    counts = usernames.counts(title_ids)
+    titles = title_ids
 
-    # Remove unknown entries
-    title_counts = title_counts[title_counts["Title"] != "Unknown"]
+    ranked = top_ids(counts)
+    title_counts = pd.DataFrame({"Title": usernames.names_for(ranked), "Like Count": counts[ranked]})
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python liked_posts.py <folder_path>")
-        sys.exit(1)
-
-    folder = sys.argv[1]
-    load_data(folder)
-    most_liked_wordcloud(folder)
+    parser = argparse.ArgumentParser(description="Generate a word cloud of the users whose posts you liked most.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("--approximate", action="store_true",
+                        help="use a fixed-memory heavy-hitters sketch instead of exact counts")
+    parser.add_argument("--sketch-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help=f"usernames tracked in approximate mode (default: {DEFAULT_CAPACITY})")
+    args = parser.parse_args()
+
+    folder = args.folder_path
+    reporter = ProgressReporter.from_env()
+    load_data(folder, reporter, approximate=args.approximate, capacity=args.sketch_capacity)
+    most_liked_wordcloud(folder, reporter)
+    sys.exit(finish_charts())
 
 
 if __name__ == "__main__":
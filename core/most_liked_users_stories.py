@@ -11,28 +11,35 @@ Output: Visualization files saved to the 'OUTPUT_FOLDER' directory
 Date: 2025-04-16
 """
 
+import argparse
 import os
 import sys
-import json
-import matplotlib.pyplot as plt
-from collections import Counter
 from wordcloud import WordCloud
 
-def find_file_in_subdirectories(folder_path, filename):
-    """
-    Recursively search for the specified file in subdirectories.
-    """
-    for root, _, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_file_in_subdirectories, iter_json_records, load_json
+from core.encoders import finish_charts
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.schemas import get_schema
+from core.usernames import for_archive
+from core.heavy_hitters import DEFAULT_CAPACITY, SpaceSaving
+
+# WordCloud draws at most this many words, so approximate runs only keep the top ones.
+WORDCLOUD_MAX_WORDS = 200
 
-def generate_story_likes_wordcloud(folder_path):
+def generate_story_likes_wordcloud(folder_path, reporter=None, approximate=False, capacity=DEFAULT_CAPACITY):
     """
     Generate a word cloud visualization based on story likes data.
     Saves the output image to an OUTPUT_FOLDER inside the provided folder_path.
+    With approximate=True, likes are counted in a fixed-size sketch of `capacity` usernames.
     """
-    input_path = find_file_in_subdirectories(folder_path, "story_likes.json")
+    reporter = reporter or ProgressReporter.from_env()
+
+    input_path = find_file_in_subdirectories(folder_path, "story_likes.json", reporter)
     if input_path is None:
         print(f"Error: story_likes.json not found in {folder_path} or its subdirectories")
         return
@@ -43,24 +50,53 @@ def generate_story_likes_wordcloud(folder_path):
 
     output_path = os.path.join(output_folder, "story_likes_visualization.png")
 
-    # Load JSON data
-    with open(input_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-
-    # Extract liked story titles
-    likes = [entry["title"] for entry in data.get("story_activities_story_likes", [])]
-
-    # Count occurrences of each user/title
-    like_counts = Counter(likes)
-
-    if not like_counts:
-        print("No story likes data found.")
-        return
-
-    # Get most active liker
-    most_active_liker, max_likes = like_counts.most_common(1)[0]
+    # Load JSON data; approximate runs stream it so memory stays fixed
+    schema = get_schema("story_likes")
+    if approximate:
+        records = iter_json_records(input_path, schema.records_key, reporter)
+    else:
+        records = schema.records(load_json(input_path, reporter))
+    likers = schema.values("owner", reporter.iterate("aggregate", records))
+
+    if approximate:
+        # Count likers in a fixed-memory sketch; only the top words are drawn
+        sketch = SpaceSaving(capacity)
+        sketch.extend(likers)
+
+        if not sketch.total:
+            print("No story likes data found.")
+            return
+
+        most_active_liker, max_likes, max_error = sketch.top(1)[0]
+        like_counts = sketch.frequencies(WORDCLOUD_MAX_WORDS)
+        print(f"Most active liker (approximate): {most_active_liker}, {max_likes - max_error}..{max_likes} likes")
+    else:
+        # Extract liked story titles as username IDs
+        usernames = for_archive(folder_path)
+        like_ids = usernames.intern_many(likers)
+
+        # Count occurrences of each user/title
+        counts = usernames.counts(like_ids)
+
+        if not counts.any():
+            print("No story likes data found.")
+            return
+
+        # Get most active liker
+        most_active_liker, max_likes = usernames.names[counts.argmax()], int(counts.max())
+        like_counts = usernames.to_dict(counts)
+
+    render_story_likes_wordcloud(like_counts, output_path, approximate, reporter)
+
+def render_story_likes_wordcloud(like_counts, output_path, approximate=False, reporter=None, note=None):
+    """
+    Draw the story likes word cloud from {username: like count} and save it to output_path.
+    A note such as "preview from a 2% sample" is added to the title.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
 
     # Generate Word Cloud
+    reporter.start("render", 1)
     wc = WordCloud(
         width=800,
         height=500,
@@ -68,20 +104,25 @@ def generate_story_likes_wordcloud(folder_path):
         colormap="coolwarm"
     ).generate_from_frequencies(like_counts)
 
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wc, interpolation="bilinear")
-    plt.axis("off")
-    plt.title(f"Most Liked Users (Stories)")
+    with get_template("wordcloud").render() as (fig, ax):
+        ax.imshow(wc, interpolation="bilinear")
+        ax.axis("off")
+        note = note or ("approximate" if approximate else None)
+        ax.set_title("Most Liked Users (Stories)" + (f" ({note})" if note else ""))
 
-    # Save to OUTPUT_FOLDER
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    print(f"Visualization saved to: {output_path}")
+        # Save to OUTPUT_FOLDER
+        save_figure(fig, output_path, message="Visualization saved to: {path}")
+    reporter.update("render", 1, 1)
 
 # Entry point for CLI usage
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python story_likes_visualization.py <folder_path>")
-        sys.exit(1)
-
-    folder = sys.argv[1]
-    generate_story_likes_wordcloud(folder)
+    parser = argparse.ArgumentParser(description="Generate a word cloud of the users who liked your stories.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("--approximate", action="store_true",
+                        help="use a fixed-memory heavy-hitters sketch instead of exact counts")
+    parser.add_argument("--sketch-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help=f"usernames tracked in approximate mode (default: {DEFAULT_CAPACITY})")
+    args = parser.parse_args()
+
+    generate_story_likes_wordcloud(args.folder_path, approximate=args.approximate, capacity=args.sketch_capacity)
+    sys.exit(finish_charts())
@@ -0,0 +1,240 @@
+"""
+Preservr Data Visualizations - Pipeline
+
+Description: Command-line entry point that runs any set of registered analyses
+             through the dependency-graph scheduler, sharing parsed datasets and
+             intermediate tables between them. With --watch it keeps running and
+             re-runs only the analyses affected by files that change in the archive.
+             With --preview, analyses of large files first draw an approximate chart
+             from a sample of the records, then replace it with the exact one. The
+             execution plan (how each table is parsed and counted) is printed before
+             a run and can be forced with --parse, --aggregate and --load. With
+             --since/--until, only records inside that date range are parsed.
+             Charts are written in the format chosen with --format (PNG, WebP,
+             JPEG, SVG or PDF) at --dpi, and the size and encode time of each
+             chart are reported. With --snapshot, the folder is a snapshot store
+             (core/snapshots.py) and the analyses run on the chosen snapshot.
+Input: An Instagram archive folder and optional analysis names
+Output: The analyses' artifacts saved to the 'OUTPUT_FOLDER' directory
+Date: 2026-10-19
+"""
+
+import argparse
+import os
+import sys
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.encoders import (DEFAULT_DPI, DEFAULT_ENCODERS, DEFAULT_PNG_LEVEL, DEFAULT_QUALITY, IMAGE_FORMATS,
+                           OutputOptions, configure_output)
+from core.export import EXPORT_FORMATS
+from core.memory import parse_size
+from core.planner import AGGREGATE_MODES, AUTO, LOAD_MODES, PARSE_MODES
+from core.progress import ProgressReporter
+from core.registry import ANALYSES
+from core.sampling import DEFAULT_SAMPLE_SIZE, PREVIEW_MIN_BYTES
+from core.scheduler import AnalysisScheduler, DEFAULT_WORKERS, MISSING_FILES, SUCCEEDED
+from core.watch import DEFAULT_INTERVAL, describe_changes, watch
+from core.window import TimeWindow
+
+
+def print_results(results, reporter=None, preview=False):
+    """Print one line per analysis result, its charts' sizes and timings, and their totals."""
+    label = "preview " if preview else ""
+    encodes = []
+    for name, result in results.items():
+        if result.status == SUCCEEDED:
+            print(f"[{name}] {label}{result.status}: {', '.join(result.artifacts)}", flush=True)
+            for job in result.encodes:
+                print(f"[{name}]   {job.describe()}", flush=True)
+            encodes.extend(result.encodes)
+        else:
+            print(f"[{name}] {label}{result.status}: {result.error}", flush=True)
+        if reporter is not None:
+            reporter.result(name, result.status, result.artifacts, preview)
+    if encodes:
+        print(f"Charts: {len(encodes)} written, {sum(job.bytes for job in encodes) / 1024 ** 2:,.1f} MB, "
+              f"render {sum(job.render_seconds for job in encodes):.2f}s, "
+              f"encode {sum(job.encode_seconds for job in encodes):.2f}s", flush=True)
+
+
+def _input_bytes(analysis, paths):
+    """Total size of an analysis' input files that are present."""
+    keys = analysis.inputs + analysis.optional_inputs
+    return sum(os.path.getsize(paths[key]) for key in keys if paths.get(key))
+
+
+def preview_analyses(scheduler, analysis_names, min_bytes=PREVIEW_MIN_BYTES):
+    """
+    The analyses among analysis_names worth previewing: those that support it,
+    can run, read at least min_bytes and whose tables are not already built.
+    """
+    paths = scheduler.paths if scheduler.paths is not None else scheduler.locate()
+    return [
+        name for name in analysis_names
+        if ANALYSES[name].previewable
+        and not ANALYSES[name].missing_files(paths)
+        and not set(ANALYSES[name].tables) <= set(scheduler.tables)
+        and _input_bytes(ANALYSES[name], paths) >= min_bytes
+    ]
+
+
+def run_preview(scheduler, analysis_names, sample_size, reporter=None):
+    """Draw sampled previews of the analyses worth previewing and report them."""
+    names = preview_analyses(scheduler, analysis_names)
+    if not names:
+        return
+    previewer = AnalysisScheduler(scheduler.folder_path, scheduler.max_workers, reporter, sample_size=sample_size,
+                                  window=scheduler.window, output=scheduler.output)
+    previewer.paths = scheduler.paths
+    print_results(previewer.run(names), reporter, preview=True)
+
+
+def parse_args(argv=None):
+    """Parse and validate pipeline arguments; max_memory is converted to bytes."""
+    parser = argparse.ArgumentParser(prog="pipeline.py", description="Run Preservr analyses on an Instagram archive.")
+    parser.add_argument("folder_path", help="Instagram archive folder")
+    parser.add_argument("analyses", nargs="*", metavar="analysis",
+                        help=f"analyses to run (default: all). Choices: {', '.join(ANALYSES)}")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"maximum analyses or tables computed at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--max-memory", metavar="SIZE",
+                        help="approximate memory limit for loading, e.g. 512M or 2G; larger files are "
+                             "streamed and spilled to disk (default: no limit)")
+    parser.add_argument("--export", choices=EXPORT_FORMATS,
+                        help="also write each analysis' aggregated table in this format")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress exported tables")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-run analyses whose input files change")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between checks for changed files in watch mode (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--preview", action="store_true",
+                        help="for large files, first draw approximate charts from a sample, then the exact ones")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help=f"records sampled per dataset in preview charts (default: {DEFAULT_SAMPLE_SIZE})")
+    parser.add_argument("--parse", choices=(AUTO,) + PARSE_MODES, default=AUTO,
+                        help="parse input files whole in memory or stream them (default: chosen per file size)")
+    parser.add_argument("--aggregate", choices=(AUTO,) + AGGREGATE_MODES, default=AUTO,
+                        help="count likes exactly or approximately with a fixed-memory sketch (default: exact)")
+    parser.add_argument("--load", choices=(AUTO,) + LOAD_MODES, default=AUTO,
+                        help="load comment shards serially or in parallel processes (default: chosen per size)")
+    parser.add_argument("--since", metavar="DATE",
+                        help="only analyze activity from this date on: YYYY-MM-DD, YYYY-MM, YYYY or e.g. 90d for "
+                             "the last 90 days (UTC)")
+    parser.add_argument("--until", metavar="DATE",
+                        help="only analyze activity up to and including this date, month or year (UTC)")
+    parser.add_argument("--format", choices=IMAGE_FORMATS, default="png",
+                        help="file format of the charts (default: png)")
+    parser.add_argument("--dpi", type=float, default=DEFAULT_DPI,
+                        help=f"resolution of raster charts (default: {DEFAULT_DPI})")
+    parser.add_argument("--png-level", type=int, default=DEFAULT_PNG_LEVEL,
+                        help=f"PNG compression level, 0 (fastest) to 9 (smallest) (default: {DEFAULT_PNG_LEVEL})")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY,
+                        help=f"JPEG/WebP quality from 1 to 100; WebP at 100 is lossless (default: {DEFAULT_QUALITY})")
+    parser.add_argument("--encoders", type=int, default=DEFAULT_ENCODERS,
+                        help=f"charts encoded at once in the background (default: {DEFAULT_ENCODERS})")
+    parser.add_argument("--snapshot", metavar="ID",
+                        help="treat folder_path as a snapshot store and analyze this snapshot (an ID, label or "
+                             "'latest'); it is rebuilt from the store if needed")
+    parser.add_argument("--show-plan", action="store_true",
+                        help="print the execution plan without running anything")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.analyses if name not in ANALYSES]
+    if unknown:
+        parser.error(f"unknown analysis: {', '.join(unknown)}")
+
+    if args.gzip and not args.export:
+        parser.error("--gzip requires --export")
+    if args.preview and args.watch:
+        parser.error("--preview cannot be combined with --watch")
+    if args.show_plan and (args.watch or args.preview):
+        parser.error("--show-plan cannot be combined with --watch or --preview")
+    if args.snapshot and args.watch:
+        parser.error("--snapshot cannot be combined with --watch; stored snapshots do not change")
+    if args.sample_size < 1:
+        parser.error("--sample-size must be at least 1")
+    if args.encoders < 1:
+        parser.error("--encoders must be at least 1")
+    try:
+        args.max_memory = parse_size(args.max_memory) if args.max_memory else None
+        args.window = TimeWindow.parse(args.since, args.until)
+        args.output = OutputOptions(args.format, args.dpi, args.png_level, args.quality)
+    except ValueError as e:
+        parser.error(str(e))
+    args.overrides = {"parse": args.parse, "aggregate": args.aggregate, "load": args.load}
+    return args
+
+
+def show_plan(scheduler, analysis_names):
+    """Print the execution plan for the analyses without building anything."""
+    table_names, runnable, skipped = scheduler.plan(analysis_names)
+    for name, missing in skipped.items():
+        print(f"[{name}] {MISSING_FILES}: {', '.join(missing)}")
+    plan = scheduler.plan_execution(table_names, runnable)
+    for line in plan.describe():
+        print(f"Plan: {line}")
+    if plan.available is not None:
+        print(f"Plan: memory available for parsed files: {plan.available} bytes")
+
+
+def run(args, scheduler=None):
+    """
+    Run the pipeline for parsed arguments and return the exit status.
+    A scheduler whose tables are already loaded (see core/worker.py) may be passed in.
+    """
+    reporter = ProgressReporter.from_env()
+    configure_output(args.output, args.encoders)
+    if args.snapshot:
+        from core.snapshots import SnapshotStore
+        try:
+            args.folder_path = SnapshotStore(args.folder_path).checkout(args.snapshot)
+        except (KeyError, ValueError, OSError) as e:
+            print(f"Error: {e.args[0] if isinstance(e, KeyError) else e}", flush=True)
+            return 1
+        print(f"Snapshot {args.snapshot}: {args.folder_path}", flush=True)
+    if scheduler is None:
+        scheduler = AnalysisScheduler(args.folder_path, args.workers, reporter, args.export, args.gzip,
+                                      args.max_memory, overrides=args.overrides, window=args.window,
+                                      output=args.output)
+    else:
+        scheduler.reporter = reporter
+        scheduler.max_workers = max(1, args.workers)
+        scheduler.window = args.window
+        scheduler.output = args.output
+    if args.window is not None:
+        print(f"Date range: {args.window.label()}", flush=True)
+
+    if args.show_plan:
+        show_plan(scheduler, args.analyses or list(ANALYSES))
+        return 0
+
+    if args.watch:
+        def on_results(changed, results):
+            if changed:
+                print(f"Changed: {describe_changes(changed)}", flush=True)
+            print_results(results, reporter)
+
+        print(f"Watching {args.folder_path} (Ctrl+C to stop)", flush=True)
+        try:
+            watch(scheduler, args.analyses or None, args.interval, on_results)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.preview:
+        run_preview(scheduler, args.analyses or list(ANALYSES), args.sample_size, reporter)
+
+    results = scheduler.run(args.analyses or None)
+    print_results(results, reporter)
+    return 1 if any(result.status != SUCCEEDED for result in results.values()) else 0
+
+
+def main():
+    sys.exit(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Preservr Data Visualizations - Execution Planner
+
+Description: Chooses how each table of a run is computed before anything is parsed.
+             The planner stats the table's input files and estimates their record
+             counts from a few records read at spread-out offsets (see
+             core/sampling.py), then picks, per table: parsing files whole in
+             memory or streaming them, and loading shards serially or in parallel
+             processes. A 2 KB file is simply parsed; a file whose parsed form would
+             not fit in the memory available is streamed. Counts are always exact
+             (streamed files are counted chunk by chunk); the fixed-memory
+             heavy-hitters sketch is used only when asked for. The plan is printed
+             before a run and any choice can be forced with --parse, --aggregate
+             and --load.
+Input: Dataset paths located in an archive, table names and a memory budget
+Output: An ExecutionPlan with one TablePlan (and the reason for it) per table
+Date: 2026-10-19
+"""
+
+import os
+
+from core.memory import JSON_FOOTPRINT_FACTOR, physical_memory
+from core.registry import TABLES
+
+PARSE_MODES = ("memory", "stream")
+AGGREGATE_MODES = ("exact", "sketch")
+LOAD_MODES = ("serial", "parallel")
+# Value of an override that leaves the choice to the planner.
+AUTO = "auto"
+
+# Without --max-memory, plans keep parsed files within this share of physical memory.
+PHYSICAL_MEMORY_SHARE = 0.5
+
+
+class TablePlan:
+    """How one table is computed, with the input statistics behind the choice."""
+
+    def __init__(self, table, parse="memory", aggregate="exact", load="serial", files=0, nbytes=0,
+                 records=0, reasons=()):
+        self.table = table
+        self.parse = parse
+        self.aggregate = aggregate
+        self.load = load
+        self.files = files
+        self.bytes = nbytes
+        self.records = records
+        self.reasons = list(reasons)
+
+    def describe(self):
+        line = (f"{self.table}: {self.parse} parse, {self.aggregate} counts, {self.load} load "
+                f"({self.files} file{'s' if self.files != 1 else ''}, {_format_bytes(self.bytes)}, "
+                f"~{self.records} records)")
+        return line + (f"; {'; '.join(self.reasons)}" if self.reasons else "")
+
+    def to_dict(self):
+        return {"table": self.table, "parse": self.parse, "aggregate": self.aggregate, "load": self.load,
+                "files": self.files, "bytes": self.bytes, "records": self.records, "reasons": self.reasons}
+
+
+class ExecutionPlan:
+    """TablePlans of one run, in build order."""
+
+    def __init__(self, tables=None, available=None):
+        self.tables = tables or {}
+        # Memory the plan was made to fit in; None when it could not be determined.
+        self.available = available
+
+    def __getitem__(self, table_name):
+        return self.tables[table_name]
+
+    def get(self, table_name):
+        return self.tables.get(table_name)
+
+    def __bool__(self):
+        return bool(self.tables)
+
+    def describe(self):
+        """One line per table, for logging."""
+        return [plan.describe() for plan in self.tables.values()]
+
+    def to_dict(self):
+        return {"available_bytes": self.available, "tables": [plan.to_dict() for plan in self.tables.values()]}
+
+
+def _format_bytes(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def _parallel_min_bytes():
+    from core.most_commented_on_users import PARALLEL_MIN_BYTES
+    return PARALLEL_MIN_BYTES
+
+
+def table_input_paths(table, paths, folder_path):
+    """Existing input files of a table; comment tables read every numbered shard."""
+    found = []
+    for key in table.inputs:
+        if not paths.get(key):
+            continue
+        if key == "post_comments":
+            from core.archive import find_numbered_files
+            from core.most_commented_on_users import COMMENT_SHARD_STEM
+            found.extend(find_numbered_files(folder_path, COMMENT_SHARD_STEM))
+        else:
+            found.append(paths[key])
+    return found
+
+
+def available_memory(budget):
+    """Memory a plan may fill with parsed files: the --max-memory limit, or a share of physical memory."""
+    if budget is not None and budget.limited:
+        return max(0, budget.limit - budget.used)
+    total = physical_memory()
+    return int(total * PHYSICAL_MEMORY_SHARE) if total else None
+
+
+def plan_tables(table_names, paths, folder_path, budget=None, overrides=None, exact_tables=(), cpus=None):
+    """
+    Plan how to build each of table_names (in build order).
+
+    `overrides` maps "parse", "aggregate" and "load" to a forced mode (or AUTO).
+    Tables in `exact_tables` (e.g. ones other tables are computed from, or
+    that are exported) are always counted exactly.
+    """
+    from core.sampling import estimate_record_count
+
+    overrides = {key: value for key, value in (overrides or {}).items() if value and value != AUTO}
+    cpus = cpus if cpus is not None else os.cpu_count() or 1
+    available = available_memory(budget)
+    remaining = available
+    plan = ExecutionPlan(available=available)
+
+    for name in table_names:
+        table = TABLES[name]
+        inputs = table_input_paths(table, paths, folder_path)
+        if not table.inputs:
+            # Joined from other tables, never from files.
+            continue
+        sizes = [os.path.getsize(path) for path in inputs]
+        nbytes = sum(sizes)
+        records = sum(estimate_record_count(path) for path in inputs)
+        table_plan = TablePlan(name, files=len(inputs), nbytes=nbytes, records=records)
+
+        # Parsing: whole files in memory, unless they would not fit and the table can stream.
+        # Tables may be built at the same time, so earlier in-memory tables use up `remaining`.
+        footprint = nbytes * JSON_FOOTPRINT_FACTOR
+        if not table.streamable:
+            table_plan.parse = "memory"
+            if overrides.get("parse") == "stream":
+                table_plan.reasons.append("cannot stream, parsed in memory")
+        elif "parse" in overrides:
+            table_plan.parse = overrides["parse"]
+            table_plan.reasons.append(f"parse forced to {overrides['parse']}")
+        elif remaining is not None and footprint > remaining:
+            table_plan.parse = "stream"
+            table_plan.reasons.append(f"parsed size ~{_format_bytes(footprint)} exceeds "
+                                      f"{_format_bytes(remaining)} available")
+        if table_plan.parse == "memory" and remaining is not None:
+            remaining = max(0, remaining - footprint)
+
+        # Aggregation: exact unless a sketch is asked for; approximate counts are never chosen silently.
+        if table.sketch is None:
+            pass
+        elif name in exact_tables:
+            if overrides.get("aggregate") == "sketch":
+                table_plan.reasons.append("exact counts required by the tables built from it")
+        elif "aggregate" in overrides:
+            table_plan.aggregate = overrides["aggregate"]
+            table_plan.reasons.append(f"aggregate forced to {overrides['aggregate']}")
+        elif table_plan.parse == "stream":
+            table_plan.reasons.append("exact counts merged chunk by chunk")
+
+        # Loading: shards in parallel processes only when each can be parsed whole.
+        if not table.parallel:
+            pass
+        elif len(inputs) < 2:
+            if overrides.get("load") == "parallel":
+                table_plan.reasons.append("single shard, loaded serially")
+        elif table_plan.parse != "memory":
+            if overrides.get("load") == "parallel":
+                table_plan.reasons.append("streamed shards are loaded serially")
+        elif "load" in overrides:
+            table_plan.load = overrides["load"]
+            table_plan.reasons.append(f"load forced to {overrides['load']}")
+        elif cpus > 1 and nbytes >= _parallel_min_bytes() and not (budget is not None and budget.limited):
+            table_plan.load = "parallel"
+            table_plan.reasons.append(f"{len(inputs)} shards on {cpus} CPUs")
+        plan.tables[name] = table_plan
+    return plan
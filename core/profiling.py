@@ -0,0 +1,387 @@
+"""
+Preservr Data Visualizations - Memory Profiling
+
+Description: Runs each analysis on its own under tracemalloc while a background
+             thread samples the process' resident set size, and reports the peak
+             memory of every stage (walk, parse, aggregate, render) together with
+             the source lines holding the most memory when the stage ended. Each
+             analysis runs in a fresh child process so peaks do not carry over from
+             one analysis to the next. Run on a synthetic archive (--scale), peaks
+             are checked against per-analysis budgets and any analysis over its
+             budget fails the run, so a loader that starts holding more than it
+             should is caught before it reaches a real archive.
+Input: An Instagram archive folder or a synthetic scale, and optional analysis names
+Output: A JSON report on stdout or in --output, and a non-zero exit when a budget is exceeded
+Date: 2026-10-19
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import parse_size
+from core.progress import ProgressReporter
+from core.registry import ANALYSES
+from core.synthetic import SCALES, make_archive
+
+PROFILE_PREFIX = "@@PRESERVR_PROFILE "
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Time spent before the first stage starts (locating tables, planning).
+SETUP_STAGE = "setup"
+# Seconds between two resident set size samples.
+RSS_INTERVAL = 0.01
+DEFAULT_TOP_SITES = 10
+DEFAULT_SCALE = "small"
+
+# Peak traced memory allowed per analysis on each synthetic scale, about 1.5x
+# the peaks measured when the budgets were set.
+DEFAULT_BUDGETS = {
+    "small": {
+        "most_liked_users_stories": "270M",
+        "most_liked_users_posts": "720M",
+        "most_liked_users": "48M",
+        "top_topics": "270M",
+        "age_gender_distribution": "32M",
+        "most_commented_on_users": "96M",
+        "followers_following": "4M",
+        "interaction_graph": "48M",
+        "dashboard": "260M",
+    },
+    "medium": {
+        "most_liked_users_stories": "270M",
+        "most_liked_users_posts": "720M",
+        "most_liked_users": "290M",
+        "top_topics": "270M",
+        "age_gender_distribution": "32M",
+        "most_commented_on_users": "176M",
+        "followers_following": "4M",
+        "interaction_graph": "290M",
+        "dashboard": "290M",
+    },
+}
+
+
+def _format_bytes(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def _site(frame):
+    """file:line of an allocation, relative to the repository when it is inside it."""
+    filename = frame.filename
+    if filename.startswith(REPO_ROOT + os.sep):
+        filename = os.path.relpath(filename, REPO_ROOT)
+    return f"{filename}:{frame.lineno}"
+
+
+class RssSampler(threading.Thread):
+    """Samples the resident set size and keeps the highest value seen per stage."""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        # Samples are attributed to this stage; None pauses attribution.
+        self.stage = None
+        self.peaks = {}
+        self._stop_event = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def rss(self):
+        """Current resident set size in bytes, or None where /proc is not available."""
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def sample(self):
+        stage, rss = self.stage, self.rss()
+        if stage is not None and rss is not None and rss > self.peaks.get(stage, 0):
+            self.peaks[stage] = rss
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def peak_rss():
+    """Highest resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageProfiler(ProgressReporter):
+    """
+    A progress reporter that, instead of printing updates, records memory at
+    every stage change: the traced peak since the previous change, RSS samples
+    and the top allocation sites still live when the stage ends. Stages that
+    run several times (once per table) keep their highest peak.
+    """
+
+    def __init__(self, sampler, top=DEFAULT_TOP_SITES):
+        super().__init__(stream=open(os.devnull, "w"), enabled=True)
+        self.sampler = sampler
+        self.top = top
+        self.stages = {}
+        self._current = None
+        self._started = None
+
+    def begin(self):
+        tracemalloc.reset_peak()
+        self._enter(SETUP_STAGE)
+
+    def update(self, stage, done=None, total=None, force=False):
+        if stage != self._current:
+            with self._lock:
+                if stage != self._current:
+                    self._leave()
+                    self._enter(stage)
+
+    def result(self, analysis, status, artifacts=(), preview=False):
+        pass
+
+    def finish(self):
+        with self._lock:
+            self._leave()
+            self._current = None
+
+    def _enter(self, stage):
+        self._current = stage
+        self._started = time.perf_counter()
+        self.sampler.stage = stage
+
+    def _leave(self):
+        """Close the current stage: record its peak and what it left allocated."""
+        stage = self._current
+        if stage is None:
+            return
+        seconds = time.perf_counter() - self._started
+        _, peak = tracemalloc.get_traced_memory()
+        self.sampler.sample()
+        # The snapshot itself allocates; keep it out of every stage's figures.
+        self.sampler.stage = None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+        ))
+        sites = [{"site": _site(stat.traceback[0]), "size": stat.size, "count": stat.count}
+                 for stat in snapshot.statistics("lineno")[:self.top]]
+        del snapshot
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "runs": 0, "peak_traced": 0, "top_sites": []})
+        entry["seconds"] += seconds
+        entry["runs"] += 1
+        if peak >= entry["peak_traced"]:
+            entry["peak_traced"] = peak
+            entry["top_sites"] = sites
+        tracemalloc.reset_peak()
+
+
+def profile_analysis(folder_path, name, top=DEFAULT_TOP_SITES):
+    """Run one analysis in this process under tracemalloc; returns its report dict."""
+    from core.scheduler import AnalysisScheduler, FAILED
+    from core.worker import warm_up
+
+    # Libraries, fonts and chart templates are loaded before tracing starts so
+    # that peaks measure the analysis, not the imports every analysis shares.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        warm_up()
+    sampler = RssSampler()
+    profiler = StageProfiler(sampler, top)
+    # Comment shards load serially so all of the work is traced in this process.
+    scheduler = AnalysisScheduler(folder_path, max_workers=1, reporter=profiler, overrides={"load": "serial"})
+    baseline_rss = sampler.rss()
+    tracemalloc.start()
+    sampler.start()
+    started = time.perf_counter()
+    profiler.begin()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = scheduler.run([name])[name]
+        status, error = result.status, result.error
+    except Exception as e:
+        status, error = FAILED, str(e)
+    finally:
+        profiler.finish()
+        seconds = time.perf_counter() - started
+        sampler.stop()
+        tracemalloc.stop()
+        scheduler.budget.cleanup()
+
+    stages = {}
+    for stage, entry in profiler.stages.items():
+        entry["seconds"] = round(entry["seconds"], 4)
+        entry["peak_rss"] = sampler.peaks.get(stage)
+        stages[stage] = entry
+    return {
+        "analysis": name,
+        "status": status,
+        "error": error,
+        "seconds": round(seconds, 4),
+        "peak_traced": max((entry["peak_traced"] for entry in stages.values()), default=0),
+        "baseline_rss": baseline_rss,
+        "peak_rss": peak_rss(),
+        "stages": stages,
+    }
+
+
+def run_child(folder_path, name, top):
+    """Profile one analysis in a fresh interpreter; returns its report dict."""
+    command = [sys.executable, os.path.abspath(__file__), folder_path, name, "--child", "--top", str(top)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(PROFILE_PREFIX):
+            return json.loads(line[len(PROFILE_PREFIX):])
+    error = completed.stderr.strip().splitlines()[-1:] or [f"exit status {completed.returncode}"]
+    return {"analysis": name, "status": "failed", "error": error[0], "stages": {}}
+
+
+def load_budgets(path, scale):
+    """
+    Budgets from a JSON file, either {analysis: size} or {scale: {analysis: size}};
+    sizes are bytes or strings like "96M".
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if any(isinstance(value, dict) for value in data.values()):
+        data = data.get(str(scale), {})
+    return {name: parse_size(size) for name, size in data.items()}
+
+
+def check_budgets(reports, budgets):
+    """Mark each report over its budget; returns the names of those analyses."""
+    exceeded = []
+    for report in reports:
+        budget = budgets.get(report["analysis"])
+        if budget is None or report.get("peak_traced") is None:
+            continue
+        report["budget"] = budget
+        report["within_budget"] = report["peak_traced"] <= budget
+        if not report["within_budget"]:
+            exceeded.append(report["analysis"])
+    return exceeded
+
+
+def print_summary(reports, stream):
+    for report in reports:
+        if report["status"] != "succeeded":
+            print(f"[{report['analysis']}] {report['status']}: {report.get('error')}", file=stream)
+            continue
+        stages = ", ".join(f"{stage} {_format_bytes(entry['peak_traced'])}"
+                           for stage, entry in report["stages"].items())
+        budget = f" (budget {_format_bytes(report['budget'])})" if "budget" in report else ""
+        print(f"[{report['analysis']}] peak {_format_bytes(report['peak_traced'])}{budget}, "
+              f"RSS {_format_bytes(report['peak_rss'])}, {report['seconds']:.2f}s: {stages}", file=stream)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="profiling.py",
+                                     description="Profile the peak memory of each analysis, stage by stage.")
+    parser.add_argument("folder_path", nargs="?",
+                        help="Instagram archive folder (default: a synthetic archive of --scale)")
+    parser.add_argument("analyses", nargs="*", metavar="analysis",
+                        help=f"analyses to profile (default: all). Choices: {', '.join(ANALYSES)}")
+    parser.add_argument("--scale", help=f"profile a synthetic archive of this size: {', '.join(SCALES)} "
+                                        f"(default when no folder is given: {DEFAULT_SCALE})")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic archive (default: 0)")
+    parser.add_argument("--budgets", metavar="FILE",
+                        help="JSON file of peak budgets, {analysis: size} or {scale: {analysis: size}}")
+    parser.add_argument("--budget", action="append", default=[], metavar="ANALYSIS=SIZE",
+                        help="peak budget for one analysis, e.g. most_liked_users=96M; may be repeated")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_SITES,
+                        help=f"allocation sites reported per stage (default: {DEFAULT_TOP_SITES})")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report here instead of stdout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # A lone analysis name with --scale is not a folder.
+    if args.folder_path in ANALYSES and not os.path.isdir(args.folder_path):
+        args.analyses.insert(0, args.folder_path)
+        args.folder_path = None
+    unknown = [name for name in args.analyses if name not in ANALYSES]
+    if unknown:
+        parser.error(f"unknown analysis: {', '.join(unknown)}")
+    if args.folder_path is None and args.scale is None:
+        args.scale = DEFAULT_SCALE
+    if args.folder_path is not None and args.scale is not None:
+        parser.error("give either an archive folder or --scale, not both")
+    if args.scale is not None and args.scale not in SCALES:
+        parser.error(f"unknown scale '{args.scale}'. Choices: {', '.join(SCALES)}")
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+
+    # Default budgets only apply to the synthetic archives they were measured on.
+    defaults = DEFAULT_BUDGETS.get(args.scale, {}) if args.scale else {}
+    try:
+        args.budgets_by_analysis = {name: parse_size(size) for name, size in defaults.items()}
+        if args.budgets:
+            args.budgets_by_analysis.update(load_budgets(args.budgets, args.scale))
+        for item in args.budget:
+            name, _, size = item.partition("=")
+            if name not in ANALYSES:
+                parser.error(f"unknown analysis in --budget: {name}")
+            args.budgets_by_analysis[name] = parse_size(size)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        report = profile_analysis(args.folder_path, args.analyses[0], args.top)
+        print(PROFILE_PREFIX + json.dumps(report), flush=True)
+        return 0
+
+    folder_path = args.folder_path
+    if folder_path is None:
+        folder_path = tempfile.mkdtemp(prefix="preservr_profile_")
+        print(f"Writing a {args.scale} synthetic archive ({SCALES[args.scale]} post likes)...", file=sys.stderr)
+        make_archive(folder_path, args.scale, args.seed)
+    try:
+        reports = []
+        for name in args.analyses or list(ANALYSES):
+            print(f"Profiling {name}...", file=sys.stderr, flush=True)
+            reports.append(run_child(folder_path, name, args.top))
+    finally:
+        if args.folder_path is None:
+            shutil.rmtree(folder_path, ignore_errors=True)
+
+    exceeded = check_budgets(reports, args.budgets_by_analysis)
+    print_summary(reports, sys.stderr)
+    document = {"folder": args.folder_path, "scale": args.scale, "analyses": reports}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+
+    for report in reports:
+        if report["analysis"] in exceeded:
+            print(f"MEMORY BUDGET EXCEEDED: {report['analysis']} peaked at {_format_bytes(report['peak_traced'])}, "
+                  f"budget {_format_bytes(report['budget'])}", file=sys.stderr)
+    failed = [report for report in reports if report["status"] != "succeeded"]
+    return 1 if exceeded or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
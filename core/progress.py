@@ -0,0 +1,163 @@
+"""
+Preservr Data Visualizations - Progress Reporting
+
+Description: A small line-based protocol analyses use to report progress to the UI.
+             Each update is a single stdout line starting with PROGRESS_PREFIX followed
+             by a JSON object with the stage, units done and total units. Updates are
+             rate-limited so reporting from tight loops costs almost nothing.
+Input: Calls from the analysis modules while walking, parsing, aggregating and rendering
+Output: Progress lines on stdout when PRESERVR_PROGRESS is set in the environment
+Date: 2026-10-19
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+PROGRESS_PREFIX = "@@PRESERVR_PROGRESS "
+# Announces that an analysis finished and which artifacts it (re)wrote.
+RESULT_PREFIX = "@@PRESERVR_RESULT "
+PROGRESS_ENV_VAR = "PRESERVR_PROGRESS"
+
+# Stages in the order an analysis runs them, with the share of the overall
+# progress bar each one accounts for.
+STAGES = ("walk", "parse", "aggregate", "render")
+STAGE_WEIGHTS = {"walk": 0.05, "parse": 0.6, "aggregate": 0.15, "render": 0.2}
+STAGE_LABELS = {
+    "walk": "Searching archive",
+    "parse": "Reading files",
+    "aggregate": "Counting",
+    "render": "Drawing chart",
+}
+
+# Serializes print_line() output across threads.
+_print_lock = threading.Lock()
+
+# Minimum seconds between two emitted updates of the same stage.
+DEFAULT_MIN_INTERVAL = 0.1
+# Loop helpers only look at the clock once every this many items.
+DEFAULT_CHECK_EVERY = 4096
+
+
+class ProgressReporter:
+    """
+    Emit rate-limited progress updates for one analysis run.
+
+    A disabled reporter turns every call into a cheap no-op, so analyses can
+    always report without checking whether anyone is listening.
+    """
+
+    def __init__(self, stream=None, enabled=True, min_interval=DEFAULT_MIN_INTERVAL):
+        self.stream = stream if stream is not None else sys.stdout
+        self.enabled = enabled
+        self.min_interval = min_interval
+        self._last_emit = 0.0
+        self._last_stage = None
+        # Independent pipeline nodes may report from several threads.
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Create a reporter that is enabled only when the UI asked for progress."""
+        return cls(enabled=os.environ.get(PROGRESS_ENV_VAR) == "1")
+
+    def update(self, stage, done=None, total=None, force=False):
+        """
+        Report `done` out of `total` units for `stage`.
+
+        Updates are dropped when the previous one was emitted less than
+        `min_interval` seconds ago, unless the stage changed, the stage just
+        completed or `force` is set.
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        completed = total is not None and done is not None and done >= total
+        if (not force and not completed and stage == self._last_stage
+                and now - self._last_emit < self.min_interval):
+            return
+        message = {"stage": stage, "done": done, "total": total}
+        with self._lock:
+            self._last_emit = now
+            self._last_stage = stage
+            self.stream.write(PROGRESS_PREFIX + json.dumps(message) + "\n")
+            self.stream.flush()
+
+    def start(self, stage, total=None):
+        """Report the beginning of a stage."""
+        self.update(stage, 0, total, force=True)
+
+    def result(self, analysis, status, artifacts=(), preview=False):
+        """Announce an analysis outcome; never rate-limited. Preview results are flagged as such."""
+        if not self.enabled:
+            return
+        message = {"analysis": analysis, "status": status, "artifacts": list(artifacts)}
+        if preview:
+            message["preview"] = True
+        with self._lock:
+            self.stream.write(RESULT_PREFIX + json.dumps(message) + "\n")
+            self.stream.flush()
+
+    def iterate(self, stage, iterable, total=None, check_every=DEFAULT_CHECK_EVERY):
+        """
+        Yield from `iterable`, reporting the number of items seen for `stage`.
+
+        The clock is only consulted every `check_every` items.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+        if total is None and hasattr(iterable, "__len__"):
+            total = len(iterable)
+        self.start(stage, total)
+        count = 0
+        for item in iterable:
+            yield item
+            count += 1
+            if count % check_every == 0:
+                self.update(stage, count, total)
+        self.update(stage, count, total if total is not None else count)
+
+
+def print_line(text):
+    """
+    Print one line of output in a single write. print() writes the text and the
+    newline separately, so lines printed from parallel table builders can
+    run together.
+    """
+    with _print_lock:
+        sys.stdout.write(f"{text}\n")
+        sys.stdout.flush()
+
+
+def parse_progress_line(line):
+    """Return the update dict for a protocol line, or None for ordinary output."""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    try:
+        message = json.loads(line[len(PROGRESS_PREFIX):])
+    except ValueError:
+        return None
+    return message if message.get("stage") in STAGE_WEIGHTS else None
+
+
+def parse_result_line(line):
+    """Return the result dict for a result line, or None for anything else."""
+    if not line.startswith(RESULT_PREFIX):
+        return None
+    try:
+        message = json.loads(line[len(RESULT_PREFIX):])
+    except ValueError:
+        return None
+    return message if "analysis" in message else None
+
+
+def overall_fraction(update):
+    """Map a stage update onto a 0..1 fraction of the whole run."""
+    stage = update["stage"]
+    before = sum(STAGE_WEIGHTS[s] for s in STAGES[:STAGES.index(stage)])
+    done, total = update.get("done"), update.get("total")
+    within = min(done / total, 1.0) if done is not None and total else 0.0
+    return min(before + STAGE_WEIGHTS[stage] * within, 1.0)
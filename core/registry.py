@@ -0,0 +1,512 @@
+"""
+Preservr Data Visualizations - Analysis Registry
+
+Description: Single source of truth for what each analysis needs and produces. Every
+             analysis declares the archive datasets it consumes, the intermediate
+             tables it builds on and the artifacts it writes to OUTPUT_FOLDER. The
+             scheduler builds its dependency graph from these declarations, and the
+             UI derives its buttons, missing-file checks and output discovery from
+             them. Analyses may also declare exports: their aggregated tables as
+             rows, which the scheduler streams to CSV or NDJSON on request.
+Input: None (declarations only)
+Output: DATASETS, TABLES and ANALYSES lookups
+Date: 2026-10-19
+"""
+
+import os
+from collections import OrderedDict
+
+from core.encoders import DEFAULT_FORMAT, image_artifact
+from core.schemas import SCHEMAS
+
+OUTPUT_FOLDER_NAME = "OUTPUT_FOLDER"
+
+# Dataset key -> file name inside the Instagram archive (see core/schemas.py).
+DATASETS = OrderedDict((key, schema.filename) for key, schema in SCHEMAS.items())
+# Datasets split across numbered files; DATASETS names their first shard (see core.archive.find_numbered_files).
+SHARDED_DATASETS = ("post_comments",)
+
+
+def shard_stem(key):
+    """The stem of a sharded dataset's file names: post_comments_1.json -> post_comments."""
+    return DATASETS[key].rsplit("_", 1)[0]
+
+
+class RunContext:
+    """Everything a table builder or analysis needs to know about the current run."""
+
+    def __init__(self, folder_path, paths, reporter, usernames, export_format=None, compress_exports=False,
+                 budget=None, sample_size=None, plan=None, window=None):
+        self.folder_path = folder_path
+        self.paths = paths
+        self.reporter = reporter
+        self.usernames = usernames
+        # MemoryBudget loaders check before holding a whole file in memory.
+        self.budget = budget
+        self.export_format = export_format
+        self.compress_exports = compress_exports
+        # Records sampled per dataset in a preview run; None for exact runs.
+        self.sample_size = sample_size
+        # ExecutionPlan choosing how each table is parsed and counted (see core/planner.py).
+        self.plan = plan
+        # TimeWindow the loaders restrict records to (see core/window.py); None for all time.
+        self.window = window
+
+    @property
+    def preview(self):
+        return self.sample_size is not None
+
+    def table_plan(self, table_name):
+        """The planned way to build a table, or None to let its loaders decide."""
+        return self.plan.get(table_name) if self.plan else None
+
+    def budget_for(self, table_name):
+        """The memory budget a table's loaders use, with the planned parse mode applied."""
+        table_plan = self.table_plan(table_name)
+        if table_plan is None or self.budget is None:
+            return self.budget
+        from core.memory import BudgetView
+        return BudgetView(self.budget, table_plan.parse)
+
+    @property
+    def output_folder(self):
+        return os.path.join(self.folder_path, OUTPUT_FOLDER_NAME)
+
+    def output_path(self, artifact):
+        return os.path.join(self.output_folder, artifact)
+
+
+class Table:
+    """
+    An intermediate result computed once per run and shared by analyses.
+    `sample`, if given, builds an estimate of it from a sample for preview runs;
+    `sketch` builds an approximate version in fixed memory. `streamable` and
+    `parallel` tell the execution planner which loading strategies apply.
+    """
+
+    def __init__(self, name, inputs, build, requires=(), sample=None, sketch=None, streamable=False,
+                 parallel=False):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.requires = tuple(requires)
+        self.build = build
+        self.sample = sample
+        self.sketch = sketch
+        self.streamable = streamable
+        self.parallel = parallel
+
+    def builder(self, ctx):
+        """The build function to use in this run."""
+        if ctx.preview:
+            return self.sample
+        table_plan = ctx.table_plan(self.name)
+        if table_plan is not None and table_plan.aggregate == "sketch" and self.sketch is not None:
+            return self.sketch
+        return self.build
+
+
+class Analysis:
+    """A user-facing analysis: its label, inputs, shared tables and artifacts."""
+
+    def __init__(self, name, label, inputs, tables, artifacts, run, optional_inputs=(), exports=None,
+                 optional_tables=()):
+        self.name = name
+        self.label = label
+        self.inputs = tuple(inputs)
+        self.optional_inputs = tuple(optional_inputs)
+        self.tables = tuple(tables)
+        # Tables used only when their input files are in the archive.
+        self.optional_tables = tuple(optional_tables)
+        self.artifacts = tuple(artifacts)
+        self.run = run
+        # exports(ctx, tables) -> [(name, columns, rows)]
+        self.exports = exports
+
+    @property
+    def previewable(self):
+        """True if every table this analysis uses can be estimated from a sample."""
+        return bool(self.tables) and all(TABLES[name].sample is not None for name in self.tables)
+
+    def tables_for(self, paths):
+        """The tables this analysis uses for an archive with the given dataset paths."""
+        return self.tables + tuple(name for name in self.optional_tables
+                                   if all(paths.get(key) for key in TABLES[name].inputs))
+
+    def missing_files(self, paths):
+        """Return the file names of required datasets that were not found."""
+        return [DATASETS[key] for key in self.inputs if not paths.get(key)]
+
+    def artifact_paths(self, folder_path, image_format=DEFAULT_FORMAT):
+        """Artifact paths, with charts under the extension of image_format."""
+        return [os.path.join(folder_path, OUTPUT_FOLDER_NAME, image_artifact(name, image_format))
+                for name in self.artifacts]
+
+    def write_exports(self, ctx, tables):
+        """Stream this analysis' tables in ctx.export_format; returns the written paths."""
+        if ctx.export_format is None or self.exports is None or ctx.preview:
+            return []
+        from core.export import export_filename, write_table
+        written = []
+        for name, columns, rows in self.exports(ctx, tables):
+            path = ctx.output_path(export_filename(name, ctx.export_format, ctx.compress_exports))
+            write_table(path, columns, rows, ctx.export_format, ctx.compress_exports)
+            written.append(path)
+        return written
+
+
+class AnalysisError(Exception):
+    """Raised by an analysis or table builder when it cannot produce its result."""
+
+
+# Table builders. Analysis modules are imported lazily so that importing the
+# registry (e.g. from the UI) does not pull in pandas, matplotlib or wordcloud.
+
+def _build_story_like_counts(ctx, tables):
+    from core.most_liked_users import load_story_likes_data
+    return load_story_likes_data(ctx.folder_path, ctx.reporter, ctx.usernames, ctx.budget_for("story_like_counts"),
+                                 ctx.window)
+
+
+def _build_post_like_counts(ctx, tables):
+    from core.most_liked_users import load_post_likes_data
+    return load_post_likes_data(ctx.folder_path, ctx.reporter, ctx.usernames, ctx.budget_for("post_like_counts"),
+                                ctx.window)
+
+
+def _build_follower_ids(ctx, tables):
+    from core.followers_following import load_follow_ids
+    return load_follow_ids(ctx.paths["followers_1"], "Followers", ctx.reporter, ctx.usernames,
+                           ctx.budget_for("follower_ids"), ctx.window)
+
+
+def _build_following_ids(ctx, tables):
+    from core.followers_following import load_follow_ids
+    return load_follow_ids(ctx.paths["following"], "Following", ctx.reporter, ctx.usernames,
+                           ctx.budget_for("following_ids"), ctx.window)
+
+
+def _build_topics(ctx, tables):
+    from core.archive import load_json
+    from core.top_topics import extract_topics
+    return extract_topics(load_json(ctx.paths["recommended_topics"], ctx.reporter), ctx.reporter)
+
+
+def _build_age_gender_counts(ctx, tables):
+    from core.archive import load_json
+    from core.age_gender_distribution import extract_age_gender_counts
+    return extract_age_gender_counts(load_json(ctx.paths["audience_insights"], ctx.reporter))
+
+
+def _sketch_story_like_counts(ctx, tables):
+    from core.most_liked_users import load_story_likes_sketch, sketch_count_estimate
+    sketch = load_story_likes_sketch(ctx.folder_path, ctx.reporter, window=ctx.window)
+    return sketch_count_estimate(sketch, ctx.usernames)
+
+
+def _sketch_post_like_counts(ctx, tables):
+    from core.most_liked_users import load_post_likes_sketch, sketch_count_estimate
+    sketch = load_post_likes_sketch(ctx.folder_path, ctx.reporter, window=ctx.window)
+    return sketch_count_estimate(sketch, ctx.usernames)
+
+
+def _sample_story_like_counts(ctx, tables):
+    from core.most_liked_users import sample_story_likes
+    return sample_story_likes(ctx.paths.get("story_likes"), ctx.sample_size, ctx.usernames, ctx.reporter,
+                              ctx.window)
+
+
+def _sample_post_like_counts(ctx, tables):
+    from core.most_liked_users import sample_post_likes
+    return sample_post_likes(ctx.paths.get("liked_posts"), ctx.sample_size, ctx.usernames, ctx.reporter,
+                             ctx.window)
+
+
+def _sample_comment_stats(ctx, tables):
+    from core.archive import find_numbered_files
+    from core.most_commented_on_users import COMMENT_SHARD_STEM, sample_comment_stats
+    paths = find_numbered_files(ctx.folder_path, COMMENT_SHARD_STEM, ctx.reporter)
+    return sample_comment_stats(paths, ctx.sample_size, ctx.reporter, window=ctx.window)
+
+
+def _build_comment_stats(ctx, tables):
+    from core.archive import find_numbered_files
+    from core.most_commented_on_users import COMMENT_SHARD_STEM, load_comment_stats
+    # post_comments_1.json marks the dataset; every numbered shard is counted.
+    paths = find_numbered_files(ctx.folder_path, COMMENT_SHARD_STEM, ctx.reporter)
+    table_plan = ctx.table_plan("comment_stats")
+    # The per-month breakdowns are only used by exports.
+    return load_comment_stats(paths, ctx.reporter, breakdowns=ctx.export_format is not None,
+                              budget=ctx.budget_for("comment_stats"),
+                              parallel=table_plan.load == "parallel" if table_plan else None,
+                              window=ctx.window)
+
+
+def _build_interaction_graph(ctx, tables):
+    from core.interactions import InteractionGraph
+    return InteractionGraph.build(
+        ctx.usernames,
+        post_likes=_counts(tables["post_like_counts"]),
+        story_likes=_counts(tables["story_like_counts"]),
+        comment_counts=tables["comment_stats"].owner_count_array(ctx.usernames),
+        followers=tables["follower_ids"],
+        following=tables["following_ids"],
+    )
+
+
+# Analysis runners. Count tables are CountEstimates (see core/sampling.py) in preview
+# runs and when the execution plan counts them with a sketch.
+
+def _counts(table):
+    """A count table's array, whether it is exact or estimated."""
+    return getattr(table, "counts", table)
+
+
+def _note(table):
+    """Chart title note of an estimated table, or None for exact counts."""
+    return getattr(table, "note", None)
+
+
+def _title_note(ctx, note=None):
+    """A chart title note with the run's date range, if any, in front."""
+    parts = [ctx.window.label()] if ctx.window is not None else []
+    if note:
+        parts.append(note)
+    return ", ".join(parts) or None
+
+
+def _like_chart_data(ctx, story_likes, post_likes):
+    """Combined like counts for the top users bar chart, and the note of estimated counts (or None)."""
+    from core.most_liked_users import combine_like_data
+    if _note(story_likes) or _note(post_likes):
+        from core.most_liked_users import combine_like_estimates
+        from core.sampling import CountEstimate, combined_note
+        story_likes, post_likes = (table if isinstance(table, CountEstimate) else CountEstimate.exact(table)
+                                   for table in (story_likes, post_likes))
+        return (combine_like_estimates(story_likes, post_likes, ctx.usernames),
+                combined_note(story_likes, post_likes))
+    return combine_like_data(story_likes, post_likes, ctx.usernames), None
+
+
+def _run_most_liked_users(ctx, tables):
+    from core.most_liked_users import create_bar_chart
+    story_likes, post_likes = tables["story_like_counts"], tables["post_like_counts"]
+    if not story_likes.any() and not post_likes.any():
+        raise AnalysisError("No data found in either story_likes.json or liked_posts.json")
+    data, note = _like_chart_data(ctx, story_likes, post_likes)
+    create_bar_chart(data, ctx.folder_path, ctx.reporter, _title_note(ctx, note))
+
+
+def _run_story_likes_wordcloud(ctx, tables):
+    from core.most_liked_users_stories import render_story_likes_wordcloud
+    table = tables["story_like_counts"]
+    if not table.any():
+        raise AnalysisError("No story likes data found.")
+    render_story_likes_wordcloud(ctx.usernames.to_dict(_counts(table)),
+                                 ctx.output_path("story_likes_visualization.png"), reporter=ctx.reporter,
+                                 note=_title_note(ctx, _note(table)))
+
+
+def _run_liked_posts_wordcloud(ctx, tables):
+    from core.most_liked_users_posts import render_liked_posts_wordcloud
+    table = tables["post_like_counts"]
+    if not table.any():
+        raise AnalysisError("No post likes data found.")
+    render_liked_posts_wordcloud(ctx.usernames.to_dict(_counts(table)), ctx.folder_path, reporter=ctx.reporter,
+                                 note=_title_note(ctx, _note(table)))
+
+
+def _run_top_topics(ctx, tables):
+    from core.top_topics import render_topic_wordcloud
+    if not tables["topics"]:
+        raise AnalysisError("No topics found to generate word cloud.")
+    render_topic_wordcloud(tables["topics"], ctx.output_path("top_topics.png"), ctx.reporter)
+
+
+def _run_age_gender_distribution(ctx, tables):
+    from core.age_gender_distribution import render_age_distribution_chart
+    age_groups, men_counts, women_counts = tables["age_gender_counts"]
+    render_age_distribution_chart(age_groups, men_counts, women_counts,
+                                  ctx.output_path("age_gender_distribution.png"), ctx.reporter)
+
+
+def _run_most_commented_on_users(ctx, tables):
+    from core.most_commented_on_users import most_commented_barchart, owner_count_frame
+    stats = tables["comment_stats"]
+    owner_counts = owner_count_frame(stats, ctx.usernames)
+    if owner_counts.empty:
+        raise AnalysisError("No comments with a media owner found.")
+    estimate = None
+    if stats.sample is not None:
+        from core.sampling import CountEstimate, print_estimates
+        estimate = CountEstimate(stats.owner_count_array(ctx.usernames), stats.sample)
+        ids = [ctx.usernames.id_of(name) for name in owner_counts["Media Owner"][:5]]
+        print_estimates(estimate, ctx.usernames, ids, "comments")
+    ctx.reporter.start("render", 1)
+    most_commented_barchart(owner_counts, ctx.output_path("post_comments.png"),
+                            _title_note(ctx, estimate and estimate.note))
+    ctx.reporter.update("render", 1, 1)
+
+
+def _run_interaction_graph(ctx, tables):
+    from core.interactions import render_not_following_back_chart
+    render_not_following_back_chart(tables["interaction_graph"], ctx.output_path("engagement_not_following_back.png"),
+                                    reporter=ctx.reporter)
+
+
+def _run_followers_following(ctx, tables):
+    from core.followers_following import write_follow_analysis
+    write_follow_analysis(ctx.folder_path, tables["follower_ids"], tables["following_ids"],
+                          ctx.usernames, ctx.reporter)
+
+
+def _run_dashboard(ctx, tables):
+    from core.dashboard import render_dashboard
+    panels = dict.fromkeys(("likes", "topics", "age_gender", "follows"))
+    likes = [tables.get(name) for name in ("story_like_counts", "post_like_counts")]
+    if any(table is not None and table.any() for table in likes):
+        import numpy as np
+        story_likes, post_likes = (table if table is not None else np.zeros(0, dtype=np.int64) for table in likes)
+        panels["likes"] = _like_chart_data(ctx, story_likes, post_likes)
+    if tables.get("topics"):
+        panels["topics"] = tables["topics"]
+    if "age_gender_counts" in tables:
+        panels["age_gender"] = tables["age_gender_counts"]
+    if "follower_ids" in tables and "following_ids" in tables:
+        from core.followers_following import follow_set_counts
+        panels["follows"] = follow_set_counts(tables["follower_ids"], tables["following_ids"])
+    if all(data is None for data in panels.values()):
+        raise AnalysisError("None of the dashboard's files were found.")
+    render_dashboard(panels, ctx.output_path("dashboard.png"), ctx.reporter, _title_note(ctx))
+
+
+# Exports: aggregated rows behind each chart.
+
+def _ranked_count_rows(ctx, counts):
+    from core.export import count_rows
+    from core.usernames import top_ids
+    ranked = top_ids(counts, usernames=ctx.usernames)
+    return count_rows(ctx.usernames, ranked, counts[ranked])
+
+
+def _export_story_likes(ctx, tables):
+    return [("story_likes", ["Username", "Story Likes"], _ranked_count_rows(ctx, tables["story_like_counts"]))]
+
+
+def _export_post_likes(ctx, tables):
+    return [("liked_posts", ["Username", "Post Likes"], _ranked_count_rows(ctx, tables["post_like_counts"]))]
+
+
+def _export_most_liked_users(ctx, tables):
+    from core.export import count_rows
+    from core.usernames import align, top_ids
+    size = len(ctx.usernames)
+    story_counts = align(tables["story_like_counts"], size)
+    post_counts = align(tables["post_like_counts"], size)
+    total_counts = story_counts + post_counts
+    ranked = top_ids(total_counts, usernames=ctx.usernames)
+    rows = count_rows(ctx.usernames, ranked, story_counts[ranked], post_counts[ranked], total_counts[ranked])
+    return [("most_liked_users", ["Username", "Story Likes", "Post Likes", "Total Likes"], rows)]
+
+
+def _export_top_topics(ctx, tables):
+    from collections import Counter
+    return [("top_topics", ["Topic", "Count"], Counter(tables["topics"]).most_common())]
+
+
+def _export_age_gender_distribution(ctx, tables):
+    age_groups, men_counts, women_counts = tables["age_gender_counts"]
+    return [("age_gender_distribution", ["Age Group", "Men", "Women"], zip(age_groups, men_counts, women_counts))]
+
+
+def _export_comments(ctx, tables):
+    stats = tables["comment_stats"]
+    counts = stats.owner_count_array(ctx.usernames)
+    return [
+        ("comment_owners", ["Media Owner", "Comment Count"], _ranked_count_rows(ctx, counts)),
+        ("comments_by_month", ["Month", "Comments"], sorted(stats.month_counts.items())),
+        ("comments_by_owner_month", ["Media Owner", "Month", "Comments"],
+         ((owner, month, count) for (owner, month), count in sorted(stats.owner_month_counts.items()))),
+    ]
+
+
+def _export_interaction_graph(ctx, tables):
+    from core.interactions import export_columns
+    graph = tables["interaction_graph"]
+    return [("interaction_graph", export_columns(), graph.rows(graph.rank()))]
+
+
+def _export_follow_categories(ctx, tables):
+    from core.followers_following import iter_follow_categories
+    rows = iter_follow_categories(tables["follower_ids"], tables["following_ids"], ctx.usernames)
+    return [("follow_categories", ["Username", "Category"], rows)]
+
+
+TABLES = OrderedDict((table.name, table) for table in [
+    Table("story_like_counts", ["story_likes"], _build_story_like_counts, sample=_sample_story_like_counts,
+          sketch=_sketch_story_like_counts, streamable=True),
+    Table("post_like_counts", ["liked_posts"], _build_post_like_counts, sample=_sample_post_like_counts,
+          sketch=_sketch_post_like_counts, streamable=True),
+    Table("follower_ids", ["followers_1"], _build_follower_ids, streamable=True),
+    Table("following_ids", ["following"], _build_following_ids, streamable=True),
+    Table("topics", ["recommended_topics"], _build_topics),
+    Table("age_gender_counts", ["audience_insights"], _build_age_gender_counts),
+    Table("comment_stats", ["post_comments"], _build_comment_stats, sample=_sample_comment_stats,
+          streamable=True, parallel=True),
+    # Joins every per-user table; built from the other tables, not from files.
+    Table("interaction_graph", [], _build_interaction_graph,
+          requires=["post_like_counts", "story_like_counts", "comment_stats", "follower_ids", "following_ids"]),
+])
+
+# In the order the UI lays out its buttons.
+ANALYSES = OrderedDict((analysis.name, analysis) for analysis in [
+    Analysis("most_liked_users_stories", "Most Liked Users (Stories)",
+             inputs=["story_likes"], tables=["story_like_counts"],
+             artifacts=["story_likes_visualization.png"], run=_run_story_likes_wordcloud,
+             exports=_export_story_likes),
+    Analysis("most_liked_users_posts", "Most Liked Users (Posts)",
+             inputs=["liked_posts"], tables=["post_like_counts"],
+             artifacts=["liked_posts_wordcloud.png"], run=_run_liked_posts_wordcloud,
+             exports=_export_post_likes),
+    Analysis("most_liked_users", "Most Liked Users (Top 5)",
+             inputs=["liked_posts"], optional_inputs=["story_likes"],
+             tables=["story_like_counts", "post_like_counts"],
+             artifacts=["most_liked_users_barchart.png"], run=_run_most_liked_users,
+             exports=_export_most_liked_users),
+    Analysis("top_topics", "Top Post Topics",
+             inputs=["recommended_topics"], tables=["topics"],
+             artifacts=["top_topics.png"], run=_run_top_topics,
+             exports=_export_top_topics),
+    Analysis("age_gender_distribution", "Follower Age/Gender Distribution",
+             inputs=["audience_insights"], tables=["age_gender_counts"],
+             artifacts=["age_gender_distribution.png"], run=_run_age_gender_distribution,
+             exports=_export_age_gender_distribution),
+    Analysis("most_commented_on_users", "Most Commented On Users",
+             inputs=["post_comments"], tables=["comment_stats"],
+             artifacts=["post_comments.png"], run=_run_most_commented_on_users,
+             exports=_export_comments),
+    Analysis("followers_following", "Followers/Following Analysis",
+             inputs=["followers_1", "following"], tables=["follower_ids", "following_ids"],
+             artifacts=["follow_analysis.txt"], run=_run_followers_following,
+             exports=_export_follow_categories),
+    Analysis("interaction_graph", "Engagement vs. Follow-Back",
+             inputs=["followers_1", "following"],
+             optional_inputs=["liked_posts", "story_likes", "post_comments"],
+             tables=["interaction_graph"],
+             artifacts=["engagement_not_following_back.png"], run=_run_interaction_graph,
+             exports=_export_interaction_graph),
+    # Draws from the tables above; each panel needs only its own files.
+    Analysis("dashboard", "Archive Overview",
+             inputs=[], optional_inputs=["liked_posts", "story_likes", "recommended_topics", "audience_insights",
+                                         "followers_1", "following"],
+             tables=[], optional_tables=["story_like_counts", "post_like_counts", "topics", "age_gender_counts",
+                                         "follower_ids", "following_ids"],
+             artifacts=["dashboard.png"], run=_run_dashboard),
+])
+
+
+def get_analysis(name):
+    """Look up an analysis by name, raising KeyError with the known names if absent."""
+    try:
+        return ANALYSES[name]
+    except KeyError:
+        raise KeyError(f"Unknown analysis '{name}'. Known analyses: {', '.join(ANALYSES)}") from None
@@ -0,0 +1,132 @@
+"""
+Preservr Data Visualizations - Rendering
+
+Description: Pyplot-free chart rendering on the Agg backend. Each chart type has a
+             pre-built figure template (Figure, Axes and canvas) that is reused from
+             one render to the next and reset after every save, so long-running
+             processes keep flat memory and skip per-render figure setup. No figure
+             is ever registered with pyplot's global state. Saving a chart only
+             draws it to pixels; compressing and writing them in the chosen output
+             format happens on the encoder threads of core/encoders.py.
+Input: Drawing code from the analysis modules
+Output: Image files written by the chart encoder
+Date: 2026-10-19
+"""
+
+import io
+import threading
+import time
+from contextlib import contextmanager
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from core.encoders import get_encoder
+
+# Figure size (inches) and layout engine for each chart type.
+TEMPLATE_SPECS = {
+    "bar_chart": {"figsize": (12, 8), "layout": "tight"},
+    "grouped_bar_chart": {"figsize": (10, 6), "layout": "tight"},
+    "wordcloud": {"figsize": (10, 5), "layout": None},
+    "wordcloud_large": {"figsize": (12, 8), "layout": "tight"},
+    # One panel per overview chart (see core/dashboard.py), laid out and saved together.
+    "dashboard": {"figsize": (16, 10), "layout": "tight", "grid": (2, 2)},
+}
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class TemplateCanvas(FigureCanvasAgg):
+    """An Agg canvas that remembers the pixel size of its last raw render."""
+
+    raw_size = None
+
+    def print_raw(self, filename_or_obj, *, metadata=None, **kwargs):
+        # savefig passes options meant for other backends (orientation, ...) to
+        # canvases outside matplotlib; Agg's print_raw takes none of them.
+        super().print_raw(filename_or_obj, metadata=metadata)
+        # The renderer of the render just written, at the saved DPI and bounding box.
+        renderer = self.get_renderer()
+        self.raw_size = (int(renderer.width), int(renderer.height))
+
+
+class FigureTemplate:
+    """
+    A reusable figure for one chart type: a single Axes, or with `grid` a
+    list of Axes (rows x columns) in reading order.
+    """
+
+    def __init__(self, figsize, layout=None, grid=None):
+        self.figure = Figure(figsize=figsize, layout=layout)
+        TemplateCanvas(self.figure)
+        self.axes = list(self.figure.subplots(*grid).flat) if grid else self.figure.add_subplot()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def render(self):
+        """
+        Yield (figure, axes) for drawing one chart.
+
+        Renders of the same template are serialized, and the axes are cleared
+        when the block exits, even if drawing fails.
+        """
+        with self._lock:
+            try:
+                yield self.figure, self.axes
+            finally:
+                self.reset()
+
+    def reset(self):
+        """Remove everything drawn since the last reset."""
+        for axes in self.axes if isinstance(self.axes, list) else [self.axes]:
+            axes.clear()
+            axes.set_axis_on()
+        for text in list(self.figure.texts):
+            text.remove()
+
+    def close(self):
+        """Release the figure's artists and canvas."""
+        self.figure.clear()
+        self.figure = self.axes = None
+
+
+def get_template(name):
+    """Return the shared template for a chart type, building it on first use."""
+    with _templates_lock:
+        template = _templates.get(name)
+        if template is None:
+            template = _templates[name] = FigureTemplate(**TEMPLATE_SPECS[name])
+        return template
+
+
+def release_templates():
+    """Close every cached template; the next render rebuilds it."""
+    with _templates_lock:
+        for template in _templates.values():
+            template.close()
+        _templates.clear()
+
+
+def save_figure(figure, output_path, dpi=None, bbox_inches="tight", message=None):
+    """
+    Draw a figure and queue it to be written to output_path in the configured
+    output format (whose extension replaces .png). dpi defaults to the configured
+    one; "figure" keeps the figure's own. `message` is printed, with {path}
+    filled in, once the file is written. Returns the EncodeJob; the file exists
+    once the job's future is done.
+    """
+    encoder = get_encoder()
+    options = encoder.options
+    output_path = options.path_for(output_path)
+    dpi = options.dpi if dpi is None else dpi
+    pixel_dpi = figure.dpi if dpi == "figure" else dpi
+    started = time.perf_counter()
+    buffer = io.BytesIO()
+    if options.vector:
+        figure.savefig(buffer, format=options.image_format, dpi=dpi, bbox_inches=bbox_inches)
+        return encoder.submit_bytes(buffer.getvalue(), output_path, time.perf_counter() - started, message)
+    # Raw pixels are cheap to produce; compression happens on an encoder thread.
+    figure.savefig(buffer, format="raw", dpi=dpi, bbox_inches=bbox_inches)
+    return encoder.submit_pixels(buffer.getbuffer(), figure.canvas.raw_size, output_path, pixel_dpi,
+                                 time.perf_counter() - started, message)
@@ -0,0 +1,233 @@
+"""
+Preservr Data Visualizations - Sampling Preview
+
+Description: Draws a sample of the records in large archive files without parsing
+             them. Each file is split into equal byte ranges (strata); one random
+             offset is picked per stratum, the file is read from there to the next
+             complete record, and only that record is decoded. The number of records
+             in the file is estimated from the sampled records' sizes. Counts from
+             the sample are scaled up to the estimated total, and each count gets a
+             confidence interval (Wilson score) so previews can say how far off
+             they may be. Files too small to be worth sampling are read whole.
+Input: Paths of archive JSON files and a sample size
+Output: Sampled records, estimated record totals and count estimates with bounds
+Date: 2026-10-19
+"""
+
+import json
+import os
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from core.archive import iter_json_records
+
+# Records sampled per preview, across all of a dataset's files.
+DEFAULT_SAMPLE_SIZE = 10000
+# Analyses whose input files are smaller than this skip the preview; the exact run is quick.
+PREVIEW_MIN_BYTES = 16 * 1024 * 1024
+# Strata are at least this many bytes wide; files with fewer strata than samples are read whole.
+MIN_STRATUM_BYTES = 1024
+# Bytes read at a sampled offset; doubled until a whole record fits.
+WINDOW_BYTES = 1024
+MAX_WINDOW_BYTES = 1024 * 1024
+# Confidence level of the reported intervals, and its z-score.
+CONFIDENCE_LEVEL = 95
+CONFIDENCE_Z = 1.96
+
+SampleInfo = namedtuple("SampleInfo", ["sampled", "population", "exact"])
+
+_decoder = json.JSONDecoder()
+
+
+def is_archive_record(record):
+    """True for an entry of any Instagram export list, as opposed to the objects nested in one."""
+    return "string_list_data" in record or "string_map_data" in record
+
+
+def _read_record(f, offset, is_record):
+    """
+    Return (record, start, span) for the first record starting at or after
+    offset, where span is its size in bytes including the separator that
+    follows it; or None if there is none.
+    """
+    size = WINDOW_BYTES
+    while True:
+        f.seek(offset)
+        window = f.read(size)
+        start = window.find(b"{")
+        while start != -1:
+            text = window[start:].decode("utf-8", errors="replace")
+            try:
+                record, end = _decoder.raw_decode(text)
+            except ValueError:
+                record = None
+            if isinstance(record, dict) and is_record(record):
+                end_bytes = start + len(text[:end].encode("utf-8"))
+                after = end_bytes
+                while after < len(window) and window[after:after + 1] in b" \t\r\n,":
+                    after += 1
+                return record, offset + start, after - start
+            start = window.find(b"{", start + 1)
+        if len(window) < size or size >= MAX_WINDOW_BYTES:
+            # End of file, or no record fits in the largest window.
+            return None
+        size *= 2
+
+
+def _sample_file(path, count, is_record, rng):
+    """Sample up to `count` distinct records of one file; returns (records, spans)."""
+    file_size = os.path.getsize(path)
+    stride = file_size / count
+    records, spans, seen = [], [], set()
+    with open(path, "rb") as f:
+        for stratum in range(count):
+            found = _read_record(f, int(stratum * stride + rng.random() * stride), is_record)
+            if found is None:
+                continue
+            record, start, span = found
+            # A long record can cover more than one stratum; count it once.
+            if start in seen:
+                continue
+            seen.add(start)
+            records.append(record)
+            spans.append(span)
+    return records, spans
+
+
+def estimate_record_count(path, is_record=None, probes=16, seed=0):
+    """
+    Estimate the number of records in a JSON file from the sizes of a few
+    records read at evenly spread offsets, without parsing the file.
+    """
+    is_record = is_record or is_archive_record
+    file_size = os.path.getsize(path)
+    rng = random.Random(seed)
+    spans = []
+    with open(path, "rb") as f:
+        for probe in range(probes):
+            found = _read_record(f, int((probe + rng.random()) * file_size / probes), is_record)
+            if found is not None:
+                spans.append(found[2])
+    if not spans:
+        return 0
+    return round(file_size / (sum(spans) / len(spans)))
+
+
+def sample_records(paths, sample_size=DEFAULT_SAMPLE_SIZE, is_record=None, key=None, reporter=None, seed=0):
+    """
+    Sample records from one or more JSON files, allocating the sample by file size.
+
+    `is_record(obj)` tells a record apart from the objects nested inside one.
+    Files too small to sample are read in full (through `key`, as in
+    iter_json_records). Returns (records, SampleInfo); SampleInfo.exact is true
+    when every file was read in full, in which case population is exact too.
+    """
+    paths = [path for path in paths if path]
+    is_record = is_record or is_archive_record
+    rng = random.Random(seed)
+    sizes = [os.path.getsize(path) for path in paths]
+    total_bytes = sum(sizes) or 1
+
+    records, population, exact = [], 0, True
+    for path, file_size in zip(paths, sizes):
+        count = max(1, round(sample_size * file_size / total_bytes))
+        if file_size < count * MIN_STRATUM_BYTES:
+            whole = list(iter_json_records(path, key, reporter))
+            records.extend(whole)
+            population += len(whole)
+            continue
+        sampled, spans = _sample_file(path, count, is_record, rng)
+        records.extend(sampled)
+        if spans:
+            population += round(file_size / (sum(spans) / len(spans)))
+        exact = False
+    return records, SampleInfo(len(records), max(population, len(records)), exact)
+
+
+def wilson_interval(successes, trials, z=CONFIDENCE_Z):
+    """Wilson score interval (low, high) of a proportion; works on arrays."""
+    successes = np.asarray(successes, dtype=np.float64)
+    if trials <= 0:
+        return np.zeros_like(successes), np.zeros_like(successes)
+    p = successes / trials
+    z2 = z * z
+    denominator = 1 + z2 / trials
+    center = (p + z2 / (2 * trials)) / denominator
+    half = z * np.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / denominator
+    return np.clip(center - half, 0, 1), np.clip(center + half, 0, 1)
+
+
+class CountEstimate:
+    """
+    Counts indexed by username ID, estimated from a sample.
+
+    `counts` are the sample counts scaled to the estimated population;
+    `lower` and `upper` bound each count at CONFIDENCE_LEVEL. For an exact
+    sample all three are the plain counts. `note` describes the estimate
+    for chart titles and is None for exact counts.
+    """
+
+    def __init__(self, sample_counts, info, z=CONFIDENCE_Z):
+        self.sample_counts = np.asarray(sample_counts, dtype=np.int64)
+        self.info = info
+        self.level = CONFIDENCE_LEVEL
+        self.note = preview_note(info)
+        if info.exact or not info.sampled:
+            self.counts = self.lower = self.upper = self.sample_counts
+            return
+        low, high = wilson_interval(self.sample_counts, info.sampled, z)
+        self.counts = np.rint(self.sample_counts * (info.population / info.sampled)).astype(np.int64)
+        # A sampled account has at least as many records as were seen.
+        self.lower = np.maximum(np.floor(low * info.population).astype(np.int64), self.sample_counts)
+        self.upper = np.ceil(high * info.population).astype(np.int64)
+
+    @classmethod
+    def from_bounds(cls, counts, lower, upper, note=None):
+        """Counts with guaranteed bounds, e.g. from a heavy-hitters sketch; note=None means exact."""
+        estimate = cls.__new__(cls)
+        estimate.counts = estimate.sample_counts = np.asarray(counts, dtype=np.int64)
+        estimate.lower = np.asarray(lower, dtype=np.int64)
+        estimate.upper = np.asarray(upper, dtype=np.int64)
+        estimate.info = None
+        estimate.level = None
+        estimate.note = note
+        return estimate
+
+    @classmethod
+    def exact(cls, counts):
+        return cls.from_bounds(counts, counts, counts)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def any(self):
+        return bool(self.sample_counts.any())
+
+
+def combined_note(*estimates):
+    """One chart title note for several estimates (e.g. story and post likes), or None if all are exact."""
+    samples = [estimate.info for estimate in estimates if estimate.info is not None]
+    return preview_note(*samples) or next((estimate.note for estimate in estimates if estimate.note), None)
+
+
+def preview_note(*infos):
+    """Chart title note for a preview built from these samples, or None if all were exact."""
+    sampled = [info for info in infos if info is not None and not info.exact]
+    if not sampled:
+        return None
+    fraction = sum(info.sampled for info in sampled) / max(1, sum(info.population for info in sampled))
+    return f"preview from a {fraction:.1%} sample"
+
+
+def print_estimates(estimate, usernames, ids, unit):
+    """Print the estimate and confidence interval of each ID, e.g. for a chart's top entries."""
+    if estimate.note is None:
+        return
+    for user_id in ids:
+        if user_id >= len(estimate):
+            continue
+        bounds = f"{estimate.lower[user_id]}..{estimate.upper[user_id]}"
+        interval = f"{estimate.level}% interval {bounds}" if estimate.level else f"between {bounds}"
+        print(f"{usernames.names[user_id]}: ~{estimate.counts[user_id]} {unit} ({interval})")
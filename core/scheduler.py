@@ -0,0 +1,272 @@
+"""
+Preservr Data Visualizations - Analysis Scheduler
+
+Description: Builds a dependency graph for the requested analyses from the registry
+             and runs it. Shared intermediate tables are computed once per run.
+             Nodes whose dependencies are satisfied run concurrently on a thread
+             pool, so e.g. parsing followers_1.json and following.json overlap
+             with rendering a chart whose data is already loaded. Before tables are
+             built, the execution planner picks how each one is parsed and counted.
+             Charts are encoded in the background (see core/encoders.py); an
+             analysis completes once its charts are on disk.
+Input: An Instagram archive folder and a list of analysis names
+Output: The analyses' artifacts in OUTPUT_FOLDER and a result per analysis
+Date: 2026-10-19
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from core.archive import locate_files
+from core.encoders import ChartEncoder, configure_output, get_encoder
+from core.memory import MemoryBudget
+from core.progress import ProgressReporter
+from core.registry import ANALYSES, DATASETS, OUTPUT_FOLDER_NAME, TABLES, RunContext, get_analysis
+from core.usernames import for_archive
+
+DEFAULT_WORKERS = 4
+# Date ranges whose tables are kept cached, including the whole-archive one.
+WINDOW_CACHE_SIZE = 4
+
+# Result states
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# Not run because a table it depends on failed.
+SKIPPED = "skipped"
+MISSING_FILES = "missing files"
+
+
+class AnalysisResult:
+    """Outcome of one analysis in a scheduler run."""
+
+    def __init__(self, name, status, artifacts=(), error=None, encodes=()):
+        self.name = name
+        self.status = status
+        self.artifacts = list(artifacts)
+        self.error = error
+        # EncodeJobs of the charts written, with their sizes and timings.
+        self.encodes = list(encodes)
+
+    def __repr__(self):
+        return f"AnalysisResult({self.name!r}, {self.status!r})"
+
+
+def locate_datasets(folder_path, reporter=None):
+    """Find every registry dataset in one walk; returns {dataset key: path or None}."""
+    found = locate_files(folder_path, list(DATASETS.values()), reporter)
+    return {key: found[filename] for key, filename in DATASETS.items()}
+
+
+class AnalysisScheduler:
+    """
+    Runs analyses for one archive folder as a DAG of table and analysis nodes.
+
+    Tables computed by one run are kept in `tables` and reused by later runs
+    on the same scheduler until they are invalidated. Tables are cached per
+    date range (`window`), so switching back to an earlier range is free.
+    """
+
+    def __init__(self, folder_path, max_workers=DEFAULT_WORKERS, reporter=None,
+                 export_format=None, compress_exports=False, max_memory=None, sample_size=None, overrides=None,
+                 window=None, output=None):
+        self.folder_path = folder_path
+        self.max_workers = max(1, int(max_workers))
+        self.reporter = reporter or ProgressReporter(enabled=False)
+        # When set, analyses also stream their tables as CSV/NDJSON (see core/export.py).
+        self.export_format = export_format
+        self.compress_exports = compress_exports
+        # Loaders stream and spill to disk rather than exceed max_memory bytes.
+        self.budget = MemoryBudget(max_memory)
+        # When set, tables are estimated from samples of this many records (a preview run).
+        self.sample_size = sample_size
+        # Forced planner choices, e.g. {"parse": "stream"} (see core/planner.py).
+        self.overrides = dict(overrides or {})
+        # ExecutionPlan of the latest run, for inspection.
+        self.last_plan = None
+        # TimeWindow restricting every table to a date range (see core/window.py); None for all time.
+        self.window = window
+        # OutputOptions for charts (format, DPI, compression); None for 300-dpi PNG.
+        self.output = output
+        # Window key -> {table name: table}, least recently used first.
+        self._caches = OrderedDict()
+        self.paths = None
+
+    @property
+    def tables(self):
+        """Cached tables of the current date range."""
+        key = self.window.key if self.window is not None else None
+        cache = self._caches.setdefault(key, {})
+        self._caches.move_to_end(key)
+        while len(self._caches) > WINDOW_CACHE_SIZE:
+            self._caches.popitem(last=False)
+        return cache
+
+    def locate(self):
+        """(Re)discover dataset paths in the archive."""
+        self.paths = locate_datasets(self.folder_path, self.reporter)
+        return self.paths
+
+    def invalidate(self, table_names=None):
+        """Drop cached tables of every date range (all of them when table_names is None)."""
+        if table_names is None:
+            self._caches.clear()
+        else:
+            for cache in self._caches.values():
+                for name in table_names:
+                    cache.pop(name, None)
+
+    def plan(self, analysis_names):
+        """
+        Return (table_names, runnable, skipped) for the requested analyses.
+
+        Tables are listed in dependency order and include only those not
+        already cached. Analyses with missing required files are skipped.
+        """
+        if self.paths is None:
+            self.locate()
+        runnable, skipped = [], {}
+        for name in analysis_names:
+            analysis = get_analysis(name)
+            missing = analysis.missing_files(self.paths)
+            if missing:
+                skipped[name] = missing
+            else:
+                runnable.append(analysis)
+
+        ordered = []
+
+        def visit(table_name):
+            if table_name in ordered or table_name in self.tables:
+                return
+            for dependency in TABLES[table_name].requires:
+                visit(dependency)
+            ordered.append(table_name)
+
+        for analysis in runnable:
+            for table_name in analysis.tables_for(self.paths):
+                visit(table_name)
+        return ordered, runnable, skipped
+
+    def plan_execution(self, table_names, analyses=()):
+        """
+        Plan how to build table_names (see core/planner.py). Tables that other
+        tables are computed from, or that are exported, are counted exactly.
+        """
+        from core.planner import plan_tables
+        if self.paths is None:
+            self.locate()
+        exact = {dependency for name in table_names for dependency in TABLES[name].requires}
+        if self.export_format is not None:
+            exact.update(name for analysis in analyses for name in analysis.tables_for(self.paths))
+        return plan_tables(table_names, self.paths, self.folder_path, self.budget, self.overrides, exact)
+
+    def run(self, analysis_names=None):
+        """Run the named analyses (all registered ones by default); returns {name: AnalysisResult}."""
+        analysis_names = list(analysis_names or ANALYSES)
+        table_names, runnable, skipped = self.plan(analysis_names)
+
+        results = {
+            name: AnalysisResult(name, MISSING_FILES,
+                                 error="Required files not found: " + ", ".join(missing))
+            for name, missing in skipped.items()
+        }
+        if not runnable:
+            return results
+
+        os.makedirs(os.path.join(self.folder_path, OUTPUT_FOLDER_NAME), exist_ok=True)
+        image_format = configure_output(self.output).options.image_format
+        plan = None
+        if self.sample_size is None and table_names:
+            plan = self.last_plan = self.plan_execution(table_names, runnable)
+            for line in plan.describe():
+                print(f"Plan: {line}", flush=True)
+        ctx = self._context(plan)
+
+        # Dependencies of every node: tables on tables, analyses on tables.
+        dependencies = {("table", name): {("table", dep) for dep in TABLES[name].requires
+                                          if dep not in self.tables}
+                        for name in table_names}
+        for analysis in runnable:
+            dependencies[("analysis", analysis.name)] = {("table", name) for name in analysis.tables_for(self.paths)
+                                                         if name not in self.tables}
+
+        # Failed table -> its error; tables skipped because of it map to the failed table's name.
+        failed_tables, skipped_tables = {}, {}
+        pending = {node: set(deps) for node, deps in dependencies.items()}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for node in [node for node, deps in pending.items() if not deps]:
+                    del pending[node]
+                    running[executor.submit(self._run_node, node, ctx)] = node
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    kind, name = node
+                    error = future.exception()
+                    if kind == "table":
+                        if error is None:
+                            self.tables[name] = future.result()
+                            for deps in pending.values():
+                                deps.discard(node)
+                        else:
+                            failed_tables[name] = error
+                    elif error is None:
+                        exports, encodes = future.result()
+                        artifacts = ANALYSES[name].artifact_paths(self.folder_path, image_format) + exports
+                        results[name] = AnalysisResult(name, SUCCEEDED, artifacts, encodes=encodes)
+                    else:
+                        results[name] = AnalysisResult(name, FAILED, error=str(error))
+
+                # Nodes that depend, directly or not, on a failed table can never run.
+                self._skip_dependents(pending, failed_tables, skipped_tables, results)
+        return results
+
+    @staticmethod
+    def _skip_dependents(pending, failed_tables, skipped_tables, results):
+        """Drop pending nodes that wait on a failed or skipped table, naming the failed one."""
+        def cause(dep):
+            return dep[1] if dep[1] in failed_tables else skipped_tables.get(dep[1])
+
+        blocked = True
+        while blocked:
+            blocked = [(node, cause(dep)) for node, deps in pending.items()
+                       for dep in sorted(deps) if cause(dep) is not None]
+            for node, upstream in blocked:
+                if node not in pending:
+                    continue
+                del pending[node]
+                kind, name = node
+                if kind == "table":
+                    skipped_tables[name] = upstream
+                else:
+                    results[name] = AnalysisResult(
+                        name, SKIPPED, error=f"table '{upstream}' failed: {failed_tables[upstream]}")
+
+    def table(self, name):
+        """Return a table, building it and any missing dependencies first."""
+        if name not in self.tables:
+            if self.paths is None:
+                self.locate()
+            for dependency in TABLES[name].requires:
+                self.table(dependency)
+            ctx = self._context(self.plan_execution([name]) if self.sample_size is None else None)
+            self.tables[name] = TABLES[name].builder(ctx)(ctx, self.tables)
+        return self.tables[name]
+
+    def _context(self, plan=None):
+        return RunContext(self.folder_path, self.paths, self.reporter, for_archive(self.folder_path),
+                          self.export_format, self.compress_exports, self.budget, self.sample_size, plan,
+                          self.window)
+
+    def _run_node(self, node, ctx):
+        kind, name = node
+        if kind == "table":
+            return TABLES[name].builder(ctx)(ctx, self.tables)
+        with get_encoder().collect() as jobs:
+            ANALYSES[name].run(ctx, self.tables)
+        # Exports are written while the charts are still being encoded.
+        exports = ANALYSES[name].write_exports(ctx, self.tables)
+        return exports, ChartEncoder.wait(jobs)
@@ -0,0 +1,212 @@
+"""
+Preservr Data Visualizations - Archive Schemas
+
+Description: Declares the record layout of every Instagram export file the analyses
+             read: its file name, the key of its record array, the keys that mark a
+             record, and the path to each field used (e.g. a follow's username is
+             string_list_data[0].value). Field paths are compiled once into plain
+             Python functions, a getter for one record and extractors that loop over
+             many, with the path walk inlined and type checks instead of try/except,
+             so loaders run them in tight loops. Records lacking a field are skipped
+             by the extractors. Supporting a new export file takes one SCHEMAS entry.
+Input: None (declarations only)
+Output: SCHEMAS and compiled field getters and extractors
+Date: 2026-10-19
+"""
+
+from collections import OrderedDict
+
+
+class Field:
+    """
+    Where a value sits in a record: a path of dict keys (str) and list
+    indexes (int), starting with a key. Text can be stripped, and values
+    listed in `skip` (placeholders such as "Unknown") count as missing.
+    """
+
+    def __init__(self, path, strip=False, skip=()):
+        self.path = tuple(path)
+        if not self.path or not isinstance(self.path[0], str):
+            raise ValueError(f"Field path must start with a key: {self.path!r}")
+        if not all(isinstance(step, (str, int)) for step in self.path):
+            raise ValueError(f"Field path steps must be keys or list indexes: {self.path!r}")
+        self.strip = strip
+        self.skip = tuple(skip)
+
+    def __repr__(self):
+        return f"Field({self.path!r})"
+
+
+class FileSchema:
+    """
+    The layout of one export file. `records_key` names the record array in a
+    top-level object (None when the file is the array itself); `record_keys`
+    are the keys every record has, which tell records apart from the objects
+    nested in them (used when sampling at arbitrary offsets).
+    """
+
+    def __init__(self, dataset, filename, records_key, record_keys, fields):
+        self.dataset = dataset
+        self.filename = filename
+        self.records_key = records_key
+        self.record_keys = tuple(record_keys)
+        self.fields = dict(fields)
+        self._compiled = {}
+
+    def _compile(self, kind, names):
+        """Build (once) a function of the given kind for the named fields."""
+        key = (kind, names)
+        function = self._compiled.get(key)
+        if function is None:
+            unknown = [name for name in names if name not in self.fields]
+            if unknown:
+                raise KeyError(f"{self.filename} has no field {', '.join(unknown)}")
+            source = _SOURCES[kind](self, names)
+            namespace = {f"skip_{name}": self.fields[name].skip for name in names}
+            exec(compile(source, f"<schema {self.dataset} {kind}>", "exec"), namespace)
+            function = self._compiled[key] = namespace["extract"]
+        return function
+
+    @property
+    def is_record(self):
+        """record -> True if it has every one of record_keys."""
+        return self._compile("is_record", ())
+
+    def getter(self, name):
+        """A function returning one field of a record, or None if the record lacks it."""
+        return self._compile("getter", (name,))
+
+    def values(self, name, records):
+        """Yield the field of every record that has it."""
+        return self._compile("values", (name,))(records)
+
+    def columns(self, records, *names):
+        """
+        Read several fields in one pass over records. Returns (records read,
+        [one list per field]); a row is kept when it has the first field, and
+        the other fields of a kept row are None where missing.
+        """
+        return self._compile("columns", names)(records)
+
+    def records(self, data):
+        """The record list of a parsed file (see core.archive.open_records for streaming)."""
+        if isinstance(data, dict):
+            return data.get(self.records_key, [])
+        return data
+
+    def __repr__(self):
+        return f"FileSchema({self.dataset!r})"
+
+
+def _walk_lines(var, name, field, indent):
+    """Source lines leaving the field's value in `var`, or None if the record lacks it."""
+
+    def step_lines(steps, indent):
+        if not steps:
+            return []
+        step = steps[0]
+        if isinstance(step, str):
+            check, access = f"{var}.__class__ is dict", f"{var} = {var}.get({step!r})"
+        else:
+            check, access = f"{var}.__class__ is list and len({var}) > {step}", f"{var} = {var}[{step}]"
+        return ([f"{indent}if {check}:", f"{indent}    {access}"] + step_lines(steps[1:], indent + "    ")
+                + [f"{indent}else:", f"{indent}    {var} = None"])
+
+    lines = [f"{indent}{var} = record.get({field.path[0]!r})"] + step_lines(field.path[1:], indent)
+    if field.strip:
+        lines.append(f"{indent}{var} = {var}.strip() if {var}.__class__ is str else None")
+    if field.skip:
+        lines.append(f"{indent}if {var} in skip_{name}:")
+        lines.append(f"{indent}    {var} = None")
+    return lines
+
+
+def _is_record_source(schema, names):
+    check = " and ".join(f"{key!r} in record" for key in schema.record_keys) or "True"
+    return f"def extract(record):\n    return record.__class__ is dict and {check}\n"
+
+
+def _getter_source(schema, names):
+    name = names[0]
+    lines = ["def extract(record):"] + _walk_lines("value", name, schema.fields[name], "    ") + ["    return value"]
+    return "\n".join(lines) + "\n"
+
+
+def _values_source(schema, names):
+    name = names[0]
+    lines = (["def extract(records):", "    for record in records:",
+              "        if record.__class__ is not dict:", "            continue"]
+             + _walk_lines("value", name, schema.fields[name], "        ")
+             + ["        if value is not None:", "            yield value"])
+    return "\n".join(lines) + "\n"
+
+
+def _columns_source(schema, names):
+    variables = [f"value{i}" for i in range(len(names))]
+    lines = ["def extract(records):", "    read = 0"]
+    lines += [f"    column{i} = []" for i in range(len(names))]
+    lines += [f"    append{i} = column{i}.append" for i in range(len(names))]
+    lines += ["    for record in records:", "        read += 1",
+              "        if record.__class__ is not dict:", "            continue"]
+    lines += _walk_lines(variables[0], names[0], schema.fields[names[0]], "        ")
+    lines += [f"        if {variables[0]} is None:", "            continue"]
+    for variable, name in zip(variables[1:], names[1:]):
+        lines += _walk_lines(variable, name, schema.fields[name], "        ")
+    lines += [f"        append{i}({variable})" for i, variable in enumerate(variables)]
+    lines.append("    return read, [" + ", ".join(f"column{i}" for i in range(len(names))) + "]")
+    return "\n".join(lines) + "\n"
+
+
+_SOURCES = {
+    "is_record": _is_record_source,
+    "getter": _getter_source,
+    "values": _values_source,
+    "columns": _columns_source,
+}
+
+
+def _follow_schema(dataset, filename):
+    # followers_1.json is a bare array; following.json wraps it in "relationships_following".
+    return FileSchema(dataset, filename, "relationships_following", ["string_list_data"], {
+        "username": Field(["string_list_data", 0, "value"], strip=True),
+        "href": Field(["string_list_data", 0, "href"]),
+        "timestamp": Field(["string_list_data", 0, "timestamp"]),
+    })
+
+
+# Dataset key -> layout of its file, in the order the registry lists datasets.
+SCHEMAS = OrderedDict((schema.dataset, schema) for schema in [
+    FileSchema("liked_posts", "liked_posts.json", "likes_media_likes", ["title", "string_list_data"], {
+        # Likes of deleted posts have an empty or "Unknown" owner.
+        "owner": Field(["title"], skip=("", "Unknown")),
+        "href": Field(["string_list_data", 0, "href"]),
+        "timestamp": Field(["string_list_data", 0, "timestamp"]),
+    }),
+    FileSchema("post_comments", "post_comments_1.json", None, ["string_map_data"], {
+        "owner": Field(["string_map_data", "Media Owner", "value"], skip=("Unknown",)),
+        "comment": Field(["string_map_data", "Comment", "value"]),
+        "timestamp": Field(["string_map_data", "Time", "timestamp"]),
+    }),
+    FileSchema("recommended_topics", "recommended_topics.json", "topics_your_topics", ["string_map_data"], {
+        "name": Field(["string_map_data", "Name", "value"]),
+    }),
+    FileSchema("story_likes", "story_likes.json", "story_activities_story_likes", ["title", "string_list_data"], {
+        "owner": Field(["title"]),
+        "timestamp": Field(["string_list_data", 0, "timestamp"]),
+    }),
+    FileSchema("audience_insights", "audience_insights.json", "organic_insights_audience", ["string_map_data"], {
+        "followers": Field(["string_map_data", "Followers", "value"]),
+        "men_by_age": Field(["string_map_data", "Follower Percentage by Age for Men", "value"]),
+        "women_by_age": Field(["string_map_data", "Follower Percentage by Age for Women", "value"]),
+    }),
+    _follow_schema("followers_1", "followers_1.json"),
+    _follow_schema("following", "following.json"),
+])
+
+
+def get_schema(dataset):
+    """Look up a file schema by dataset key."""
+    try:
+        return SCHEMAS[dataset]
+    except KeyError:
+        raise KeyError(f"Unknown dataset '{dataset}'. Choices: {', '.join(SCHEMAS)}") from None
@@ -0,0 +1,347 @@
+"""
+Preservr Data Visualizations - Snapshot Store
+
+Description: Keeps every export of an archive, e.g. one per month, in a single
+             deduplicating store. Ingesting an archive folder splits each archive
+             file the analyses read into content-defined chunks, cut at JSON record
+             boundaries chosen by a hash of the bytes before them, so records added
+             anywhere in a file only change the chunks around them. Chunks are
+             stored zlib-compressed under their SHA-256 and written only once, so the
+             store grows with new activity rather than with each export. Files whose
+             size and modification time match the previous snapshot of the same
+             folder are not read at all, which makes re-ingesting an unchanged export
+             nearly free. Any snapshot's files can be rebuilt on demand into a
+             checkout folder, which the analyses then run on (pipeline --snapshot).
+Input: An archive folder to ingest, or a snapshot ID to rebuild
+Output: The store folder (chunks, snapshot manifests, checkouts) and rebuilt archives
+Date: 2026-10-19
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import zlib
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.archive import find_numbered_files, locate_files
+from core.registry import DATASETS
+
+STORE_VERSION = 1
+CHUNK_DIR_NAME = "chunks"
+SNAPSHOT_DIR_NAME = "snapshots"
+CHECKOUT_DIR_NAME = "checkouts"
+# Written last in a checkout; a checkout without it is rebuilt.
+CHECKOUT_MARKER = ".complete"
+LATEST = "latest"
+
+# Chunks are cut after a record separator ("}," with optional whitespace) whose
+# preceding ANCHOR_WINDOW bytes hash to 0 under CHUNK_MASK, but never shorter than
+# MIN_CHUNK_BYTES; a chunk reaching MAX_CHUNK_BYTES is cut regardless. With a few
+# separators per record, chunks average some tens of KB.
+ANCHOR = re.compile(rb"\}\s*,")
+ANCHOR_WINDOW = 64
+CHUNK_MASK = 0x1FF
+MIN_CHUNK_BYTES = 8 * 1024
+MAX_CHUNK_BYTES = 1024 * 1024
+READ_BYTES = 8 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+def archive_files(folder_path):
+    """Paths of the archive files the analyses read, relative to folder_path, in a stable order."""
+    comments = DATASETS["post_comments"]
+    found = locate_files(folder_path, list(DATASETS.values()))
+    paths = [path for name, path in found.items() if path and name != comments]
+    # post_comments_1.json -> every post_comments_N.json shard.
+    paths += find_numbered_files(folder_path, comments.rsplit("_", 1)[0])
+    return sorted(os.path.relpath(path, folder_path) for path in paths)
+
+
+def _cut_points(data, final):
+    """Offsets in data where chunks end; the bytes after the last one carry over unless `final`."""
+    view = memoryview(data)
+    cuts = []
+    start = 0
+    for match in ANCHOR.finditer(data, MIN_CHUNK_BYTES):
+        end = match.end()
+        while end - start > MAX_CHUNK_BYTES:
+            start += MAX_CHUNK_BYTES
+            cuts.append(start)
+        if end - start >= MIN_CHUNK_BYTES and not zlib.crc32(view[end - ANCHOR_WINDOW:end]) & CHUNK_MASK:
+            cuts.append(end)
+            start = end
+    while len(data) - start > MAX_CHUNK_BYTES:
+        start += MAX_CHUNK_BYTES
+        cuts.append(start)
+    if final and start < len(data):
+        cuts.append(len(data))
+    return cuts
+
+
+def iter_chunks(file):
+    """Yield the content-defined chunks of an open binary file."""
+    pending = b""
+    while True:
+        block = file.read(READ_BYTES)
+        data = pending + block
+        start = 0
+        for cut in _cut_points(data, final=not block):
+            yield data[start:cut]
+            start = cut
+        pending = data[start:]
+        if not block:
+            return
+
+
+class SnapshotStore:
+    """
+    A store folder: chunks/<2 hex>/<sha256> holding compressed chunks,
+    snapshots/<id>.json listing each snapshot's files as chunk hashes, and
+    checkouts/<id>/ with rebuilt archives. One process writes at a time.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.chunk_dir = os.path.join(self.path, CHUNK_DIR_NAME)
+        self.snapshot_dir = os.path.join(self.path, SNAPSHOT_DIR_NAME)
+        self.checkout_dir = os.path.join(self.path, CHECKOUT_DIR_NAME)
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.snapshot_dir, f"{snapshot_id}.json")
+
+    def _put_chunk(self, chunk):
+        """Store a chunk unless it is already there; returns (digest, compressed bytes written)."""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(chunk, COMPRESS_LEVEL)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(compressed)
+        os.replace(temporary, path)
+        return digest, len(compressed)
+
+    def _get_chunk(self, digest):
+        with open(self._chunk_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def snapshots(self):
+        """Manifests of every snapshot, oldest first."""
+        if not os.path.isdir(self.snapshot_dir):
+            return []
+        manifests = []
+        for name in os.listdir(self.snapshot_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(self.snapshot_dir, name), encoding="utf-8") as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda manifest: (manifest["created"], manifest["id"]))
+
+    def resolve(self, name):
+        """
+        The manifest of a snapshot given its ID, a unique ID prefix, its label
+        or "latest" (the newest one); raises KeyError if there is no such snapshot.
+        """
+        manifests = self.snapshots()
+        if not manifests:
+            raise KeyError(f"No snapshots in {self.path}")
+        if name == LATEST:
+            return manifests[-1]
+        for manifest in reversed(manifests):
+            if name in (manifest["id"], manifest.get("label")):
+                return manifest
+        matches = [manifest for manifest in manifests if manifest["id"].startswith(name)]
+        if len(matches) == 1:
+            return matches[0]
+        raise KeyError(f"No single snapshot matches '{name}' in {self.path}")
+
+    def _new_id(self, created):
+        snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.gmtime(created))
+        suffix = 1
+        while os.path.exists(self._manifest_path(snapshot_id if suffix == 1 else f"{snapshot_id}-{suffix}")):
+            suffix += 1
+        return snapshot_id if suffix == 1 else f"{snapshot_id}-{suffix}"
+
+    def ingest(self, folder_path, label=None):
+        """
+        Add a snapshot of an archive folder and return its manifest. Files
+        whose size and modification time match the newest snapshot of the
+        same folder reuse its chunk list without being read.
+        """
+        source = os.path.abspath(folder_path)
+        relative_paths = archive_files(source)
+        if not relative_paths:
+            raise ValueError(f"No archive files found in {folder_path}")
+        previous = {}
+        for manifest in reversed(self.snapshots()):
+            if manifest["source"] == source:
+                previous = manifest["files"]
+                break
+
+        created = time.time()
+        files = {}
+        stats = {"files_read": 0, "bytes_read": 0, "chunks": 0, "new_chunks": 0, "stored_bytes": 0}
+        for relative in relative_paths:
+            path = os.path.join(source, relative)
+            stat = os.stat(path)
+            known = previous.get(relative)
+            if known is not None and (known["size"], known["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                files[relative] = known
+                stats["chunks"] += len(known["chunks"])
+            else:
+                digest = hashlib.sha256()
+                chunks = []
+                with open(path, "rb") as f:
+                    for chunk in iter_chunks(f):
+                        digest.update(chunk)
+                        chunk_digest, written = self._put_chunk(chunk)
+                        chunks.append(chunk_digest)
+                        stats["chunks"] += 1
+                        stats["new_chunks"] += 1 if written else 0
+                        stats["stored_bytes"] += written
+                files[relative] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest(),
+                                   "chunks": chunks}
+                stats["files_read"] += 1
+                stats["bytes_read"] += stat.st_size
+
+        manifest = {"version": STORE_VERSION, "id": self._new_id(created), "label": label, "created": created,
+                    "source": source, "bytes": sum(entry["size"] for entry in files.values()),
+                    "stats": stats, "files": files}
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        temporary = self._manifest_path(manifest["id"]) + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(temporary, self._manifest_path(manifest["id"]))
+        return manifest
+
+    def restore(self, name, target_folder):
+        """Rebuild a snapshot's files under target_folder, checking each against its hash."""
+        manifest = self.resolve(name)
+        for relative, entry in manifest["files"].items():
+            path = os.path.join(target_folder, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            digest = hashlib.sha256()
+            with open(path, "wb") as f:
+                for chunk_digest in entry["chunks"]:
+                    chunk = self._get_chunk(chunk_digest)
+                    digest.update(chunk)
+                    f.write(chunk)
+            if digest.hexdigest() != entry["sha256"]:
+                raise ValueError(f"Snapshot {manifest['id']}: {relative} does not match its hash; the store is damaged")
+        return manifest
+
+    def checkout(self, name):
+        """
+        The folder holding a snapshot's rebuilt archive, rebuilding it first
+        if needed. Analyses run on it like on any archive folder, and write
+        their charts to its own OUTPUT_FOLDER.
+        """
+        manifest = self.resolve(name)
+        folder = os.path.join(self.checkout_dir, manifest["id"])
+        if os.path.exists(os.path.join(folder, CHECKOUT_MARKER)):
+            return folder
+        shutil.rmtree(folder, ignore_errors=True)
+        self.restore(manifest["id"], folder)
+        with open(os.path.join(folder, CHECKOUT_MARKER), "w", encoding="utf-8") as f:
+            f.write(manifest["id"])
+        return folder
+
+    def remove(self, name):
+        """Delete a snapshot, its checkout and every chunk no other snapshot uses; returns bytes freed."""
+        manifest = self.resolve(name)
+        os.remove(self._manifest_path(manifest["id"]))
+        shutil.rmtree(os.path.join(self.checkout_dir, manifest["id"]), ignore_errors=True)
+        used = {digest for other in self.snapshots() for entry in other["files"].values() for digest in entry["chunks"]}
+        freed = 0
+        for digest in {digest for entry in manifest["files"].values() for digest in entry["chunks"]} - used:
+            path = self._chunk_path(digest)
+            if os.path.exists(path):
+                freed += os.path.getsize(path)
+                os.remove(path)
+        return freed
+
+    def stored_bytes(self):
+        """Compressed size of every chunk in the store."""
+        total = 0
+        for root, _, names in os.walk(self.chunk_dir):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in names)
+        return total
+
+
+def _format_bytes(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def describe(manifest):
+    """One line about a snapshot: ID, label, size and what its ingest added to the store."""
+    stats = manifest["stats"]
+    label = f" ({manifest['label']})" if manifest.get("label") else ""
+    created = time.strftime("%Y-%m-%d %H:%M", time.gmtime(manifest["created"]))
+    return (f"{manifest['id']}{label}  {created} UTC  {len(manifest['files'])} files, "
+            f"{_format_bytes(manifest['bytes'])}; added {_format_bytes(stats['stored_bytes'])} "
+            f"({stats['new_chunks']} of {stats['chunks']} chunks new, {stats['files_read']} files read)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep deduplicated snapshots of Instagram archive exports.")
+    parser.add_argument("store", help="snapshot store folder (created on first ingest)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="add a snapshot of an archive folder")
+    ingest.add_argument("folder_path", help="Instagram archive folder")
+    ingest.add_argument("--label", help="name to refer to the snapshot by, e.g. 2026-10")
+    commands.add_parser("list", help="list the stored snapshots")
+    checkout = commands.add_parser("checkout", help="rebuild a snapshot's archive files")
+    checkout.add_argument("snapshot", help=f"snapshot ID, ID prefix, label or '{LATEST}'")
+    checkout.add_argument("target", nargs="?", help="folder to rebuild into (default: the store's checkout folder)")
+    remove = commands.add_parser("remove", help="delete a snapshot and the chunks only it uses")
+    remove.add_argument("snapshot", help=f"snapshot ID, ID prefix, label or '{LATEST}'")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    try:
+        if args.command == "ingest":
+            started = time.perf_counter()
+            manifest = store.ingest(args.folder_path, args.label)
+            stats = manifest["stats"]
+            print(f"Snapshot {manifest['id']} ingested in {time.perf_counter() - started:.2f}s: "
+                  f"{_format_bytes(stats['bytes_read'])} read, {stats['new_chunks']} new chunks, "
+                  f"{_format_bytes(stats['stored_bytes'])} added to the store")
+            print(f"Store: {_format_bytes(store.stored_bytes())} holding "
+                  f"{_format_bytes(sum(m['bytes'] for m in store.snapshots()))} of snapshots")
+        elif args.command == "list":
+            for manifest in store.snapshots():
+                print(describe(manifest))
+        elif args.command == "checkout":
+            if args.target:
+                manifest = store.restore(args.snapshot, args.target)
+                folder = args.target
+            else:
+                folder = store.checkout(args.snapshot)
+                manifest = store.resolve(args.snapshot)
+            print(f"Snapshot {manifest['id']} rebuilt in {folder}")
+        elif args.command == "remove":
+            freed = store.remove(args.snapshot)
+            print(f"Snapshot removed; {_format_bytes(freed)} freed")
+    except (KeyError, ValueError, OSError) as e:
+        print(f"Error: {e.args[0] if isinstance(e, KeyError) else e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Preservr Data Visualizations - Synthetic Archives
+
+Description: Writes a fake Instagram archive with the same folder layout and JSON
+             shapes as a real export, at a chosen scale, for profiling and
+             benchmarking. Account popularity follows an exponential distribution,
+             so a few accounts collect most likes and comments as in real archives.
+             Output is deterministic for a given scale and seed.
+Input: A folder to write to and a scale name or record count
+Output: liked_posts.json, story_likes.json, post_comments_N.json, followers_1.json,
+        following.json, recommended_topics.json and audience_insights.json
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+# Post likes per scale; story likes are half as many and each of the comment shards a quarter.
+SCALES = {
+    "small": 20000,
+    "medium": 200000,
+    "large": 1000000,
+}
+COMMENT_SHARDS = 3
+# Accounts that appear in the archive per post like, with a floor for small scales.
+ACCOUNTS_PER_LIKE = 0.01
+MIN_ACCOUNTS = 2000
+# Seconds spanned by the generated timestamps, from 2020-09-13.
+FIRST_TIMESTAMP = 1600000000
+TIME_SPAN = 100000000
+
+TOPICS = ["Fashion", "Music", "Travel", "Food & Drink", "Dogs", "Cats", "Basketball", "Art"]
+
+LAYOUT = {
+    "liked_posts": "your_instagram_activity/likes/liked_posts.json",
+    "story_likes": "your_instagram_activity/story_sticker_interactions/story_likes.json",
+    "post_comments": "your_instagram_activity/comments/post_comments_{shard}.json",
+    "followers_1": "connections/followers_and_following/followers_1.json",
+    "following": "connections/followers_and_following/following.json",
+    "recommended_topics": "preferences/your_topics/recommended_topics.json",
+    "audience_insights": "logged_information/past_instagram_insights/audience_insights.json",
+}
+
+
+def scale_records(scale):
+    """Post likes for a scale name or a plain number."""
+    if str(scale) in SCALES:
+        return SCALES[str(scale)]
+    try:
+        return max(1, int(scale))
+    except ValueError:
+        raise ValueError(f"Unknown scale '{scale}'. Use one of {', '.join(SCALES)} or a record count.") from None
+
+
+def _write(folder_path, relative, data):
+    path = os.path.join(folder_path, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def make_archive(folder_path, scale="small", seed=0):
+    """Write a synthetic archive into folder_path; returns the number of post likes."""
+    records = scale_records(scale)
+    rng = random.Random(seed)
+    accounts = [f"user_{i}" for i in range(max(MIN_ACCOUNTS, int(records * ACCOUNTS_PER_LIKE)))]
+    mean_rank = len(accounts) / 13
+
+    def account():
+        return accounts[min(int(rng.expovariate(1 / mean_rank)), len(accounts) - 1)]
+
+    def timestamp():
+        return FIRST_TIMESTAMP + rng.randrange(TIME_SPAN)
+
+    likes = [{"title": account(), "string_list_data": [
+        {"href": "https://www.instagram.com/p/x/", "value": "\U0001f44d", "timestamp": timestamp()}]}
+        for _ in range(records)]
+    # Entries real exports contain without a usable owner.
+    likes += [{"title": "Unknown", "string_list_data": []}, {"title": "", "string_list_data": []}]
+    _write(folder_path, LAYOUT["liked_posts"], {"likes_media_likes": likes})
+    del likes
+
+    stories = [{"title": account(), "string_list_data": [{"timestamp": timestamp()}]} for _ in range(records // 2)]
+    _write(folder_path, LAYOUT["story_likes"], {"story_activities_story_likes": stories})
+    del stories
+
+    for shard in range(1, COMMENT_SHARDS + 1):
+        comments = [{"string_map_data": {"Comment": {"value": "nice"}, "Media Owner": {"value": account()},
+                                         "Time": {"timestamp": timestamp()}}} for _ in range(records // 4)]
+        comments.append({"string_map_data": {"Comment": {"value": "x"}, "Time": {"timestamp": timestamp()}}})
+        _write(folder_path, LAYOUT["post_comments"].format(shard=shard), comments)
+
+    def follow_entries(count):
+        return [{"title": "", "media_list_data": [], "string_list_data": [
+            {"href": f"https://www.instagram.com/{name}", "value": name, "timestamp": timestamp()}]}
+            for name in rng.sample(accounts, min(count, len(accounts)))]
+
+    _write(folder_path, LAYOUT["followers_1"], follow_entries(len(accounts) * 9 // 20))
+    _write(folder_path, LAYOUT["following"], {"relationships_following": follow_entries(len(accounts) * 7 // 20)})
+
+    topics = [{"media_map_data": {}, "string_map_data": {"Name": {"href": "", "value": topic}}} for topic in TOPICS]
+    _write(folder_path, LAYOUT["recommended_topics"], {"topics_your_topics": topics})
+    insights = {"organic_insights_audience": [{"media_map_data": {}, "string_map_data": {
+        "Followers": {"value": f"{len(accounts) * 9 // 20:,}"},
+        "Follower Percentage by Age for Men": {"value": "13-17: 1.2%, 18-24: 30.5%, 25-34: 40%, 35-44: 20.3%, 45-54: 8%"},
+        "Follower Percentage by Age for Women": {"value": "13-17: 2.2%, 18-24: 35.5%, 25-34: 38%, 35-44: 16.3%, 45-54: 8%"},
+    }}]}
+    _write(folder_path, LAYOUT["audience_insights"], insights)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Instagram archive for profiling and benchmarks.")
+    parser.add_argument("folder_path", help="folder to write the archive to")
+    parser.add_argument("--scale", default="small", help=f"{', '.join(SCALES)} or a number of post likes "
+                                                          "(default: small)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+    try:
+        records = make_archive(args.folder_path, args.scale, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Synthetic archive with {records} post likes written to {args.folder_path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,28 +13,66 @@ Date: 2025-04-16
 
 import os
 import sys
-import json
-import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def find_file_in_subdirectories(folder_path, filename):
+from core.archive import find_file_in_subdirectories, load_json
+from core.encoders import finish_charts
+from core.progress import ProgressReporter
+from core.rendering import get_template, save_figure
+from core.schemas import get_schema
+
+
+def extract_topics(data, reporter=None):
     """
-    Recursively search for the specified file in subdirectories.
+    Extract topic names from parsed recommended_topics.json.
     """
-    for root, dirs, files in os.walk(folder_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+    reporter = reporter or ProgressReporter(enabled=False)
+    schema = get_schema("recommended_topics")
+    return list(schema.values("name", reporter.iterate("aggregate", schema.records(data))))
+
+
+def topic_wordcloud(topics):
+    """
+    Lay out a word cloud of the given topic names; shared with the dashboard panel.
+    """
+    # Join topics into a single string for word cloud generation
+    text = " ".join(topics)
+    return WordCloud(width=800, height=500, background_color="white").generate(text)
+
+
+def render_topic_wordcloud(topics, output_path, reporter=None):
+    """
+    Draw a word cloud of the given topic names and save it to output_path.
+    """
+    reporter = reporter or ProgressReporter(enabled=False)
+
+    # Generate word cloud
+    reporter.start("render", 1)
+    wc = topic_wordcloud(topics)
+
+    # Print and save the word cloud
+    with get_template("wordcloud").render() as (fig, ax):
+        ax.imshow(wc, interpolation="bilinear")
+        ax.axis("off")
+
+        # Save as PNG
+        save_figure(fig, output_path, message="Visualization saved to: {path}")
+    reporter.update("render", 1, 1)
 
 
-def generate_topic_wordcloud(folder_path):
+def generate_topic_wordcloud(folder_path, reporter=None):
     """
     Generate a word cloud from recommended topics in the given folder.
     Saves the image to an OUTPUT_FOLDER inside folder_path.
     """
+    reporter = reporter or ProgressReporter.from_env()
+
     # Search for the recommended_topics.json file in the folder and its subdirectories
-    topics_path = find_file_in_subdirectories(folder_path, "recommended_topics.json")
+    topics_path = find_file_in_subdirectories(folder_path, "recommended_topics.json", reporter)
 
     if topics_path is None:
         print(f"Error: Could not find recommended_topics.json in {folder_path} or its subdirectories")
@@ -47,35 +85,15 @@ def generate_topic_wordcloud(folder_path):
     # Construct the output path inside OUTPUT_FOLDER
     output_path = os.path.join(output_folder, "top_topics.png")
 
-    # Load the JSON file
-    with open(topics_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-
-    # Extract topic names
-    topics = [
-        item["string_map_data"]["Name"]["value"]
-        for item in data.get("topics_your_topics", [])
-        if "Name" in item.get("string_map_data", {})
-    ]
+    # Load the JSON file and extract topic names
+    data = load_json(topics_path, reporter)
+    topics = extract_topics(data, reporter)
 
     if not topics:
         print("No topics found to generate word cloud.")
         return
 
-    # Join topics into a single string for word cloud generation
-    text = " ".join(topics)
-
-    # Generate word cloud
-    wc = WordCloud(width=800, height=500, background_color="white").generate(text)
-
-    # Print and save the word cloud
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wc, interpolation="bilinear")
-    plt.axis("off")
-
-    # Save as PNG
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    print(f"Visualization saved to: {output_path}")
+    render_topic_wordcloud(topics, output_path, reporter)
 
 
 # Entry point for command-line use
@@ -86,3 +104,4 @@ if __name__ == "__main__":
 
     folder = sys.argv[1]
     generate_topic_wordcloud(folder)
+    sys.exit(finish_charts())
@@ -0,0 +1,172 @@
+"""
+Preservr Data Visualizations - Username Dictionary
+
+Description: Interns usernames into dense integer IDs shared by every analysis of an
+             archive. Loaders turn usernames into ID arrays as they read entries, so
+             counting is a single np.bincount and follow-set comparisons run on
+             sorted integer arrays. Because IDs are shared, arrays from different
+             datasets (e.g. likes and followers) line up index-for-index.
+Input: Usernames extracted by the loaders
+Output: NumPy ID and count arrays, and the names they stand for
+Date: 2026-10-19
+"""
+
+import itertools
+import os
+import threading
+import numpy as np
+
+from core.memory import MERGE_BLOCK_IDS
+
+# Dtype used for ID arrays; comfortably covers any archive's distinct usernames.
+ID_DTYPE = np.int32
+
+_archive_dictionaries = {}
+_archive_lock = threading.Lock()
+
+
+class UsernameDictionary:
+    """Assigns dense integer IDs (0, 1, 2, ...) to usernames in first-seen order."""
+
+    def __init__(self):
+        self._ids = {}
+        self.names = []
+        # Loaders for different datasets may intern into the same dictionary concurrently.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def intern(self, name):
+        """Return the ID for a username, assigning a new one if it is unseen."""
+        with self._lock:
+            user_id = self._ids.get(name)
+            if user_id is None:
+                user_id = self._ids[name] = len(self.names)
+                self.names.append(name)
+            return user_id
+
+    def intern_many(self, names):
+        """Return an ID array for an iterable of usernames."""
+        # Materialize first so the lock is not held while the caller's generator parses.
+        names = list(names)
+        ids = self._ids
+        known = self.names
+        out = []
+        with self._lock:
+            for name in names:
+                user_id = ids.get(name)
+                if user_id is None:
+                    user_id = ids[name] = len(known)
+                    known.append(name)
+                out.append(user_id)
+        return np.array(out, dtype=ID_DTYPE)
+
+    def intern_chunks(self, names, chunk_size):
+        """Yield ID arrays for successive chunks of at most chunk_size usernames."""
+        names = iter(names)
+        while True:
+            chunk = list(itertools.islice(names, chunk_size))
+            if not chunk:
+                return
+            yield self.intern_many(chunk)
+
+    def count_names(self, names, chunk_size=None):
+        """
+        Intern and count usernames. With a chunk_size, names are interned and
+        counted a chunk at a time and the partial counts merged, so the full
+        list of names is never held; the result is the same either way.
+        """
+        if chunk_size is None:
+            return self.counts(self.intern_many(names))
+        total = np.zeros(0, dtype=np.int64)
+        for ids in self.intern_chunks(names, chunk_size):
+            partial = self.counts(ids)
+            total = align(total, len(partial)) + partial
+        return align(total, len(self))
+
+    def id_of(self, name):
+        """Return the ID for a username, or None if it was never interned."""
+        return self._ids.get(name)
+
+    def names_for(self, ids):
+        """Map an array of IDs back to their usernames."""
+        names = self.names
+        return [names[i] for i in ids]
+
+    def counts(self, ids):
+        """Count occurrences of each ID; the result is indexed by ID."""
+        return np.bincount(ids, minlength=len(self)).astype(np.int64, copy=False)
+
+    def to_dict(self, counts):
+        """Convert a count array to {username: count} for the non-zero entries."""
+        names = self.names
+        return {names[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+
+def for_archive(folder_path):
+    """Return the username dictionary shared by all analyses of one archive folder."""
+    key = os.path.realpath(folder_path)
+    with _archive_lock:
+        dictionary = _archive_dictionaries.get(key)
+        if dictionary is None:
+            dictionary = _archive_dictionaries[key] = UsernameDictionary()
+        return dictionary
+
+
+def align(counts, size):
+    """Zero-pad a count array to `size` entries so arrays from different loads line up."""
+    if len(counts) >= size:
+        return counts
+    return np.concatenate([counts, np.zeros(size - len(counts), dtype=counts.dtype)])
+
+
+def unique_ids(ids):
+    """Return the sorted distinct IDs of an ID array."""
+    return np.unique(ids)
+
+
+def _by_blocks(operation, a, b):
+    """Apply a sorted-set operation one ID range at a time, for disk-backed arrays."""
+    upper = max(int(a[-1]) if len(a) else -1, int(b[-1]) if len(b) else -1) + 1
+    blocks = max(1, -(-(len(a) + len(b)) // MERGE_BLOCK_IDS))
+    edges = np.linspace(0, upper, blocks + 1).astype(np.int64)
+    parts = [
+        operation(a[np.searchsorted(a, lo):np.searchsorted(a, hi)],
+                  b[np.searchsorted(b, lo):np.searchsorted(b, hi)], assume_unique=True)
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ]
+    return np.concatenate(parts).astype(ID_DTYPE, copy=False)
+
+
+def intersect(a, b):
+    """IDs present in both sorted unique arrays."""
+    if isinstance(a, np.memmap) or isinstance(b, np.memmap):
+        return _by_blocks(np.intersect1d, a, b)
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def difference(a, b):
+    """IDs in sorted unique array `a` but not in `b`."""
+    if isinstance(a, np.memmap) or isinstance(b, np.memmap):
+        return _by_blocks(np.setdiff1d, a, b)
+    return np.setdiff1d(a, b, assume_unique=True)
+
+
+def top_ids(counts, n=None, usernames=None):
+    """
+    Return IDs with non-zero counts ordered by count descending. Ties are
+    ordered by ID, or by username when `usernames` is given; the latter does
+    not depend on the order in which concurrent loaders interned the names.
+    """
+    nonzero = np.flatnonzero(counts)
+    if usernames is None:
+        order = np.argsort(-counts[nonzero], kind="stable")
+    else:
+        by_name = np.argsort(np.array(usernames.names_for(nonzero), dtype=object), kind="stable")
+        order = by_name[np.argsort(-counts[nonzero][by_name], kind="stable")]
+    ranked = nonzero[order]
+    return ranked if n is None else ranked[:n]
@@ -0,0 +1,175 @@
+"""
+Preservr Data Visualizations - Watch Mode
+
+Description: Polls an archive folder for new or updated export files and re-runs only
+             the analyses that depend on them. Changed datasets are mapped through the
+             registry to the tables built from them; only those tables are dropped
+             from the scheduler's cache, so every other extract is reused. A change is
+             acted on once the file has stopped changing for one poll interval, so
+             half-copied files are not parsed. Datasets split across numbered files
+             (post_comments_N.json) are watched as a whole: a shard that changes,
+             appears or disappears changes the dataset.
+Input: An Instagram archive folder and the analyses to keep up to date
+Output: Refreshed artifacts in OUTPUT_FOLDER each time an input changes
+Date: 2026-10-19
+"""
+
+import os
+import threading
+
+from core.archive import find_numbered_files, list_numbered_files
+from core.registry import ANALYSES, DATASETS, SHARDED_DATASETS, TABLES, shard_stem
+
+# Seconds between two polls of the archive.
+DEFAULT_INTERVAL = 2.0
+# Re-walk the whole archive (to notice newly added files) every this many polls.
+RESCAN_EVERY = 10
+
+
+def _stat(path):
+    """Return (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+class ArchiveWatcher:
+    """Detects added, modified and removed dataset files by polling their stat data."""
+
+    def __init__(self, folder_path, rescan_every=RESCAN_EVERY):
+        self.folder_path = folder_path
+        self.rescan_every = max(1, int(rescan_every))
+        self.paths = {}
+        # Sharded dataset key -> directories holding its shards, listed on every poll.
+        self.shard_directories = {}
+        self._seen = {}
+        self._candidates = {}
+        self._polls = 0
+
+    def start(self, paths=None):
+        """Record the current state of the archive as the baseline."""
+        self._locate(paths)
+        self._seen = self._snapshot()
+        self._candidates = {}
+
+    def _locate(self, paths=None):
+        """Walk the archive for every dataset file and the directories of every shard."""
+        from core.scheduler import locate_datasets
+        self.paths = dict(paths) if paths is not None else locate_datasets(self.folder_path)
+        self.shard_directories = {
+            key: {os.path.dirname(path) for path in find_numbered_files(self.folder_path, shard_stem(key))}
+            for key in SHARDED_DATASETS if self.paths.get(key)
+        }
+
+    def _state(self, key, path):
+        """What a dataset's files look like now: (path, stat), or every shard's for sharded datasets."""
+        if not path:
+            return None
+        if key not in SHARDED_DATASETS:
+            return path, _stat(path)
+        directories = self.shard_directories.get(key) or {os.path.dirname(path)}
+        return tuple((shard, _stat(shard)) for shard in list_numbered_files(directories, shard_stem(key)))
+
+    def _snapshot(self):
+        return {key: self._state(key, path) for key, path in self.paths.items()}
+
+    def poll(self):
+        """
+        Check the archive once and return the set of dataset keys whose files
+        changed and have since stopped changing.
+        """
+        self._polls += 1
+        if self._polls % self.rescan_every == 0 or not all(self.paths.values()):
+            self._locate()
+
+        current = self._snapshot()
+        settled = set()
+        for key, state in current.items():
+            if state == self._seen.get(key):
+                self._candidates.pop(key, None)
+                continue
+            if self._candidates.get(key) == state:
+                # Unchanged since the last poll: the write has finished.
+                settled.add(key)
+                self._seen[key] = state
+                del self._candidates[key]
+            else:
+                self._candidates[key] = state
+        return settled
+
+    def refresh(self):
+        """
+        Re-walk the archive and return the keys of every dataset that differs
+        from the baseline, without waiting for writes to settle. The current
+        state becomes the new baseline.
+        """
+        self._locate()
+        current = self._snapshot()
+        changed = {key for key, state in current.items() if state != self._seen.get(key)}
+        self._seen = current
+        self._candidates = {}
+        return changed
+
+
+def affected_tables(changed_keys):
+    """Tables built (directly or through other tables) from any changed dataset."""
+    affected = {name for name, table in TABLES.items() if set(table.inputs) & set(changed_keys)}
+    grew = True
+    while grew:
+        grew = False
+        for name, table in TABLES.items():
+            if name not in affected and set(table.requires) & affected:
+                affected.add(name)
+                grew = True
+    return affected
+
+
+def affected_analyses(changed_keys, analysis_names=None):
+    """Analyses among `analysis_names` that read a changed dataset or a table built from one."""
+    tables = affected_tables(changed_keys)
+    changed = set(changed_keys)
+    return [
+        name for name in (analysis_names or ANALYSES)
+        if tables & set(ANALYSES[name].tables + ANALYSES[name].optional_tables)
+        or changed & set(ANALYSES[name].inputs + ANALYSES[name].optional_inputs)
+    ]
+
+
+def watch(scheduler, analysis_names=None, interval=DEFAULT_INTERVAL, on_results=None, stop_event=None):
+    """
+    Run the analyses once, then keep them current until `stop_event` is set.
+
+    `on_results(changed_keys, results)` is called after every (re)run; the first
+    call has an empty set of changed keys.
+    """
+    analysis_names = list(analysis_names or ANALYSES)
+    stop_event = stop_event or threading.Event()
+
+    # Take the baseline before the first run so edits made during it are noticed.
+    watcher = ArchiveWatcher(scheduler.folder_path)
+    watcher.start(scheduler.locate())
+
+    results = scheduler.run(analysis_names)
+    if on_results is not None:
+        on_results(set(), results)
+
+    while not stop_event.wait(interval):
+        changed = watcher.poll()
+        if not changed:
+            continue
+        rerun = affected_analyses(changed, analysis_names)
+        if not rerun:
+            continue
+        scheduler.paths = dict(watcher.paths)
+        scheduler.invalidate(affected_tables(changed))
+        results = scheduler.run(rerun)
+        if on_results is not None:
+            on_results(changed, results)
+
+
+def describe_changes(changed_keys):
+    """Human-readable list of the changed file names."""
+    return ", ".join(sorted(f"{shard_stem(key)}_N.json" if key in SHARDED_DATASETS else DATASETS[key]
+                            for key in changed_keys))
@@ -0,0 +1,126 @@
+"""
+Preservr Data Visualizations - Date Range
+
+Description: Restricts analyses to a time window (--since/--until). Bounds are
+             dates (2024-03-01), months (2024-03), years (2024) or a number of
+             days before now (90d), in UTC; --until includes the whole day, month
+             or year it names. The window is pushed down into JSON parsing: its
+             object_hook sees every record as soon as the decoder has built it and
+             replaces out-of-range records with None, so they are dropped before
+             any loader extracts, interns or counts them, and a parsed file only
+             keeps the records in range.
+Input: Date bounds from the command line or the UI
+Output: A TimeWindow that tests records by their timestamps
+Date: 2026-10-19
+"""
+
+import calendar
+import re
+import time
+
+_DAYS = re.compile(r"^(\d+)d$")
+_DATE = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?$")
+
+
+def parse_bound(text, end=False, now=None):
+    """
+    Parse a date bound into a UTC timestamp: the start of the named period, or
+    its end (exclusive) when end=True. "90d" means the start of the day 90 days
+    before today, so a relative window stays the same all day.
+    """
+    text = str(text).strip()
+    match = _DAYS.match(text)
+    if match:
+        today = int(now if now is not None else time.time()) // 86400 * 86400
+        return today - int(match.group(1)) * 86400
+    match = _DATE.match(text)
+    if not match:
+        raise ValueError(f"Invalid date '{text}'. Use YYYY-MM-DD, YYYY-MM, YYYY or a number of days like 90d.")
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day is not None:
+            start = calendar.timegm((year, month, day, 0, 0, 0))
+            time.strptime(f"{year}-{month}-{day}", "%Y-%m-%d")
+            return start + 86400 if end else start
+        if month is not None:
+            if not 1 <= month <= 12:
+                raise ValueError
+            if end:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return calendar.timegm((year, month, 1, 0, 0, 0))
+        return calendar.timegm((year + 1 if end else year, 1, 1, 0, 0, 0))
+    except ValueError:
+        raise ValueError(f"Invalid date '{text}'") from None
+
+
+def record_timestamps(record):
+    """Timestamps of an archive record: string_list_data[*].timestamp, or string_map_data Time."""
+    stamps = [item["timestamp"] for item in record.get("string_list_data") or ()
+              if isinstance(item, dict) and "timestamp" in item]
+    fields = record.get("string_map_data")
+    if isinstance(fields, dict):
+        stamp = (fields.get("Time") or {}).get("timestamp")
+        if stamp is not None:
+            stamps.append(stamp)
+    return stamps
+
+
+class TimeWindow:
+    """
+    Records with a timestamp in [since, until); either bound may be None.
+    Records without any timestamp are outside every window.
+    """
+
+    def __init__(self, since=None, until=None, since_text=None, until_text=None):
+        self.since = since
+        self.until = until
+        self.since_text = since_text
+        self.until_text = until_text
+
+    @classmethod
+    def parse(cls, since=None, until=None, now=None):
+        """Build a window from --since/--until text; returns None when neither is given."""
+        if not since and not until:
+            return None
+        start = parse_bound(since, now=now) if since else None
+        stop = parse_bound(until, end=True, now=now) if until else None
+        if start is not None and stop is not None and start >= stop:
+            raise ValueError(f"--since {since} is not before --until {until}")
+        return cls(start, stop, since, until)
+
+    @property
+    def key(self):
+        """Identifies the range, e.g. for caching results per window."""
+        return (self.since, self.until)
+
+    def __eq__(self, other):
+        return isinstance(other, TimeWindow) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def contains(self, timestamp):
+        timestamp = int(timestamp)
+        return ((self.since is None or timestamp >= self.since)
+                and (self.until is None or timestamp < self.until))
+
+    def contains_record(self, record):
+        return any(self.contains(stamp) for stamp in record_timestamps(record))
+
+    def object_hook(self, obj):
+        """json object_hook: replaces out-of-range records with None and keeps everything else."""
+        if ("string_list_data" in obj or "string_map_data" in obj) and not self.contains_record(obj):
+            return None
+        return obj
+
+    def label(self):
+        """Short description for chart titles and logs, e.g. "since 2024-01"."""
+        parts = []
+        if self.since_text:
+            parts.append(f"since {self.since_text}")
+        if self.until_text:
+            parts.append(f"until {self.until_text}")
+        return " ".join(parts)
+
+    def __repr__(self):
+        return f"TimeWindow({self.since!r}, {self.until!r})"
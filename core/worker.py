@@ -0,0 +1,136 @@
+"""
+Preservr Data Visualizations - Warm Worker
+
+Description: A pipeline process started ahead of time so that the first analysis a
+             user asks for does not pay for start-up. On launch it imports the heavy
+             libraries, builds every figure template and draws text once, which
+             loads matplotlib's font cache and the Agg backend, and renders a tiny
+             word cloud to load its font. It then waits for JSON commands on stdin:
+             {"prepare": folder} parses the archive's tables ahead of time, and
+             {"run": [pipeline arguments]} runs the pipeline exactly as
+             core/pipeline.py would, reusing the prepared tables, and exits.
+Input: JSON command lines on stdin
+Output: The pipeline's normal output and artifacts for the "run" command
+Date: 2026-10-19
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+
+if __package__ in (None, ""):
+    # Allow running as a standalone script: python core/<module>.py <folder_path>
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Analysis modules the registry imports lazily; importing them up front pulls in
+# numpy, pandas, matplotlib and wordcloud.
+ANALYSIS_MODULES = (
+    "core.age_gender_distribution",
+    "core.dashboard",
+    "core.followers_following",
+    "core.interactions",
+    "core.most_commented_on_users",
+    "core.most_liked_users",
+    "core.most_liked_users_posts",
+    "core.most_liked_users_stories",
+    "core.top_topics",
+    "core.export",
+)
+
+
+def warm_up():
+    """Import the analysis stack and initialize fonts, figure templates and word cloud rendering."""
+    import importlib
+    for module in ANALYSIS_MODULES:
+        importlib.import_module(module)
+
+    from wordcloud import WordCloud
+    from core.rendering import TEMPLATE_SPECS, get_template
+
+    for name in TEMPLATE_SPECS:
+        with get_template(name).render() as (fig, axes):
+            for ax in axes if isinstance(axes, list) else [axes]:
+                ax.set_title("Preservr")
+                ax.set_xlabel("Preservr")
+            fig.canvas.draw()
+    WordCloud(width=64, height=32).generate_from_frequencies({"Preservr": 1})
+
+
+class PreparedArchive:
+    """An archive's tables, built before any analysis of it was requested."""
+
+    def __init__(self, folder_path):
+        from core.scheduler import AnalysisScheduler
+        from core.watch import ArchiveWatcher
+
+        self.folder_path = folder_path
+        self.scheduler = AnalysisScheduler(folder_path)
+        self.watcher = ArchiveWatcher(folder_path)
+
+    def build(self):
+        """
+        Build the tables of every analysis whose files are present. Tables whose
+        files cannot be read are left for the run to rebuild and report; any
+        other error is a bug and propagates.
+        """
+        from core.registry import ANALYSES, AnalysisError
+
+        self.watcher.start(self.scheduler.locate())
+        _, runnable, _ = self.scheduler.plan(list(ANALYSES))
+        # Analyses print as they load; nobody is reading yet.
+        with contextlib.redirect_stdout(io.StringIO()):
+            for analysis in runnable:
+                for table_name in analysis.tables_for(self.scheduler.paths):
+                    try:
+                        self.scheduler.table(table_name)
+                    except (OSError, ValueError, KeyError, AnalysisError):
+                        pass
+
+    def scheduler_for(self, args):
+        """
+        Return the prepared scheduler if it can serve a pipeline run with these
+        arguments, after dropping tables whose files changed since they were built.
+        """
+        from core.planner import AUTO
+        from core.watch import affected_tables
+
+        if (os.path.realpath(args.folder_path) != os.path.realpath(self.folder_path)
+                or args.export or args.max_memory
+                or any(mode != AUTO for mode in args.overrides.values())):
+            return None
+        changed = self.watcher.refresh()
+        self.scheduler.paths = dict(self.watcher.paths)
+        if changed:
+            self.scheduler.invalidate(affected_tables(changed))
+        return self.scheduler
+
+
+def serve(commands=None):
+    """Handle commands until a run finishes (returning its exit status) or input ends."""
+    from core.pipeline import parse_args, run
+
+    commands = commands if commands is not None else sys.stdin
+    prepared = None
+    for line in commands:
+        if not line.strip():
+            continue
+        command = json.loads(line)
+        if "prepare" in command:
+            prepared = PreparedArchive(command["prepare"])
+            prepared.build()
+        elif "run" in command:
+            args = parse_args(command["run"])
+            scheduler = prepared.scheduler_for(args) if prepared is not None else None
+            return run(args, scheduler)
+    return 0
+
+
+def main():
+    warm_up()
+    sys.exit(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Shared fixtures for the test suite. Run from the repository root with: python -m pytest
+"""
+
+import pytest
+
+import core.encoders
+from core.encoders import ChartEncoder
+from core.synthetic import make_archive
+
+# Post likes in the synthetic test archive; small enough to build every chart in seconds.
+ARCHIVE_RECORDS = 600
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """A fresh synthetic Instagram archive folder."""
+    folder = tmp_path / "archive"
+    make_archive(str(folder), ARCHIVE_RECORDS)
+    return str(folder)
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    """A fresh process encoder, so failures do not leak between tests."""
+    encoder = ChartEncoder()
+    monkeypatch.setattr(core.encoders, "_encoder", encoder)
+    yield encoder
+    encoder.close()
@@ -0,0 +1,55 @@
+from collections import Counter
+
+from core.activity_index import ActivityIndex
+from core.archive import find_numbered_files, from_latin1, load_json
+from core.scheduler import locate_datasets
+from core.schemas import get_schema
+from core.window import TimeWindow
+
+
+def _owners(paths, dataset, field):
+    schema = get_schema(dataset)
+    return Counter(from_latin1(name) for path in paths
+                   for name in schema.values(field, schema.records(load_json(path))))
+
+
+def test_lookup_returns_every_record_of_the_account(archive):
+    paths = locate_datasets(archive)
+    index = ActivityIndex.open(archive, paths)
+    try:
+        likes = _owners([paths["liked_posts"]], "liked_posts", "owner")
+        comments = _owners(find_numbered_files(archive, "post_comments"), "post_comments", "owner")
+        username, liked = likes.most_common(1)[0]
+
+        assert index.counts(username).get("liked_posts") == liked
+        assert index.counts(username).get("post_comments", 0) == comments[username]
+        entries = index.entries(username, ["liked_posts"])
+        assert [entry.timestamp for entry in entries] == sorted(entry.timestamp for entry in entries)
+        assert {index.record(entry)["title"] for entry in entries} == {username}
+        assert index.entries("nobody-has-this-name") == [] and index.counts("nobody-has-this-name") == {}
+    finally:
+        index.close()
+
+
+def test_window_limits_the_entries(archive):
+    index = ActivityIndex.open(archive)
+    username = max(index.names, key=lambda name: len(index.entries(name)))
+    entries = index.entries(username)
+    middle = entries[len(entries) // 2].timestamp
+
+    recent = index.entries(username, window=TimeWindow(since=middle))
+    assert recent and all(entry.timestamp >= middle for entry in recent)
+    assert len(recent) < len(entries)
+    index.close()
+
+
+def test_saved_index_is_reused_until_a_file_changes(archive):
+    paths = locate_datasets(archive)
+    ActivityIndex.open(archive, paths).close()
+    assert ActivityIndex.load(archive, paths) is not None
+
+    with open(paths["following"], "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert ActivityIndex.load(archive, paths) is None
+    ActivityIndex.open(archive, paths).close()
+    assert ActivityIndex.load(archive, paths) is not None
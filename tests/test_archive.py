@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import tracemalloc
+
+import core.archive
+from core.archive import iter_json_records, load_json
+from core.progress import PROGRESS_PREFIX, ProgressReporter
+
+
+def _reporter():
+    stream = io.StringIO()
+    return ProgressReporter(stream, min_interval=0), stream
+
+
+def _parse_updates(stream):
+    lines = [json.loads(line[len(PROGRESS_PREFIX):]) for line in stream.getvalue().splitlines()
+             if line.startswith(PROGRESS_PREFIX)]
+    return [(line["done"], line["total"]) for line in lines if line["stage"] == "parse"]
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_load_json_reports_progress_in_bytes(monkeypatch, tmp_path):
+    monkeypatch.setattr(core.archive, "READ_CHUNK_SIZE", 1024)
+    data = {"likes_media_likes": [{"title": f"usér_{i}", "value": "\U0001f44d"} for i in range(2000)]}
+    path = _write(tmp_path, data)
+    reporter, stream = _reporter()
+
+    assert load_json(path, reporter) == data
+    updates = _parse_updates(stream)
+    total = len(open(path, "rb").read())
+    assert updates[0] == (0, total) and updates[-1] == (total, total)
+    done = [update[0] for update in updates]
+    # Progress advances once per chunk read (1024 characters).
+    assert len(done) > total // 2048 and done == sorted(done)
+
+
+def test_load_json_applies_object_hook_with_and_without_reporter(tmp_path):
+    path = _write(tmp_path, [{"keep": True}, {"keep": False}])
+
+    def hook(record):
+        return record if record.get("keep", True) else None
+
+    reporter, _ = _reporter()
+    assert load_json(path, reporter, hook) == load_json(path, None, hook) == [{"keep": True}, None]
+
+
+def test_batched_decoding_matches_json_load(monkeypatch, tmp_path):
+    monkeypatch.setattr(core.archive, "READ_CHUNK_SIZE", 512)
+    # Objects inside the records end in "}, {" too, so some batch boundaries fall inside a record.
+    records = [{"title": f"user_{i}", "string_list_data": [{"value": "a}, {"}, {"timestamp": i}], "n": [i, 2.5]}
+               for i in range(300)]
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"likes_media_likes": records, "empty": [], "more": [[1], "x"]}, indent=2))
+    reporter, _ = _reporter()
+    with open(path, encoding="utf-8") as f:
+        assert load_json(str(path), reporter) == json.load(f)
+
+
+def test_load_json_is_below_complete_while_decoding(monkeypatch, tmp_path):
+    monkeypatch.setattr(core.archive, "READ_CHUNK_SIZE", 1024)
+    path = _write(tmp_path, {"likes_media_likes": [{"title": f"user_{i}"} for i in range(200)]})
+    reporter, stream = _reporter()
+    seen = []
+
+    def hook(record):
+        # Called while the file is being decoded.
+        seen.append(_parse_updates(stream)[-1])
+        return record
+
+    load_json(path, reporter, hook)
+    total = seen[0][1]
+    assert all(done < total for done, _ in seen)
+    assert len({done for done, _ in seen}) > 1
+    assert _parse_updates(stream)[-1] == (total, total)
+
+
+def _peak(path, reporter):
+    tracemalloc.start()
+    try:
+        load_json(path, reporter)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_load_json_with_reporter_holds_no_more_than_a_plain_load(tmp_path):
+    path = _write(tmp_path, {"likes_media_likes": [{"title": f"user_{i}", "value": [i]} for i in range(50000)]})
+    with open(os.devnull, "w") as devnull:
+        reporting = _peak(path, ProgressReporter(devnull))
+    # Decoding reads one chunk at a time instead of the whole text.
+    assert reporting < 1.25 * _peak(path, None)
+
+
+def test_iter_json_records_matches_load_json(tmp_path):
+    data = {"relationships_following": [{"n": i} for i in range(100)], "other": [1, 2]}
+    path = _write(tmp_path, data)
+    assert list(iter_json_records(path, "relationships_following")) == data["relationships_following"]
+    assert list(iter_json_records(path, "missing")) == []
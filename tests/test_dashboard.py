@@ -0,0 +1,47 @@
+import os
+
+import core.dashboard
+import core.registry
+from core.dashboard import PANELS, render_dashboard
+from core.scheduler import AnalysisScheduler, FAILED, SUCCEEDED
+
+
+def test_dashboard_reuses_the_tables_of_the_other_charts(monkeypatch, archive, encoder):
+    builds = []
+    for table in core.registry.TABLES.values():
+        monkeypatch.setattr(table, "build", lambda *args, _build=table.build, _name=table.name, **kwargs:
+                            builds.append(_name) or _build(*args, **kwargs))
+    saved = []
+    save_figure = core.dashboard.save_figure
+    monkeypatch.setattr(core.dashboard, "save_figure",
+                        lambda fig, path, **kwargs: saved.append(path) or save_figure(fig, path, **kwargs))
+
+    results = AnalysisScheduler(archive).run(["dashboard", "most_liked_users", "top_topics"])
+
+    assert {result.status for result in results.values()} == {SUCCEEDED}
+    assert sorted(builds) == sorted(set(builds))
+    assert saved == [os.path.join(archive, "OUTPUT_FOLDER", "dashboard.png")]
+    assert os.path.exists(saved[0])
+
+
+def test_missing_panels_are_marked(monkeypatch, tmp_path, encoder):
+    drawn = {}
+
+    def capture(fig, path, **kwargs):
+        for ax in fig.axes:
+            drawn[ax.get_title()] = [text.get_text() for text in ax.texts]
+    monkeypatch.setattr(core.dashboard, "save_figure", capture)
+
+    render_dashboard({"topics": None, "follows": {"mutual": 3, "follows_me_only": 1, "i_follow_only": 2}},
+                     str(tmp_path / "dashboard.png"), note="since 2024")
+
+    assert drawn[PANELS["topics"]] == ["Not found in this archive"]
+    assert drawn[PANELS["likes"]] == ["Not found in this archive"]
+    assert "Follow-Back Summary (4 followers, 5 following)" in drawn
+
+
+def test_dashboard_fails_without_any_of_its_files(tmp_path, encoder):
+    (tmp_path / "post_comments_1.json").write_text("[]")
+    result = AnalysisScheduler(str(tmp_path)).run(["dashboard"])["dashboard"]
+    assert result.status == FAILED
+    assert result.error == "None of the dashboard's files were found."
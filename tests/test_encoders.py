@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from core.encoders import ChartEncoder, OutputOptions, finish_charts, image_artifact
+from core.rendering import get_template, save_figure
+from core.scheduler import AnalysisScheduler, FAILED
+
+
+def _draw(path, message=None):
+    with get_template("bar_chart").render() as (fig, ax):
+        ax.bar(["a", "b"], [1, 2])
+        return save_figure(fig, path, dpi=50, message=message)
+
+
+def test_saved_message_is_printed_once_the_file_is_written(monkeypatch, capsys, tmp_path, encoder):
+    release = threading.Event()
+    save = Image.Image.save
+
+    def slow_save(image, *args, **kwargs):
+        release.wait(10)
+        return save(image, *args, **kwargs)
+    monkeypatch.setattr(Image.Image, "save", slow_save)
+
+    job = _draw(str(tmp_path / "chart.png"), message="Visualization saved to: {path}")
+    assert "saved" not in capsys.readouterr().out
+    assert not os.path.exists(job.path)
+
+    release.set()
+    ChartEncoder.wait([job])
+    assert os.path.exists(job.path)
+    assert capsys.readouterr().out == f"Visualization saved to: {job.path}\n"
+
+
+def test_failed_write_is_reported_not_announced(monkeypatch, capsys, tmp_path, encoder):
+    def broken_save(image, *args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(Image.Image, "save", broken_save)
+
+    job = _draw(str(tmp_path / "chart.png"), message="Visualization saved to: {path}")
+    with pytest.raises(OSError):
+        ChartEncoder.wait([job])
+    assert finish_charts() == 1
+    out = capsys.readouterr().out
+    assert "saved" not in out
+    assert f"could not write {job.path}: disk full" in out
+    assert not os.listdir(tmp_path)
+
+
+def test_scheduler_fails_analysis_whose_chart_cannot_be_written(monkeypatch, capsys, archive, encoder):
+    def broken_save(image, *args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(Image.Image, "save", broken_save)
+
+    result = AnalysisScheduler(archive).run(["top_topics"])["top_topics"]
+    assert result.status == FAILED
+    assert "disk full" in result.error
+    assert "Visualization saved" not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("image_format", ["png", "jpeg", "webp", "svg"])
+def test_output_formats(tmp_path, encoder, image_format):
+    encoder.options = OutputOptions(image_format, dpi=50)
+    job = ChartEncoder.wait([_draw(str(tmp_path / "chart.png"))])[0]
+    assert job.path == str(tmp_path / image_artifact("chart.png", image_format))
+    assert job.bytes == os.path.getsize(job.path) > 0
+
+
+def test_output_options_reject_bad_values():
+    for kwargs in ({"image_format": "gif"}, {"png_level": 10}, {"quality": 0}, {"dpi": 0}):
+        with pytest.raises(ValueError):
+            OutputOptions(**kwargs)
@@ -0,0 +1,19 @@
+import glob
+import os
+import subprocess
+import sys
+
+import pytest
+
+CORE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core")
+SCRIPTS = sorted(os.path.basename(path) for path in glob.glob(os.path.join(CORE, "*.py"))
+                 if 'if __name__ == "__main__":' in open(path, encoding="utf-8").read())
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_script_starts_when_run_by_path(tmp_path, script):
+    # Scripts without argparse take "--help" as a missing folder and say so.
+    completed = subprocess.run([sys.executable, os.path.join(CORE, script), "--help"], cwd=tmp_path,
+                               stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert "Traceback" not in completed.stderr
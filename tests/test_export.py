@@ -0,0 +1,63 @@
+import csv
+import gzip
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.archive import load_json
+from core.export import count_rows, write_table
+from core.scheduler import AnalysisScheduler, SUCCEEDED
+from core.schemas import SCHEMAS
+from core.usernames import UsernameDictionary
+
+
+def test_csv_and_ndjson_hold_the_same_rows(tmp_path):
+    rows = [("ana", 3), ("bo", 1)]
+    assert write_table(str(tmp_path / "t.csv"), ["Username", "Likes"], iter(rows)) == 2
+    assert write_table(str(tmp_path / "t.ndjson"), ["Username", "Likes"], iter(rows), fmt="ndjson") == 2
+
+    with open(tmp_path / "t.csv", encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [["Username", "Likes"], ["ana", "3"], ["bo", "1"]]
+    with open(tmp_path / "t.ndjson", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"Username": "ana", "Likes": 3}, {"Username": "bo", "Likes": 1}]
+
+
+def test_compressed_export_and_empty_table(tmp_path):
+    path = str(tmp_path / "nested" / "t.csv.gz")
+    assert write_table(path, ["Topic", "Count"], [], compress=True) == 0
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["Topic,Count"]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_table(str(tmp_path / "t.xml"), ["a"], [], fmt="xml")
+
+
+def test_count_rows_reads_plain_ints():
+    usernames = UsernameDictionary()
+    ids = usernames.intern_many(["ana", "bo"])
+    rows = list(count_rows(usernames, ids[::-1], np.array([5, 7], dtype=np.int64)))
+    assert rows == [("bo", 5), ("ana", 7)]
+    assert type(rows[0][1]) is int
+
+
+def test_exported_like_counts_match_the_archive(archive, encoder):
+    results = AnalysisScheduler(archive, export_format="csv").run(["most_liked_users_posts"])
+    result = results["most_liked_users_posts"]
+    assert result.status == SUCCEEDED
+    exported = [path for path in result.artifacts if path.endswith("liked_posts.csv")]
+    assert exported and os.path.exists(exported[0])
+
+    schema = SCHEMAS["liked_posts"]
+    path = AnalysisScheduler(archive).locate()["liked_posts"]
+    expected = Counter(schema.values("owner", schema.records(load_json(path))))
+    with open(exported[0], encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        assert next(reader) == ["Username", "Post Likes"]
+        counts = [(name, int(count)) for name, count in reader]
+    assert dict(counts) == expected
+    assert [count for _, count in counts] == sorted(expected.values(), reverse=True)
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+from core import extraction_benchmark
+from core.extraction_benchmark import benchmark_dataset, dataset_paths
+from core.schemas import SCHEMAS
+
+
+def test_dataset_paths_finds_every_file_type(archive):
+    paths = dataset_paths(archive)
+    assert set(paths) == set(SCHEMAS)
+    assert len(paths["post_comments"]) == 3
+
+
+def test_benchmark_dataset_reports_every_field(archive):
+    paths = dataset_paths(archive)
+    for dataset in ("liked_posts", "post_comments", "following"):
+        report = benchmark_dataset(dataset, paths[dataset], repeats=1)
+        assert report["records"] > 0
+        assert set(report["fields"]) == set(SCHEMAS[dataset].fields)
+        for field in report["fields"].values():
+            assert field["values"] > 0
+            assert field["compiled_per_second"] > 0
+        assert report["streamed_per_second"] > 0
+
+
+def test_command_line_writes_a_json_report(archive, tmp_path):
+    output = tmp_path / "report.json"
+    completed = subprocess.run(
+        [sys.executable, extraction_benchmark.__file__, archive, "--repeat", "1", "--output", str(output)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    assert completed.returncode == 0, completed.stderr
+    document = json.loads(output.read_text())
+    assert [report["dataset"] for report in document["datasets"]] == list(SCHEMAS)
+    assert "compiled/s" in completed.stderr
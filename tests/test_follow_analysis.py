@@ -0,0 +1,91 @@
+import io
+import os
+import sys
+import threading
+
+import numpy as np
+
+from core.followers_following import (analyze_follow_data, follow_set_counts, iter_follow_categories,
+                                      load_usernames, read_follow_analysis, write_follow_analysis)
+from core.usernames import UsernameDictionary, unique_ids
+from ui.follow_viewer import PrefixIndex
+
+
+def _follows(usernames, *names):
+    return unique_ids(usernames.intern_many(names))
+
+
+def test_categories_survive_the_round_trip_through_the_file(tmp_path):
+    usernames = UsernameDictionary()
+    followers = _follows(usernames, "zoe", "amy", "bob")
+    following = _follows(usernames, "bob", "cal", "amy")
+
+    write_follow_analysis(str(tmp_path), followers, following, usernames)
+    results = read_follow_analysis(os.path.join(tmp_path, "OUTPUT_FOLDER", "follow_analysis.txt"))
+
+    assert results == {"mutual": ["amy", "bob"], "follows_me_only": ["zoe"], "i_follow_only": ["cal"]}
+    assert {category: len(names) for category, names in results.items()} == follow_set_counts(followers, following)
+    assert list(iter_follow_categories(followers, following, usernames)) == [
+        ("amy", "mutual"), ("bob", "mutual"), ("zoe", "follows_me_only"), ("cal", "i_follow_only")]
+
+
+def test_empty_categories_are_read_back_empty(tmp_path):
+    usernames = UsernameDictionary()
+    followers = _follows(usernames, "amy")
+    empty = np.zeros(0, dtype=followers.dtype)
+
+    write_follow_analysis(str(tmp_path), followers, empty, usernames)
+    results = read_follow_analysis(os.path.join(tmp_path, "OUTPUT_FOLDER", "follow_analysis.txt"))
+    assert results == {"mutual": [], "follows_me_only": ["amy"], "i_follow_only": []}
+
+
+def test_archive_analysis_covers_every_account(archive):
+    analyze_follow_data(archive)
+    results = read_follow_analysis(os.path.join(archive, "OUTPUT_FOLDER", "follow_analysis.txt"))
+    followers = results["mutual"] + results["follows_me_only"]
+    following = results["mutual"] + results["i_follow_only"]
+    assert len(set(followers)) == len(followers) > 0
+    assert len(set(following)) == len(following) > 0
+
+
+class _Writes(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+
+def test_parallel_loads_print_whole_lines(monkeypatch, archive):
+    stdout = _Writes()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    paths = [os.path.join(archive, "connections", "followers_and_following", name)
+             for name in ("followers_1.json", "following.json")] * 4
+    threads = [threading.Thread(target=load_usernames, args=(path, f"Load {i}")) for i, path in enumerate(paths)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stdout.writes) == len(paths)
+    assert all(text.startswith("[Load ") and text.endswith("\n") for text in stdout.writes)
+
+
+def test_prefix_search_is_case_insensitive_and_narrows():
+    index = PrefixIndex(["Bea", "adam", "ben", "alice", "bob"])
+    start, stop = index.search("b")
+    assert [index.name_at(i) for i in range(start, stop)] == ["Bea", "ben", "bob"]
+    start, stop = index.search("BE")
+    assert [index.name_at(i) for i in range(start, stop)] == ["Bea", "ben"]
+    start, stop = index.search("a")
+    assert [index.name_at(i) for i in range(start, stop)] == ["adam", "alice"]
+    assert index.search("z") == (5, 5)
+
+
+def test_sorted_names_are_indexed_in_place():
+    names = ["amy", "bob", "cal"]
+    index = PrefixIndex(names)
+    assert index.order is None and index.names is names
+    assert index.name_at(index.search("c")[0]) == "cal"
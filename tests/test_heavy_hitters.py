@@ -0,0 +1,87 @@
+import json
+import os
+import random
+
+import pytest
+
+import core.archive
+from core.heavy_hitters import SpaceSaving, guaranteed_top
+from core.most_liked_users import load_post_likes_data, load_post_likes_sketch, load_story_likes_sketch
+from core.usernames import UsernameDictionary
+
+CAPACITY = 200
+TOP_K = 10
+
+
+@pytest.fixture
+def skewed_archive(tmp_path):
+    """An archive whose 20,000 post likes follow a Zipf-like distribution over 2,000 users."""
+    rng = random.Random(7)
+    users = [f"user_{i}" for i in range(2000)]
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(users))]
+    likes = [{"title": name, "string_list_data": [{"href": "", "value": "", "timestamp": 1700000000}]}
+             for name in rng.choices(users, weights, k=20000)]
+    folder = tmp_path / "skewed" / "your_instagram_activity" / "likes"
+    os.makedirs(folder)
+    with open(folder / "liked_posts.json", "w", encoding="utf-8") as f:
+        json.dump({"likes_media_likes": likes}, f)
+    return str(tmp_path / "skewed")
+
+
+def _exact_counts(archive):
+    usernames = UsernameDictionary()
+    return usernames.to_dict(load_post_likes_data(archive, usernames=usernames))
+
+
+def _exact_top(counts, k):
+    return [name for name, _ in sorted(counts.items(), key=lambda pair: (-pair[1], pair[0]))[:k]]
+
+
+def test_sketch_bounds_hold_for_every_tracked_user(skewed_archive):
+    exact = _exact_counts(skewed_archive)
+    sketch = load_post_likes_sketch(skewed_archive, capacity=CAPACITY)
+    assert sketch.total == sum(exact.values())
+    assert len(sketch) == CAPACITY
+    for entry in sketch.top():
+        assert entry.count - entry.error <= exact.get(entry.item, 0) <= entry.count
+        assert entry.error <= sketch.total / CAPACITY
+    # Untracked users are bounded by the smallest tracked count.
+    tracked = set(sketch.items())
+    assert all(count <= sketch.min_count() for name, count in exact.items() if name not in tracked)
+
+
+def test_sketch_top_k_matches_exact_top_k(skewed_archive):
+    exact = _exact_counts(skewed_archive)
+    entries = load_post_likes_sketch(skewed_archive, capacity=CAPACITY).top()
+    exact_top = _exact_top(exact, TOP_K)
+
+    recall = len(set(exact_top) & {entry.item for entry in entries[:TOP_K]}) / TOP_K
+    assert recall >= 0.9
+    # Relative count error of the top users stays small on skewed data.
+    for entry in entries[:TOP_K]:
+        assert entry.count - exact[entry.item] <= 0.1 * exact[entry.item]
+    # Every user more frequent than total / capacity is guaranteed to be tracked.
+    total = sum(exact.values())
+    assert {name for name, count in exact.items() if count > total / CAPACITY} <= {entry.item for entry in entries}
+    # Ranks reported as certain really are in the exact top k.
+    assert {entry.item for entry in guaranteed_top(entries, TOP_K)} <= set(_exact_top(exact, TOP_K))
+
+
+def test_capacity_above_distinct_users_is_exact(archive):
+    exact = _exact_counts(archive)
+    sketch = load_post_likes_sketch(archive, capacity=len(exact) + 1)
+    assert {entry.item: entry.count for entry in sketch.top()} == exact
+    assert all(entry.error == 0 for entry in sketch.top())
+
+
+@pytest.mark.parametrize("load_sketch", [load_post_likes_sketch, load_story_likes_sketch])
+def test_sketch_loaders_stream_instead_of_parsing_whole_files(monkeypatch, archive, load_sketch):
+    def load_json(*args, **kwargs):
+        raise AssertionError("sketch loaders must not parse whole files")
+    monkeypatch.setattr(core.archive, "load_json", load_json)
+    assert load_sketch(archive, capacity=CAPACITY).total > 0
+
+
+def test_space_saving_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        SpaceSaving(0)
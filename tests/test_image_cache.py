@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from ui.image_cache import ImageCache, decode_for_display
+
+
+@pytest.fixture
+def cache():
+    cache = ImageCache(size=(80, 50), capacity=2)
+    yield cache
+    cache.close()
+
+
+def _chart(path, color="red", size=(2400, 1500)):
+    Image.new("RGB", size, color).save(path)
+    return str(path)
+
+
+def _decoded(cache, path):
+    cache.request(path)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        for done in cache.poll():
+            return done
+        time.sleep(0.01)
+    raise AssertionError("decode did not finish")
+
+
+@pytest.mark.parametrize("name", ["chart.png", "chart.jpg"])
+def test_charts_are_decoded_to_the_display_size(tmp_path, name):
+    image = decode_for_display(_chart(tmp_path / name), (80, 50))
+    assert image.size == (80, 50) and image.mode == "RGBA"
+
+
+def test_decoded_chart_is_reused_until_the_file_changes(tmp_path, cache):
+    path = _chart(tmp_path / "chart.png")
+    assert cache.get(path) is None
+    done_path, entry, error = _decoded(cache, path)
+    assert (done_path, error) == (path, None)
+    assert cache.get(path) is entry
+
+    _chart(tmp_path / "chart.png", "blue")
+    os.utime(path, ns=(entry.key[1] + 10 ** 9, entry.key[1] + 10 ** 9))
+    assert cache.get(path) is None
+    _, redrawn, _ = _decoded(cache, path)
+    assert redrawn.image.getpixel((0, 0))[:3] == (0, 0, 255)
+    # Only the current version of a chart is kept.
+    assert len(cache._entries) == 1
+
+
+def test_least_recently_shown_chart_is_evicted(tmp_path, cache):
+    first, second, third = (_chart(tmp_path / f"{name}.png") for name in ("first", "second", "third"))
+    _decoded(cache, first)
+    _decoded(cache, second)
+    cache.get(first)
+    _decoded(cache, third)
+
+    assert cache.get(first) is not None
+    assert cache.get(second) is None
+    assert cache.get(third) is not None
+
+
+def test_missing_chart_reports_an_error(tmp_path, cache):
+    path, entry, error = _decoded(cache, str(tmp_path / "missing.png"))
+    assert entry is None and isinstance(error, FileNotFoundError)
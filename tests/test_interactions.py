@@ -0,0 +1,58 @@
+import argparse
+
+import numpy as np
+import pytest
+
+from core.interactions import InteractionGraph, parse_weights
+from core.scheduler import AnalysisScheduler
+from core.usernames import UsernameDictionary
+
+
+@pytest.fixture
+def graph():
+    usernames = UsernameDictionary()
+    ana, bo, cy, dee, eve = usernames.intern_many(["ana", "bo", "cy", "dee", "eve"])
+    return InteractionGraph.build(
+        usernames,
+        post_likes=usernames.counts(np.array([ana, ana, bo, cy])),
+        story_likes=np.array([0, 2]),
+        comment_counts=np.array([0, 0, 1]),
+        followers=[ana],
+        following=[ana, bo, cy, dee],
+    )
+
+
+def test_only_accounts_with_an_interaction_get_a_row(graph):
+    usernames = graph.usernames
+    usernames.intern("never_seen")
+    assert graph.names(range(len(graph))) == ["ana", "bo", "cy", "dee"]
+    assert graph.matrix[0].tolist() == [2, 0, 0, 1, 1]
+
+
+def test_queries(graph):
+    assert graph.names(graph.top_engaged()) == ["bo", "cy", "ana"]
+    assert graph.names(graph.not_following_back()) == ["bo", "cy"]
+    assert graph.names(graph.not_following_back(weights={"comments": 10})) == ["cy", "bo"]
+    assert graph.names(graph.unengaged_following()) == ["dee"]
+
+
+def test_rows_and_weights(graph):
+    assert list(graph.rows(graph.top_engaged(1))) == [("bo", 1, 2, 0, 0, 1, 5.0)]
+    with pytest.raises(ValueError):
+        graph.scores({"shares": 1})
+    assert parse_weights("comments=5, story_likes=1") == {"comments": 5.0, "story_likes": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_weights("comments=many")
+
+
+def test_graph_joins_every_archive_table(archive):
+    scheduler = AnalysisScheduler(archive)
+    graph = scheduler.table("interaction_graph")
+    usernames = graph.usernames
+    post_likes = scheduler.table("post_like_counts")
+    followers = scheduler.table("follower_ids")
+
+    rows = {name: row for row, name in enumerate(graph.names(range(len(graph))))}
+    for user_id in np.flatnonzero(post_likes)[:20]:
+        assert graph.matrix[rows[usernames.names[user_id]], 0] == post_likes[user_id]
+    assert int(graph.column("follows_me").sum()) == len(followers)
@@ -0,0 +1,108 @@
+import sys
+import time
+
+from core.progress import PROGRESS_PREFIX, RESULT_PREFIX
+from ui.job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobScheduler
+
+
+def _python(source):
+    return [sys.executable, "-c", source]
+
+
+def _wait(scheduler, jobs, timeout=30):
+    """Collect events until every job has finished."""
+    events = []
+    deadline = time.monotonic() + timeout
+    while not all(job.finished for job in jobs):
+        assert time.monotonic() < deadline, "jobs did not finish in time"
+        events.extend(scheduler.poll())
+        time.sleep(0.01)
+    # The "finished" event is posted after the status is set.
+    while sum(kind == "finished" for kind, _ in events) < len(jobs) and time.monotonic() < deadline:
+        events.extend(scheduler.poll())
+        time.sleep(0.01)
+    return events
+
+
+def test_progress_and_result_lines_become_events():
+    scheduler = JobScheduler()
+    job = scheduler.submit("chart", _python(
+        "import json\n"
+        f"print({PROGRESS_PREFIX!r} + json.dumps({{'stage': 'parse', 'done': 1, 'total': 2}}))\n"
+        "print('ordinary output')\n"
+        f"print({RESULT_PREFIX!r} + json.dumps({{'analysis': 'chart', 'status': 'succeeded', 'artifacts': []}}))\n"))
+    events = _wait(scheduler, [job])
+
+    kinds = [kind for kind, _ in events]
+    assert job.status == DONE and job.returncode == 0
+    assert "progress" in kinds and "result" in kinds and kinds[-1] == "finished"
+    assert job.progress == {"stage": "parse", "done": 1, "total": 2}
+    assert list(job.results) == [{"analysis": "chart", "status": "succeeded", "artifacts": []}]
+    assert list(job.output) == ["ordinary output"]
+
+
+def test_failed_job_reports_status_and_last_output_line():
+    scheduler = JobScheduler()
+    job = scheduler.submit("broken", _python("import sys; print('Error: no data'); sys.exit(3)"))
+    _wait(scheduler, [job])
+
+    assert job.status == FAILED and job.returncode == 3
+    assert job.error == "exited with status 3\nError: no data"
+
+
+def test_missing_executable_fails_the_job():
+    scheduler = JobScheduler()
+    job = scheduler.submit("missing", ["/nonexistent/preservr-analysis"])
+    _wait(scheduler, [job])
+
+    assert job.status == FAILED and job.error
+
+
+def test_jobs_beyond_the_limit_wait_in_the_queue():
+    scheduler = JobScheduler(max_concurrent=1)
+    first = scheduler.submit("first", _python("import time; time.sleep(0.3)"))
+    second = scheduler.submit("second", _python("pass"))
+
+    assert first.status == RUNNING and second.status == QUEUED
+    assert scheduler.active_jobs() == [first, second]
+    _wait(scheduler, [first, second])
+    assert first.status == second.status == DONE
+    assert not scheduler.is_busy()
+
+
+def test_cancel_queued_and_running_jobs():
+    scheduler = JobScheduler(max_concurrent=1)
+    running = scheduler.submit("slow", _python("import time; time.sleep(30)"))
+    queued = scheduler.submit("next", _python("pass"))
+
+    scheduler.cancel(queued)
+    assert queued.status == CANCELLED
+    deadline = time.monotonic() + 10
+    while running.process is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.cancel(running)
+    _wait(scheduler, [running, queued])
+
+    assert running.status == CANCELLED
+    assert not scheduler.is_busy()
+
+
+class _ColdPool:
+    """A warm pool that never has a worker ready."""
+
+    def __init__(self):
+        self.starts = 0
+
+    def run(self, pipeline_args):
+        return None
+
+    def start(self):
+        self.starts += 1
+
+
+def test_cold_jobs_do_not_refill_the_warm_pool():
+    pool = _ColdPool()
+    scheduler = JobScheduler(warm_pool=pool)
+    job = scheduler.submit("chart", _python("pass"), pipeline_args=["folder", "chart"])
+    _wait(scheduler, [job])
+    assert job.status == DONE and pool.starts == 0
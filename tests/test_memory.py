@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import core.followers_following
+import core.most_liked_users
+from core.memory import ExternalIdSorter, MemoryBudget, parse_size
+from core.scheduler import AnalysisScheduler, SUCCEEDED
+from core.usernames import for_archive
+
+ANALYSES = ["followers_following", "most_liked_users", "interaction_graph"]
+
+
+def _run(archive, max_memory):
+    scheduler = AnalysisScheduler(archive, max_workers=1, max_memory=max_memory)
+    results = scheduler.run(ANALYSES)
+    assert all(result.status == SUCCEEDED for result in results.values())
+    with open(f"{archive}/OUTPUT_FOLDER/follow_analysis.txt", encoding="utf-8") as f:
+        follow_analysis = f.read()
+    return scheduler, follow_analysis
+
+
+def _graph_rows(graph):
+    names = graph.usernames.names_for(graph.user_ids)
+    return {name: tuple(row) for name, row in zip(names, np.asarray(graph.matrix).tolist())}
+
+
+def test_budgeted_run_spills_and_matches_in_memory_run(monkeypatch, archive):
+    baseline, baseline_follows = _run(archive, None)
+
+    # Small chunks and a tiny limit: files are streamed and follow IDs spill as sorted runs.
+    monkeypatch.setattr(core.followers_following, "STREAM_CHUNK_RECORDS", 64)
+    monkeypatch.setattr(core.most_liked_users, "STREAM_CHUNK_RECORDS", 64)
+    spilled = []
+    spill = ExternalIdSorter._spill
+
+    def counting_spill(sorter):
+        spilled.append(len(sorter._buffer))
+        spill(sorter)
+    monkeypatch.setattr(ExternalIdSorter, "_spill", counting_spill)
+
+    budgeted, budgeted_follows = _run(archive, 1024)
+    assert any(spilled)
+    assert budgeted.last_plan["post_like_counts"].parse == "stream"
+    assert isinstance(budgeted.tables["follower_ids"], np.memmap)
+
+    assert budgeted_follows == baseline_follows
+    for name in ("follower_ids", "following_ids"):
+        assert np.array_equal(np.asarray(budgeted.tables[name]), baseline.tables[name])
+    # Count arrays are sized to the username dictionary when built, so compare them by name.
+    usernames = for_archive(archive)
+    for name in ("post_like_counts", "story_like_counts"):
+        assert usernames.to_dict(budgeted.tables[name]) == usernames.to_dict(baseline.tables[name])
+    assert _graph_rows(budgeted.tables["interaction_graph"]) == _graph_rows(baseline.tables["interaction_graph"])
+
+
+def test_external_sorter_matches_unique(tmp_path):
+    budget = MemoryBudget(256)
+    sorter = ExternalIdSorter(budget, np.int32)
+    rng = np.random.default_rng(0)
+    chunks = [rng.integers(0, 5000, 100).astype(np.int32) for _ in range(30)]
+    for chunk in chunks:
+        sorter.add(chunk)
+    assert np.array_equal(sorter.result(), np.unique(np.concatenate(chunks)))
+    budget.cleanup()
+
+
+@pytest.mark.parametrize("text, expected", [("512M", 512 * 1024 ** 2), ("2G", 2 * 1024 ** 3), ("1000", 1000),
+                                            ("1.5k", 1536), ("64MiB", 64 * 1024 ** 2)])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "lots", "-1M", "0"])
+def test_parse_size_rejects_bad_sizes(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
@@ -0,0 +1,26 @@
+from core.memory import MemoryBudget
+from core.planner import plan_tables
+from core.scheduler import locate_datasets
+
+LIKE_TABLES = ["story_like_counts", "post_like_counts"]
+
+
+def _plan(archive, budget=None, overrides=None, exact_tables=()):
+    return plan_tables(LIKE_TABLES, locate_datasets(archive), archive, budget, overrides, exact_tables, cpus=1)
+
+
+def test_tiny_budget_streams_but_keeps_exact_counts(archive):
+    plan = _plan(archive, MemoryBudget(1024))
+    for name in LIKE_TABLES:
+        assert plan[name].parse == "stream"
+        assert plan[name].aggregate == "exact"
+
+
+def test_sketch_only_when_asked_for(archive):
+    assert all(_plan(archive)[name].aggregate == "exact" for name in LIKE_TABLES)
+    plan = _plan(archive, MemoryBudget(1024), {"aggregate": "sketch"})
+    assert all(plan[name].aggregate == "sketch" for name in LIKE_TABLES)
+    # Tables others are computed from stay exact even when a sketch is asked for.
+    plan = _plan(archive, overrides={"aggregate": "sketch"}, exact_tables={"post_like_counts"})
+    assert plan["post_like_counts"].aggregate == "exact"
+    assert plan["story_like_counts"].aggregate == "sketch"
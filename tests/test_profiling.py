@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+from core import profiling
+from core.profiling import check_budgets, profile_analysis, run_child
+
+
+def test_profile_analysis_reports_every_stage(archive):
+    report = profile_analysis(archive, "top_topics", top=3)
+    assert report["status"] == "succeeded", report["error"]
+    assert {"walk", "parse", "render"} <= set(report["stages"])
+    assert report["peak_traced"] > 0
+    assert all(len(stage["top_sites"]) <= 3 for stage in report["stages"].values())
+
+
+def test_run_child_profiles_in_a_fresh_process(archive):
+    report = run_child(archive, "most_liked_users", 2)
+    assert report["status"] == "succeeded", report["error"]
+    assert report["peak_traced"] > 0
+
+
+def test_check_budgets_flags_analyses_over_budget():
+    reports = [{"analysis": "top_topics", "peak_traced": 2048}, {"analysis": "most_liked_users", "peak_traced": 10}]
+    assert check_budgets(reports, {"top_topics": 1024, "most_liked_users": 1024}) == ["top_topics"]
+    assert reports[0]["within_budget"] is False and reports[1]["within_budget"] is True
+
+
+def test_command_line_fails_when_a_budget_is_exceeded(archive, tmp_path):
+    output = tmp_path / "report.json"
+    completed = subprocess.run(
+        [sys.executable, profiling.__file__, archive, "age_gender_distribution", "--budget",
+         "age_gender_distribution=1K", "--output", str(output)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    assert completed.returncode == 1
+    assert "MEMORY BUDGET EXCEEDED: age_gender_distribution" in completed.stderr
+    document = json.loads(output.read_text())
+    assert document["analyses"][0]["within_budget"] is False
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from core.progress import (PROGRESS_PREFIX, ProgressReporter, overall_fraction, parse_progress_line,
+                           parse_result_line)
+
+
+def _updates(stream):
+    return [parse_progress_line(line) for line in stream.getvalue().splitlines()]
+
+
+def test_updates_round_trip_through_the_protocol():
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream)
+    reporter.start("parse", 10)
+    reporter.result("top_topics", "succeeded", ["OUTPUT_FOLDER/top_topics.png"], preview=True)
+
+    progress_line, result_line = stream.getvalue().splitlines()
+    assert parse_progress_line(progress_line) == {"stage": "parse", "done": 0, "total": 10}
+    assert parse_result_line(result_line) == {"analysis": "top_topics", "status": "succeeded",
+                                              "artifacts": ["OUTPUT_FOLDER/top_topics.png"], "preview": True}
+
+
+def test_ordinary_and_malformed_lines_are_not_updates():
+    assert parse_progress_line("Saved: chart.png") is None
+    assert parse_progress_line(PROGRESS_PREFIX + "{not json") is None
+    assert parse_progress_line(PROGRESS_PREFIX + '{"stage": "unknown"}') is None
+    assert parse_result_line(PROGRESS_PREFIX + '{"stage": "parse"}') is None
+
+
+def test_updates_within_the_interval_are_dropped_except_completion():
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream, min_interval=60)
+    reporter.start("parse", 100)
+    for done in range(1, 100):
+        reporter.update("parse", done, 100)
+    reporter.update("parse", 100, 100)
+    reporter.update("aggregate", 0, 5)
+
+    assert [(update["stage"], update["done"]) for update in _updates(stream)] == [
+        ("parse", 0), ("parse", 100), ("aggregate", 0)]
+
+
+def test_disabled_reporter_writes_nothing():
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream, enabled=False)
+    reporter.start("walk")
+    reporter.result("top_topics", "succeeded")
+    assert list(reporter.iterate("parse", range(3))) == [0, 1, 2]
+    assert stream.getvalue() == ""
+
+
+def test_iterate_reports_the_final_count():
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream, min_interval=60)
+    assert sum(reporter.iterate("aggregate", iter(range(10)), check_every=4)) == 45
+
+    updates = _updates(stream)
+    assert updates[0] == {"stage": "aggregate", "done": 0, "total": None}
+    assert updates[-1] == {"stage": "aggregate", "done": 10, "total": 10}
+
+
+def test_overall_fraction_weights_the_stages():
+    assert overall_fraction({"stage": "walk", "done": 0, "total": None}) == 0.0
+    assert overall_fraction({"stage": "parse", "done": 1, "total": 2}) == pytest.approx(0.05 + 0.3)
+    assert overall_fraction({"stage": "render", "done": 3, "total": 1}) == 1.0
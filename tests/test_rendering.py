@@ -0,0 +1,65 @@
+import os
+
+import matplotlib.pyplot as plt
+import pytest
+from PIL import Image
+
+from core.encoders import ChartEncoder
+from core.rendering import get_template, release_templates, save_figure
+from core.scheduler import AnalysisScheduler, SUCCEEDED
+
+
+@pytest.fixture(autouse=True)
+def fresh_templates():
+    release_templates()
+    yield
+    release_templates()
+
+
+def test_templates_are_reused_and_reset_after_each_render(tmp_path, encoder):
+    template = get_template("bar_chart")
+    assert get_template("bar_chart") is template
+
+    with template.render() as (fig, ax):
+        ax.bar(["a", "b"], [1, 2])
+        ax.set_title("first")
+        fig.suptitle("overview")
+        job = save_figure(fig, str(tmp_path / "first.png"), dpi=50)
+    ChartEncoder.wait([job])
+
+    assert not ax.patches and ax.get_title() == ""
+    assert not template.figure.texts
+    with Image.open(job.path) as image:
+        assert image.size[0] > 0
+
+
+def test_failed_drawing_still_resets_the_template():
+    template = get_template("grouped_bar_chart")
+    with pytest.raises(RuntimeError):
+        with template.render() as (fig, ax):
+            ax.plot([1, 2, 3])
+            ax.set_axis_off()
+            raise RuntimeError("bad data")
+
+    assert not template.axes.lines
+    assert template.axes.axison
+
+
+def test_dashboard_template_has_one_axes_per_panel():
+    assert len(get_template("dashboard").axes) == 4
+
+
+def test_released_templates_are_rebuilt():
+    template = get_template("wordcloud")
+    release_templates()
+    assert template.figure is None
+    assert get_template("wordcloud") is not template
+
+
+def test_analyses_leave_no_pyplot_figures(archive, encoder):
+    plt.close("all")
+    results = AnalysisScheduler(archive).run(["top_topics", "age_gender_distribution", "most_liked_users"])
+
+    assert {result.status for result in results.values()} == {SUCCEEDED}
+    assert plt.get_fignums() == []
+    assert all(os.path.exists(path) for result in results.values() for path in result.artifacts)
@@ -0,0 +1,67 @@
+import json
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.sampling import CountEstimate, estimate_record_count, sample_records, wilson_interval
+from core.usernames import UsernameDictionary
+
+RECORDS = 20000
+
+
+def _like(owner, index):
+    return {"title": owner, "string_list_data": [
+        {"href": f"https://www.instagram.com/p/{index:08d}/", "value": "\U0001f44d", "timestamp": 1700000000 + index}]}
+
+
+@pytest.fixture
+def liked_posts(tmp_path):
+    """A liked_posts.json whose owners have known shares: 50%, 30% and 20%."""
+    rng = random.Random(1)
+    owners = rng.choices(["ana", "bo", "cy"], weights=[5, 3, 2], k=RECORDS)
+    path = tmp_path / "liked_posts.json"
+    path.write_text(json.dumps({"likes_media_likes": [_like(owner, i) for i, owner in enumerate(owners)]}, indent=2))
+    return str(path), Counter(owners)
+
+
+def test_record_count_is_estimated_without_parsing(liked_posts):
+    path, _ = liked_posts
+    assert estimate_record_count(path) == pytest.approx(RECORDS, rel=0.05)
+
+
+def test_sample_is_drawn_from_real_records(liked_posts):
+    path, _ = liked_posts
+    records, info = sample_records([path], sample_size=500, key="likes_media_likes")
+
+    assert not info.exact and 400 <= info.sampled <= 500
+    assert info.population == pytest.approx(RECORDS, rel=0.05)
+    assert all(record["title"] in ("ana", "bo", "cy") for record in records)
+    assert len({record["string_list_data"][0]["href"] for record in records}) == len(records)
+
+
+def test_small_files_are_read_whole(liked_posts):
+    path, counts = liked_posts
+    records, info = sample_records([path], sample_size=RECORDS, key="likes_media_likes")
+    assert info.exact and info.sampled == info.population == RECORDS
+
+
+def test_scaled_counts_have_intervals_around_the_truth(liked_posts):
+    path, counts = liked_posts
+    records, info = sample_records([path], sample_size=2000, key="likes_media_likes")
+    usernames = UsernameDictionary()
+    estimate = CountEstimate(usernames.count_names(record["title"] for record in records), info)
+
+    assert estimate.note.startswith("preview from a ")
+    for name, count in counts.items():
+        user_id = usernames.id_of(name)
+        assert estimate.lower[user_id] <= count <= estimate.upper[user_id]
+        assert estimate.counts[user_id] == pytest.approx(count, rel=0.15)
+
+
+def test_wilson_interval_and_exact_estimates():
+    low, high = wilson_interval(np.array([0, 50, 100]), 100)
+    assert low[0] == 0 and low[1] < 0.5 < high[1] and high[2] == pytest.approx(1)
+    exact = CountEstimate.exact(np.array([3, 1]))
+    assert exact.note is None and exact.lower.tolist() == exact.upper.tolist() == [3, 1]
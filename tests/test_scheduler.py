@@ -0,0 +1,51 @@
+from core.registry import TABLES
+from core.scheduler import AnalysisScheduler, MISSING_FILES, SKIPPED, SUCCEEDED
+
+
+def _fail_table(monkeypatch, name):
+    def build(ctx, tables):
+        raise ValueError("unreadable followers file")
+    monkeypatch.setattr(TABLES[name], "build", build)
+
+
+def test_shared_tables_are_built_once(monkeypatch, archive):
+    builds = []
+    for table in TABLES.values():
+        monkeypatch.setattr(table, "build", lambda *args, _build=table.build, _name=table.name, **kwargs:
+                            builds.append(_name) or _build(*args, **kwargs))
+    scheduler = AnalysisScheduler(archive, max_workers=2)
+    results = scheduler.run(["most_liked_users", "most_liked_users_posts", "most_liked_users_stories"])
+
+    assert {result.status for result in results.values()} == {SUCCEEDED}
+    assert sorted(builds) == ["post_like_counts", "story_like_counts"]
+    scheduler.run(["most_liked_users"])
+    assert len(builds) == 2
+
+
+def test_failed_table_skips_transitive_dependents(monkeypatch, archive):
+    _fail_table(monkeypatch, "follower_ids")
+    scheduler = AnalysisScheduler(archive, max_workers=2)
+    results = scheduler.run(["followers_following", "interaction_graph", "top_topics"])
+
+    assert results["top_topics"].status == SUCCEEDED
+    # interaction_graph depends on follower_ids through the interaction_graph table.
+    for name in ("followers_following", "interaction_graph"):
+        assert results[name].status == SKIPPED
+        assert "follower_ids" in results[name].error
+        assert "unreadable followers file" in results[name].error
+    assert "follower_ids" not in scheduler.tables
+    assert "interaction_graph" not in scheduler.tables
+
+
+def test_failed_table_is_rebuilt_on_next_run(monkeypatch, archive):
+    scheduler = AnalysisScheduler(archive, max_workers=2)
+    with monkeypatch.context() as patch:
+        _fail_table(patch, "follower_ids")
+        assert scheduler.run(["followers_following"])["followers_following"].status == SKIPPED
+    assert scheduler.run(["followers_following"])["followers_following"].status == SUCCEEDED
+
+
+def test_analyses_without_their_files_are_reported(tmp_path):
+    results = AnalysisScheduler(str(tmp_path)).run(["top_topics"])
+    assert results["top_topics"].status == MISSING_FILES
+    assert "recommended_topics.json" in results["top_topics"].error
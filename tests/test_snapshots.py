@@ -0,0 +1,76 @@
+import filecmp
+import json
+import os
+
+import pytest
+
+from core.snapshots import SnapshotStore, archive_files, iter_chunks
+from core.synthetic import make_archive
+
+
+@pytest.fixture
+def large_archive(tmp_path):
+    """An archive whose like file spans many chunks."""
+    folder = tmp_path / "export"
+    make_archive(str(folder), 5000)
+    return str(folder)
+
+
+def _add_likes(folder, count):
+    path = os.path.join(folder, "your_instagram_activity", "likes", "liked_posts.json")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    records = data["likes_media_likes"]
+    records.extend(records[:count])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_chunks_cover_the_file_exactly(large_archive):
+    path = os.path.join(large_archive, "your_instagram_activity", "likes", "liked_posts.json")
+    with open(path, "rb") as f:
+        chunks = list(iter_chunks(f))
+    with open(path, "rb") as f:
+        assert b"".join(chunks) == f.read()
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b",") for chunk in chunks[:-1])
+
+
+def test_restored_snapshot_matches_the_export(tmp_path, archive):
+    store = SnapshotStore(str(tmp_path / "store"))
+    manifest = store.ingest(archive, label="2026-10")
+    folder = store.checkout("2026-10")
+
+    assert store.resolve("latest")["id"] == manifest["id"]
+    assert sorted(manifest["files"]) == archive_files(archive)
+    for relative in manifest["files"]:
+        assert filecmp.cmp(os.path.join(archive, relative), os.path.join(folder, relative), shallow=False)
+    assert store.checkout(manifest["id"]) == folder
+
+
+def test_repeated_exports_only_add_their_new_chunks(tmp_path, large_archive):
+    store = SnapshotStore(str(tmp_path / "store"))
+    first = store.ingest(large_archive)
+    stored = store.stored_bytes()
+
+    unchanged = store.ingest(large_archive)
+    assert unchanged["stats"]["files_read"] == 0 and store.stored_bytes() == stored
+
+    _add_likes(large_archive, 20)
+    grown = store.ingest(large_archive)
+    assert grown["stats"]["files_read"] == 1
+    assert grown["stats"]["new_chunks"] <= 3 < grown["stats"]["chunks"]
+    assert store.stored_bytes() - stored < stored / 10
+
+    assert store.remove(grown["id"]) > 0
+    assert store.stored_bytes() == stored
+    store.restore(first["id"], str(tmp_path / "first"))
+
+
+def test_unknown_snapshot_is_an_error(tmp_path, archive):
+    store = SnapshotStore(str(tmp_path / "store"))
+    with pytest.raises(KeyError):
+        store.resolve("latest")
+    store.ingest(archive)
+    with pytest.raises(KeyError):
+        store.resolve("1999")
@@ -0,0 +1,72 @@
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from ui.tile_pyramid import TilePyramid, level_sizes, tile_folder
+
+TILE = 64
+
+
+@pytest.fixture
+def chart(tmp_path):
+    output = tmp_path / "OUTPUT_FOLDER"
+    output.mkdir()
+    path = output / "chart.png"
+    image = Image.new("RGB", (300, 130), "white")
+    image.paste((255, 0, 0), (256, 128, 300, 130))
+    image.save(path)
+    return str(path)
+
+
+def _built(pyramid):
+    pyramid.start()
+    deadline = time.monotonic() + 30
+    while not pyramid.complete() and pyramid.error is None:
+        assert time.monotonic() < deadline, "pyramid was not built"
+        time.sleep(0.01)
+    assert pyramid.error is None
+    return pyramid
+
+
+def test_levels_halve_until_one_tile_fits():
+    assert level_sizes(300, 130, TILE) == [(300, 130), (150, 65), (75, 33), (38, 17)]
+    assert level_sizes(64, 10, TILE) == [(64, 10)]
+
+
+def test_tiles_reassemble_the_chart(tmp_path, chart):
+    pyramid = _built(TilePyramid(chart, TILE))
+    assert pyramid.folder == str(tmp_path / "OUTPUT_TILES" / "chart")
+    assert (pyramid.width, pyramid.height, pyramid.levels) == (300, 130, 4)
+    assert pyramid.grid(0) == (5, 3)
+
+    corner = pyramid.read_tile(0, 4, 2)
+    assert corner.size == (300 - 4 * TILE, 130 - 2 * TILE)
+    assert corner.getpixel((0, 0)) == (255, 0, 0)
+    assert pyramid.read_tile(3, 0, 0).size == (38, 17)
+    assert pyramid.best_level(1) == 1
+
+
+def test_cached_tiles_are_reused_until_the_chart_changes(chart):
+    first = _built(TilePyramid(chart, TILE))
+    tile = first.tile_path(0, 0, 0)
+    written = os.stat(tile).st_mtime_ns
+
+    second = TilePyramid(chart, TILE)
+    second.start()
+    assert second.complete() and not second.building()
+    assert os.stat(tile).st_mtime_ns == written
+
+    Image.new("RGB", (100, 50), "blue").save(chart)
+    os.utime(chart, ns=(written + 10 ** 9, written + 10 ** 9))
+    third = _built(TilePyramid(chart, TILE))
+    assert third.sizes == [(100, 50), (50, 25)]
+    assert not os.path.exists(third.tile_path(0, 4, 2))
+
+
+def test_missing_chart_sets_an_error(tmp_path):
+    pyramid = TilePyramid(str(tmp_path / "OUTPUT_FOLDER" / "missing.png"), TILE)
+    pyramid.start()
+    assert isinstance(pyramid.error, FileNotFoundError)
+    assert tile_folder(pyramid.image_path) == str(tmp_path / "OUTPUT_TILES" / "missing")
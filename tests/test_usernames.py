@@ -0,0 +1,57 @@
+import numpy as np
+
+from core.usernames import (ID_DTYPE, UsernameDictionary, align, difference, for_archive, intersect,
+                            top_ids, unique_ids)
+
+
+def test_ids_are_dense_and_assigned_in_first_seen_order():
+    usernames = UsernameDictionary()
+    ids = usernames.intern_many(["bob", "alice", "bob", "carol"])
+
+    assert ids.dtype == ID_DTYPE and ids.tolist() == [0, 1, 0, 2]
+    assert usernames.intern("alice") == 1 and usernames.id_of("dave") is None
+    assert usernames.names_for([2, 0]) == ["carol", "bob"]
+    assert "bob" in usernames and len(usernames) == 3
+
+
+def test_chunked_counts_match_counting_all_at_once():
+    names = [f"user{i % 7}" for i in range(100)] + ["late"]
+    whole, chunked = UsernameDictionary(), UsernameDictionary()
+
+    assert whole.to_dict(whole.count_names(names)) == chunked.to_dict(chunked.count_names(iter(names), 8))
+    assert whole.to_dict(whole.count_names(names))["late"] == 1
+
+
+def test_counts_from_different_datasets_line_up():
+    usernames = UsernameDictionary()
+    likes = usernames.counts(usernames.intern_many(["a", "b", "b"]))
+    comments = usernames.counts(usernames.intern_many(["c", "a"]))
+
+    total = align(likes, len(usernames)) + comments
+    assert usernames.to_dict(total) == {"a": 2, "b": 2, "c": 1}
+
+
+def test_set_operations_on_sorted_ids(tmp_path):
+    followers = unique_ids(np.array([5, 1, 3, 3, 9], dtype=ID_DTYPE))
+    following = unique_ids(np.array([3, 4, 5], dtype=ID_DTYPE))
+    assert intersect(followers, following).tolist() == [3, 5]
+    assert difference(followers, following).tolist() == [1, 9]
+
+    # Disk-backed arrays go through the blocked merge and give the same answer.
+    on_disk = np.memmap(tmp_path / "followers.ids", dtype=ID_DTYPE, mode="w+", shape=followers.shape)
+    on_disk[:] = followers
+    assert intersect(on_disk, following).tolist() == [3, 5]
+    assert difference(on_disk, following).tolist() == [1, 9]
+
+
+def test_top_ids_break_ties_by_username():
+    usernames = UsernameDictionary()
+    counts = usernames.counts(usernames.intern_many(["zed", "amy", "zed", "amy", "bo"]))
+
+    assert top_ids(counts).tolist() == [0, 1, 2]
+    assert usernames.names_for(top_ids(counts, 2, usernames)) == ["amy", "zed"]
+
+
+def test_archive_dictionary_is_shared_per_folder(tmp_path):
+    assert for_archive(str(tmp_path)) is for_archive(str(tmp_path / "."))
+    assert for_archive(str(tmp_path)) is not for_archive(str(tmp_path / "other"))
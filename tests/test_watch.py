@@ -0,0 +1,110 @@
+import os
+import shutil
+import threading
+import time
+
+from core.archive import find_numbered_files
+from core.scheduler import AnalysisScheduler
+from core.watch import ArchiveWatcher, affected_analyses, affected_tables, describe_changes, watch
+
+
+def _settle(watcher):
+    """Poll until a change is reported as settled (it must be unchanged for one poll)."""
+    return watcher.poll() | watcher.poll()
+
+
+def _shards(folder):
+    return find_numbered_files(folder, "post_comments")
+
+
+def test_watcher_tracks_every_comment_shard(archive):
+    watcher = ArchiveWatcher(archive, rescan_every=1000)
+    watcher.start()
+    first, second, third = _shards(archive)
+    assert _settle(watcher) == set()
+
+    # A shard other than post_comments_1.json is modified.
+    with open(second, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert _settle(watcher) == {"post_comments"}
+
+    # A new shard appears next to the others.
+    shutil.copy(third, os.path.join(os.path.dirname(third), "post_comments_4.json"))
+    assert _settle(watcher) == {"post_comments"}
+
+    # A shard disappears.
+    os.remove(third)
+    assert _settle(watcher) == {"post_comments"}
+    assert _settle(watcher) == set()
+    assert "most_commented_on_users" in affected_analyses({"post_comments"})
+    assert describe_changes({"post_comments"}) == "post_comments_N.json"
+
+
+def test_refresh_reports_new_shards(archive):
+    watcher = ArchiveWatcher(archive)
+    watcher.start()
+    last = _shards(archive)[-1]
+    shutil.copy(last, os.path.join(os.path.dirname(last), "post_comments_9.json"))
+    assert watcher.refresh() == {"post_comments"}
+    assert watcher.refresh() == set()
+
+
+def test_prepared_archive_drops_comment_table_when_a_shard_changes(archive):
+    from core.pipeline import parse_args
+    from core.worker import PreparedArchive
+
+    prepared = PreparedArchive(archive)
+    prepared.build()
+    assert "comment_stats" in prepared.scheduler.tables
+    with open(_shards(archive)[1], "a", encoding="utf-8") as f:
+        f.write("\n")
+    scheduler = prepared.scheduler_for(parse_args([archive, "most_commented_on_users"]))
+    assert "comment_stats" not in scheduler.tables
+    assert "follower_ids" in scheduler.tables
+
+
+def test_following_change_reaches_only_the_analyses_that_read_it():
+    rerun = affected_analyses({"following"}, ["top_topics", "followers_following", "interaction_graph", "dashboard"])
+    assert rerun == ["followers_following", "interaction_graph", "dashboard"]
+    assert affected_tables({"following"}) == {"following_ids", "interaction_graph"}
+
+
+def test_change_is_reported_once_writes_stop(archive):
+    watcher = ArchiveWatcher(archive, rescan_every=1000)
+    watcher.start()
+    topics = watcher.paths["recommended_topics"]
+
+    with open(topics, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert watcher.poll() == set()
+    with open(topics, "a", encoding="utf-8") as f:
+        f.write("\n")
+    # Still being written: the state differs from the previous poll.
+    assert watcher.poll() == set()
+    assert watcher.poll() == {"recommended_topics"}
+    assert watcher.poll() == set()
+
+
+def test_watch_reruns_only_affected_analyses(archive):
+    runs = []
+    stop = threading.Event()
+    scheduler = AnalysisScheduler(archive)
+    thread = threading.Thread(target=watch, args=(scheduler, ["top_topics", "followers_following"]),
+                              kwargs={"interval": 0.05, "stop_event": stop,
+                                      "on_results": lambda changed, results: runs.append((changed, set(results)))},
+                              daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not runs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    kept = scheduler.tables["topics"]
+
+    with open(scheduler.paths["following"], "a", encoding="utf-8") as f:
+        f.write("\n")
+    while len(runs) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(10)
+
+    assert runs == [(set(), {"top_topics", "followers_following"}), ({"following"}, {"followers_following"})]
+    assert scheduler.tables["topics"] is kept
@@ -0,0 +1,71 @@
+import calendar
+import json
+from collections import Counter
+
+import pytest
+
+from core.archive import load_json, open_records
+from core.scheduler import AnalysisScheduler
+from core.usernames import for_archive
+from core.window import TimeWindow, parse_bound, record_timestamps
+
+NOW = calendar.timegm((2026, 10, 19, 15, 30, 0))
+
+
+@pytest.mark.parametrize("text, end, expected", [
+    ("2024-03-01", False, (2024, 3, 1)),
+    ("2024-03-01", True, (2024, 3, 2)),
+    ("2024-03", True, (2024, 4, 1)),
+    ("2024-12", True, (2025, 1, 1)),
+    ("2023", True, (2024, 1, 1)),
+    ("2d", False, (2026, 10, 17)),
+])
+def test_bounds(text, end, expected):
+    assert parse_bound(text, end, now=NOW) == calendar.timegm(expected + (0, 0, 0))
+
+
+@pytest.mark.parametrize("since, until", [("2024-02-30", None), ("2024-13", None), ("last week", None),
+                                          ("2024", "2023")])
+def test_invalid_ranges_are_rejected(since, until):
+    with pytest.raises(ValueError):
+        TimeWindow.parse(since, until, now=NOW)
+
+
+def test_same_year_on_both_ends_covers_that_year():
+    window = TimeWindow.parse("2023", "2023")
+    assert window.contains(calendar.timegm((2023, 12, 31, 23, 59, 59, 0, 0, 0)))
+    assert not window.contains(calendar.timegm((2024, 1, 1, 0, 0, 0, 0, 0, 0)))
+    assert window.label() == "since 2023 until 2023"
+    assert TimeWindow.parse() is None
+
+
+def test_out_of_range_records_are_dropped_while_parsing(tmp_path):
+    window = TimeWindow.parse("2024-01", "2024-01")
+    inside = calendar.timegm((2024, 1, 15, 0, 0, 0))
+    data = {"likes_media_likes": [
+        {"title": "in", "string_list_data": [{"timestamp": inside}]},
+        {"title": "out", "string_list_data": [{"timestamp": inside + 40 * 86400}]},
+        {"title": "undated", "string_list_data": [{"href": "x"}]},
+    ]}
+    path = tmp_path / "liked_posts.json"
+    path.write_text(json.dumps(data))
+
+    with open_records(str(path), "likes_media_likes", window=window) as records:
+        assert [record["title"] for record in records] == ["in"]
+    parsed = load_json(str(path), object_hook=window.object_hook)
+    assert [record and record["title"] for record in parsed["likes_media_likes"]] == ["in", None, None]
+
+
+def test_windowed_tables_count_only_records_in_range(archive):
+    scheduler = AnalysisScheduler(archive)
+    path = scheduler.locate()["liked_posts"]
+    records = load_json(path)["likes_media_likes"]
+    stamps = sorted(stamp for record in records for stamp in record_timestamps(record))
+    window = TimeWindow(stamps[len(stamps) // 4], stamps[3 * len(stamps) // 4])
+
+    expected = Counter(record["title"] for record in records
+                       if window.contains_record(record) and record["title"] not in ("", "Unknown"))
+    windowed = AnalysisScheduler(archive, window=window)
+    counts = windowed.table("post_like_counts")
+    assert for_archive(archive).to_dict(counts) == expected
+    assert sum(expected.values()) < len(records)
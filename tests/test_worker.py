@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import core.registry
+from core.pipeline import parse_args
+from core.worker import PreparedArchive, serve
+from ui.warm_pool import WarmWorkerPool
+
+
+def _commands(*commands):
+    return [json.dumps(command) + "\n" for command in commands]
+
+
+def test_run_reuses_the_prepared_tables(monkeypatch, archive, encoder):
+    builds = []
+    table = core.registry.TABLES["topics"]
+    build = table.build
+
+    def counted(*args, **kwargs):
+        builds.append(table.name)
+        return build(*args, **kwargs)
+    monkeypatch.setattr(table, "build", counted)
+
+    status = serve(_commands({"prepare": archive}, {"run": [archive, "top_topics"]}))
+    assert status == 0
+    assert builds == ["topics"]
+    assert os.path.exists(os.path.join(archive, "OUTPUT_FOLDER", "top_topics.png"))
+
+
+def test_prepared_scheduler_only_serves_matching_runs(archive, tmp_path):
+    prepared = PreparedArchive(archive)
+    prepared.build()
+    assert prepared.scheduler_for(parse_args([archive, "top_topics"])) is prepared.scheduler
+    assert prepared.scheduler_for(parse_args([str(tmp_path), "top_topics"])) is None
+    assert prepared.scheduler_for(parse_args([archive, "--export", "csv"])) is None
+    assert prepared.scheduler_for(parse_args([archive, "--parse", "stream"])) is None
+
+
+def test_prepare_leaves_unreadable_tables_to_the_run(monkeypatch, archive):
+    def unreadable(ctx, tables):
+        raise ValueError("unreadable topics file")
+    monkeypatch.setattr(core.registry.TABLES["topics"], "build", unreadable)
+    prepared = PreparedArchive(archive)
+    prepared.build()
+    assert "topics" not in prepared.scheduler.tables
+    assert "follower_ids" in prepared.scheduler.tables
+
+    def broken(ctx, tables):
+        raise TypeError("bug in a table builder")
+    monkeypatch.setattr(core.registry.TABLES["topics"], "build", broken)
+    with pytest.raises(TypeError):
+        PreparedArchive(archive).build()
+
+
+def test_input_ending_without_a_run_exits_cleanly():
+    assert serve(_commands()) == 0
+
+
+def test_pool_hands_out_a_warm_worker(archive):
+    pool = WarmWorkerPool()
+    pool.start()
+    pool.prepare(archive)
+    try:
+        deadline = time.monotonic() + 60
+        process = None
+        while process is None and time.monotonic() < deadline:
+            process = pool.run([archive, "top_topics"])
+            time.sleep(0.05)
+        assert process is not None
+        output = process.stdout.read()
+        assert process.wait(60) == 0, output
+        assert pool.acquire() is None
+    finally:
+        pool.close()
+
+
+class _Idle:
+    def poll(self):
+        return None
+
+    def terminate(self):
+        pass
+
+
+def test_concurrent_fills_never_exceed_the_pool_size(monkeypatch):
+    release = threading.Event()
+    spawned = []
+
+    def spawn():
+        spawned.append(None)
+        release.wait(10)
+        return _Idle()
+    monkeypatch.setattr(WarmWorkerPool, "_spawn", staticmethod(spawn))
+
+    pool = WarmWorkerPool(size=1)
+    for _ in range(3):
+        pool.start()
+    time.sleep(0.1)
+    release.set()
+    deadline = time.monotonic() + 10
+    while not pool._idle and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    assert len(spawned) == 1 and len(pool._idle) == 1
+    assert pool.acquire() is not None and pool.acquire() is None
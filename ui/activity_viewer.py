@@ -0,0 +1,157 @@
+"""
+Preservr Archive Visual Analysis Tool - User Activity Viewer
+
+Description: Drill-down into one account: every like, story like, comment and follow
+             the archive records for it, oldest first, with a count per dataset.
+             Lookups go through the saved activity index (core/activity_index.py).
+             The index is built by a background process as soon as a folder is
+             selected, so it is usually ready by the time a user is clicked; rows
+             are read from the archive only when they scroll into view.
+"""
+
+import os
+import subprocess
+import sys
+from tkinter import Toplevel, Label, Frame, Button, Entry, StringVar
+
+from core.activity_index import DATASET_LABELS, ActivityIndex
+from ui.follow_viewer import VirtualList
+
+INDEX_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core",
+                            "activity_index.py")
+# How often a viewer checks whether the index build has finished.
+INDEX_POLL_INTERVAL_MS = 200
+
+
+class ActivityIndexBuilder:
+    """Builds or refreshes an archive's activity index in a separate process."""
+
+    def __init__(self):
+        self.folder_path = None
+        self.process = None
+
+    def start(self, folder_path):
+        """Start indexing a folder, replacing a build of another folder still in progress."""
+        self.cancel()
+        self.folder_path = folder_path
+        try:
+            self.process = subprocess.Popen([sys.executable, INDEX_SCRIPT, folder_path],
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            self.process = None
+
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def cancel(self):
+        if self.running():
+            self.process.terminate()
+        self.process = None
+
+
+class ActivityRows:
+    """An account's entries as rows of text for a VirtualList; records are read when shown."""
+
+    def __init__(self, index, entries):
+        self.index = index
+        self.entries = entries
+        self._text = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def name_at(self, position):
+        text = self._text.get(position)
+        if text is None:
+            entry = self.entries[position]
+            text = self._text[position] = f"{DATASET_LABELS[entry.dataset]}: {self.index.describe(entry)}"
+        return text
+
+
+class UserActivityViewer(Toplevel):
+    """Window showing everything the archive records about one account."""
+
+    def __init__(self, master, folder_path, paths, builder=None, username="", window=None, font=None, bg=None):
+        super().__init__(master)
+        self.title("User Activity")
+        if bg:
+            self.configure(bg=bg)
+        self.geometry("640x600")
+        self.folder_path = folder_path
+        self.paths = paths
+        self.builder = builder
+        self.window = window
+        self.index = None
+
+        search_frame = Frame(self, bg=bg)
+        search_frame.pack(fill="x", padx=15, pady=(15, 5))
+        Label(search_frame, text="Username:", font=font, bg=bg).pack(side="left")
+        self.username = StringVar(value=username)
+        entry = Entry(search_frame, textvariable=self.username, font=font)
+        entry.pack(side="left", fill="x", expand=True, padx=(8, 8))
+        entry.bind("<Return>", lambda e: self.show_user())
+        Button(search_frame, text="Show", font=font, command=self.show_user, width=8).pack(side="left")
+        entry.focus_set()
+
+        self.summary = Label(self, text="", font=font, bg=bg, anchor="w", justify="left")
+        self.summary.pack(fill="x", padx=15, pady=5)
+        self.rows = VirtualList(self, ActivityRows(None, []))
+        self.rows.pack(fill="both", expand=True, padx=15, pady=5)
+        Button(self, text="Close", font=font, command=self.destroy, width=10).pack(pady=(5, 15))
+
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self._open_index()
+
+    def _open_index(self):
+        """Load the index once the background build (if any) has finished."""
+        if self.builder is not None and self.builder.running() and self.builder.folder_path == self.folder_path:
+            self.summary.config(text="Indexing archive...")
+            self.after(INDEX_POLL_INTERVAL_MS, self._open_index)
+            return
+        self.index = ActivityIndex.load(self.folder_path, self.paths)
+        if self.index is None:
+            if self.builder is None:
+                self.builder = ActivityIndexBuilder()
+            self.builder.start(self.folder_path)
+            self.summary.config(text="Indexing archive...")
+            self.after(INDEX_POLL_INTERVAL_MS, self._retry_open)
+            return
+        if self.username.get().strip():
+            self.show_user()
+        else:
+            self.summary.config(text=f"{len(self.index.names)} accounts indexed. Enter a username.")
+
+    def _retry_open(self):
+        if self.builder.running():
+            self.after(INDEX_POLL_INTERVAL_MS, self._retry_open)
+            return
+        self.index = ActivityIndex.load(self.folder_path, self.paths)
+        if self.index is None:
+            self.summary.config(text="Could not index this archive.")
+        elif self.username.get().strip():
+            self.show_user()
+        else:
+            self.summary.config(text=f"{len(self.index.names)} accounts indexed. Enter a username.")
+
+    def show_user(self):
+        """Look up the entered username and list its activity."""
+        if self.index is None:
+            return
+        username = self.username.get().strip().lstrip("@")
+        entries = self.index.entries(username, window=self.window)
+        self.rows.index = ActivityRows(self.index, entries)
+        self.rows.show_range(0, len(entries))
+        if not entries:
+            self.summary.config(text=f"No activity found for {username}.")
+            return
+        counts = {}
+        for entry in entries:
+            counts[entry.dataset] = counts.get(entry.dataset, 0) + 1
+        details = ", ".join(f"{DATASET_LABELS[dataset]}: {count}" for dataset, count in counts.items())
+        scope = f" ({self.window.label()})" if self.window is not None else ""
+        self.summary.config(text=f"{username}{scope}: {len(entries)} records\n{details}")
+
+    def destroy(self):
+        if self.index is not None:
+            self.index.close()
+        super().destroy()
@@ -0,0 +1,205 @@
+"""
+Preservr Archive Visual Analysis Tool - Follow Analysis Viewer
+
+Description: Shows the followers/following results (mutuals, fans and accounts not
+             following back) inside the app. Lists are virtualized: a list widget
+             only ever holds the rows that fit on screen and is refilled as the
+             user scrolls, so a 100k-account list scrolls as smoothly as a short
+             one. Search is a prefix lookup by binary search over each list's
+             sorted names; a longer prefix only searches the previous match range.
+             Double-clicking a name opens that account's activity.
+"""
+
+import os
+import subprocess
+import sys
+from bisect import bisect_left
+from tkinter import Toplevel, Label, Frame, Button, Entry, Listbox, StringVar
+from tkinter import ttk
+
+from core.followers_following import read_follow_analysis
+
+# Tab title for each result category.
+CATEGORY_TITLES = {
+    "mutual": "Mutuals",
+    "follows_me_only": "Follow Me, I Don't Follow Back",
+    "i_follow_only": "I Follow, Don't Follow Me Back",
+}
+
+# Rows kept in a list widget at a time.
+VISIBLE_ROWS = 20
+# Sorts after any character a username can contain, so prefix + PREFIX_END bounds a prefix's range.
+PREFIX_END = "\U0010ffff"
+
+
+def open_in_file_manager(path):
+    """Open a folder in the platform's file manager."""
+    if sys.platform.startswith("win"):
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path])
+
+
+class PrefixIndex:
+    """
+    Case-insensitive prefix search over a list of names.
+
+    Matches of a prefix form one contiguous range of the casefolded, sorted
+    keys, found with two binary searches; rows are mapped back to names
+    without copying the list.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        keys = [name.casefold() for name in names]
+        if all(a <= b for a, b in zip(keys, keys[1:])):
+            # Usernames are lowercase and already sorted: index the list as is.
+            self.keys, self.order = keys, None
+        else:
+            self.order = sorted(range(len(keys)), key=keys.__getitem__)
+            self.keys = [keys[i] for i in self.order]
+        self._prefix = ""
+        self._range = (0, len(keys))
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, prefix):
+        """Return the (start, stop) key range of names starting with prefix."""
+        prefix = prefix.casefold()
+        if prefix.startswith(self._prefix):
+            lo, hi = self._range
+        else:
+            lo, hi = 0, len(self.keys)
+        start = bisect_left(self.keys, prefix, lo, hi)
+        stop = bisect_left(self.keys, prefix + PREFIX_END, start, hi)
+        self._prefix, self._range = prefix, (start, stop)
+        return start, stop
+
+    def name_at(self, position):
+        """Name at a position in key order."""
+        return self.names[position if self.order is None else self.order[position]]
+
+
+class VirtualList(Frame):
+    """A scrollable list of a PrefixIndex range that only creates the visible rows."""
+
+    def __init__(self, master, index, rows=VISIBLE_ROWS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.index = index
+        self.rows = rows
+        self.start, self.stop = 0, len(index)
+        self.top = 0
+
+        self.listbox = Listbox(self, height=rows, activestyle="none", exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.listbox.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.listbox.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        self.listbox.bind("<Home>", lambda e: self.scroll_to(0))
+        self.listbox.bind("<End>", lambda e: self.scroll_to(self.count))
+        self._render()
+
+    @property
+    def count(self):
+        return self.stop - self.start
+
+    def show_range(self, start, stop):
+        """Show the index rows [start, stop), scrolled to the top."""
+        self.start, self.stop = start, stop
+        self.scroll_to(0)
+
+    def scroll(self, amount, what="units"):
+        step = self.rows if what == "pages" else 3
+        self.scroll_to(self.top + int(amount) * step)
+        return "break"
+
+    def scroll_to(self, top):
+        self.top = max(0, min(int(top), self.count - self.rows))
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, what=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.count)
+        else:
+            self.scroll(amount, what)
+
+    def selected(self):
+        """The row text under the list's selection, or None."""
+        selection = self.listbox.curselection()
+        return self.listbox.get(selection[0]) if selection else None
+
+    def _render(self):
+        first = self.start + self.top
+        last = min(self.stop, first + self.rows)
+        self.listbox.delete(0, "end")
+        self.listbox.insert("end", *(self.index.name_at(i) for i in range(first, last)))
+        if self.count:
+            self.scrollbar.set(self.top / self.count, (self.top + last - first) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+
+class FollowAnalysisViewer(Toplevel):
+    """Window with one searchable tab per follow analysis category."""
+
+    def __init__(self, master, analysis_path, output_folder=None, font=None, bg=None, on_open_user=None):
+        super().__init__(master)
+        self.title("Followers/Following Analysis")
+        if bg:
+            self.configure(bg=bg)
+        self.geometry("520x560")
+
+        results = read_follow_analysis(analysis_path)
+        self.indexes = {category: PrefixIndex(names) for category, names in results.items()}
+
+        search_frame = Frame(self, bg=bg)
+        search_frame.pack(fill="x", padx=15, pady=(15, 5))
+        Label(search_frame, text="Search:", font=font, bg=bg).pack(side="left")
+        self.query = StringVar()
+        entry = Entry(search_frame, textvariable=self.query, font=font)
+        entry.pack(side="left", fill="x", expand=True, padx=(8, 0))
+        entry.focus_set()
+
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True, padx=15, pady=5)
+        self.lists = {}
+        for category, index in self.indexes.items():
+            view = VirtualList(self.notebook, index)
+            if on_open_user is not None:
+                view.listbox.bind("<Double-Button-1>", lambda e, view=view: self._open_selected(view))
+            self.notebook.add(view, text=f"{CATEGORY_TITLES[category]} ({len(index)})")
+            self.lists[category] = view
+
+        button_frame = Frame(self, bg=bg)
+        button_frame.pack(pady=(5, 15))
+        Button(button_frame, text="Close", font=font, command=self.destroy, width=10).pack(side="left", padx=10)
+        if output_folder and os.path.exists(output_folder):
+            Button(button_frame, text="Open Folder", font=font,
+                   command=lambda: open_in_file_manager(output_folder), width=10).pack(side="left", padx=10)
+
+        self.on_open_user = on_open_user
+        self.query.trace_add("write", lambda *_: self.apply_search())
+
+    def _open_selected(self, view):
+        name = view.selected()
+        if name:
+            self.on_open_user(name)
+
+    def apply_search(self):
+        """Narrow every tab to the names starting with the search text."""
+        prefix = self.query.get().strip().lstrip("@")
+        for tab, (category, view) in enumerate(self.lists.items()):
+            start, stop = view.index.search(prefix)
+            view.show_range(start, stop)
+            total = len(view.index)
+            count = f"{stop - start} of {total}" if prefix else f"{total}"
+            self.notebook.tab(tab, text=f"{CATEGORY_TITLES[category]} ({count})")
@@ -0,0 +1,119 @@
+"""
+Preservr Archive Visual Analysis Tool - Image Cache
+
+Description: Decodes charts for display off the Tk main thread and keeps the most
+             recently shown ones ready. Charts are saved at 300 dpi, so the decoder
+             first shrinks them with a cheap reduced-resolution pass (Image.draft
+             for formats that support it, Image.reduce otherwise) and only then
+             resamples to the display size with LANCZOS. Entries are keyed by path
+             and modification time, so a chart rewritten by a new run is decoded
+             again while switching back to an unchanged one is instant.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# Size charts are shown at inside the image frame.
+DISPLAY_SIZE = (800, 500)
+# Number of decoded charts kept in memory.
+CACHE_CAPACITY = 16
+
+
+def cache_key(path):
+    """Return (path, mtime_ns) for a file, or None if it cannot be read."""
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def decode_for_display(path, size=DISPLAY_SIZE):
+    """Decode an image file straight to an RGBA image of exactly `size`."""
+    with Image.open(path) as img:
+        # Lets e.g. JPEG decode at 1/2, 1/4 or 1/8 scale; a no-op for PNG.
+        img.draft("RGB", size)
+        img.load()
+        factor = min(img.width // size[0], img.height // size[1])
+        if factor > 1:
+            img = img.reduce(factor)
+        return img.convert("RGBA").resize(size, Image.LANCZOS)
+
+
+class CachedImage:
+    """A decoded chart and, once created on the main thread, its PhotoImage."""
+
+    def __init__(self, key, image):
+        self.key = key
+        self.image = image
+        self.photo = None
+
+
+class ImageCache:
+    """
+    LRU cache of charts decoded for display.
+
+    `request()` decodes on a worker thread and posts (path, entry, error)
+    to `ready`; the UI drains it from the main thread with `poll()`, where
+    it is safe to create the Tk PhotoImage.
+    """
+
+    def __init__(self, size=DISPLAY_SIZE, capacity=CACHE_CAPACITY):
+        self.size = size
+        self.capacity = max(1, int(capacity))
+        self.ready = queue.Queue()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-decode")
+
+    def get(self, path):
+        """Return the up-to-date entry for `path`, or None if it must be decoded."""
+        key = cache_key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def request(self, path):
+        """Decode `path` in the background; the result arrives through `poll()`."""
+        self._executor.submit(self._decode, path)
+
+    def poll(self):
+        """Drain and return all finished decodes without blocking."""
+        drained = []
+        while True:
+            try:
+                drained.append(self.ready.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _decode(self, path):
+        key = cache_key(path)
+        try:
+            if key is None:
+                raise FileNotFoundError(f"No such file: '{path}'")
+            entry = self.get(path) or CachedImage(key, decode_for_display(path, self.size))
+        except Exception as e:
+            self.ready.put((path, None, e))
+            return
+        self._store(entry)
+        self.ready.put((path, entry, None))
+
+    def _store(self, entry):
+        path = entry.key[0]
+        with self._lock:
+            # Older versions of the same chart can never be shown again.
+            for key in [key for key in self._entries if key[0] == path and key != entry.key]:
+                del self._entries[key]
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
@@ -0,0 +1,219 @@
+"""
+Preservr Archive Visual Analysis Tool - Job Queue
+
+Description: Runs analysis scripts as queued background jobs. Several jobs may run
+             at once up to a configurable limit, and each job can be cancelled.
+             Worker threads never touch Tk; every status change is posted to a
+             thread-safe queue that the UI drains from the main thread. Progress
+             lines written by the analyses (see core/progress.py) are parsed from
+             the job's output and posted as "progress" events; result lines become
+             "result" events, which lets a long-running watch job push refreshed
+             charts to the UI while it keeps running. Pipeline jobs start on a
+             warm worker process when one is ready (see ui/warm_pool.py).
+"""
+
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+
+from core.progress import PROGRESS_ENV_VAR, parse_progress_line, parse_result_line, overall_fraction
+
+# Default number of analyses allowed to run at the same time.
+MAX_CONCURRENT_JOBS = 3
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Number of trailing output lines kept per job for error messages.
+OUTPUT_TAIL_LINES = 20
+
+
+class Job:
+    """A single queued analysis run and its current status."""
+
+    def __init__(self, job_id, name, command, payload=None, pipeline_args=None):
+        self.job_id = job_id
+        self.name = name
+        self.command = command
+        # core/pipeline.py arguments, when the job may run on a warm worker instead.
+        self.pipeline_args = pipeline_args
+        self.payload = payload
+        self.status = QUEUED
+        self.returncode = None
+        self.error = None
+        self.process = None
+        self.cancel_requested = False
+        self.started_at = None
+        self.progress = None
+        self.fraction = 0.0
+        self.output = deque(maxlen=OUTPUT_TAIL_LINES)
+        self.results = deque()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def eta_seconds(self):
+        """Estimate the remaining run time from progress so far, or None if unknown."""
+        if self.started_at is None or self.fraction <= 0.0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed * (1.0 - self.fraction) / self.fraction
+
+
+class JobScheduler:
+    """
+    Queue of analysis jobs executed as subprocesses on worker threads.
+
+    Events are (kind, job) tuples put on `events`; kind is one of "status",
+    "progress", "result" or "finished". Result dicts are queued on
+    `job.results`. The UI calls `poll()` from the Tk main thread to consume them.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_JOBS, warm_pool=None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        # Optional WarmWorkerPool (ui/warm_pool.py) that pipeline jobs start on.
+        self.warm_pool = warm_pool
+        self.events = queue.Queue()
+        self._pending = deque()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, name, command, payload=None, pipeline_args=None):
+        """
+        Queue a command for execution and return its Job. Jobs that give their
+        pipeline arguments run on a warm worker when one is ready.
+        """
+        job = Job(next(self._ids), name, command, payload, pipeline_args)
+        with self._lock:
+            self._pending.append(job)
+        self.events.put(("status", job))
+        self._start_available()
+        return job
+
+    def cancel(self, job):
+        """Cancel a queued job, or terminate a running one."""
+        with self._lock:
+            job.cancel_requested = True
+            if job in self._pending:
+                self._pending.remove(job)
+                job.status = CANCELLED
+                self.events.put(("finished", job))
+                return
+            process = job.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def cancel_all(self):
+        """Cancel every queued and running job."""
+        with self._lock:
+            jobs = list(self._pending) + list(self._running.values())
+        for job in jobs:
+            self.cancel(job)
+
+    def active_jobs(self):
+        """Return all jobs that have not finished yet, running first."""
+        with self._lock:
+            return list(self._running.values()) + list(self._pending)
+
+    def is_busy(self):
+        with self._lock:
+            return bool(self._running or self._pending)
+
+    def poll(self):
+        """Drain and return all pending events without blocking."""
+        drained = []
+        while True:
+            try:
+                drained.append(self.events.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def _start_available(self):
+        """Start queued jobs while there are free slots."""
+        while True:
+            with self._lock:
+                if len(self._running) >= self.max_concurrent or not self._pending:
+                    return
+                job = self._pending.popleft()
+                job.status = RUNNING
+                self._running[job.job_id] = job
+            self.events.put(("status", job))
+            threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    def _read_output(self, job):
+        """Consume the job's output, turning protocol lines into progress events."""
+        for line in job.process.stdout:
+            result = parse_result_line(line)
+            if result is not None:
+                job.results.append(result)
+                # A watch job starts a fresh pass after reporting results.
+                job.fraction = 0.0
+                job.started_at = time.monotonic()
+                self.events.put(("result", job))
+                continue
+            update = parse_progress_line(line)
+            if update is None:
+                if line.strip():
+                    job.output.append(line.rstrip())
+                continue
+            job.progress = update
+            # Multi-file analyses revisit stages; never move the bar backwards.
+            job.fraction = max(job.fraction, overall_fraction(update))
+            self.events.put(("progress", job))
+        job.process.stdout.close()
+
+    def _run_job(self, job):
+        """Worker thread body: run the subprocess and report the outcome."""
+        env = dict(os.environ, **{PROGRESS_ENV_VAR: "1"})
+        warm = False
+        try:
+            with self._lock:
+                if job.cancel_requested:
+                    raise _Cancelled()
+                job.started_at = time.monotonic()
+                if self.warm_pool is not None and job.pipeline_args is not None:
+                    job.process = self.warm_pool.run(job.pipeline_args)
+                    warm = job.process is not None
+                if job.process is None:
+                    job.process = subprocess.Popen(
+                        job.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                        text=True, encoding="utf-8", errors="replace", env=env)
+            self._read_output(job)
+            job.returncode = job.process.wait()
+            if job.cancel_requested:
+                job.status = CANCELLED
+            elif job.returncode == 0:
+                job.status = DONE
+            else:
+                job.status = FAILED
+                job.error = f"exited with status {job.returncode}"
+                if job.output:
+                    job.error += f"\n{job.output[-1]}"
+        except _Cancelled:
+            job.status = CANCELLED
+        except OSError as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            with self._lock:
+                self._running.pop(job.job_id, None)
+                job.process = None
+            if warm:
+                # Replace the warm worker this job used.
+                self.warm_pool.start()
+            self.events.put(("finished", job))
+            self._start_available()
+
+
+class _Cancelled(Exception):
+    """Raised internally when a job is cancelled before its process starts."""
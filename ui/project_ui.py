@@ -1,10 +1,19 @@
 import os
 import sys
-import threading
-import subprocess
-from tkinter import Tk, Toplevel, Label, Frame, Button, filedialog
+from tkinter import Tk, Toplevel, Label, Frame, Button, Checkbutton, Entry, BooleanVar, StringVar, filedialog
 from tkinter import ttk
-from PIL import Image, ImageTk
+from PIL import ImageTk
+from core.archive import find_numbered_files, locate_files
+from core.progress import STAGE_LABELS
+from core.registry import ANALYSES, DATASETS, OUTPUT_FOLDER_NAME, SHARDED_DATASETS, shard_stem
+from core.window import TimeWindow
+from ui.activity_viewer import ActivityIndexBuilder, UserActivityViewer
+from ui.follow_viewer import FollowAnalysisViewer
+from ui.image_cache import ImageCache
+from ui.job_queue import JobScheduler, MAX_CONCURRENT_JOBS, RUNNING, DONE, FAILED, CANCELLED
+from ui.tile_pyramid import TilePyramid
+from ui.warm_pool import WarmWorkerPool
+from ui.zoom_viewer import ZoomViewer
 
 # Define default fonts and colors
 DEFAULT_FONT = ("apple-system", 12)
@@ -13,10 +22,16 @@ BG_COLOR = "#f9f9f9"
 CARD_BG = "white"
 BORDER_COLOR = "#d1d1d1"
 
+# Every analysis job runs through the dependency-graph pipeline.
+PIPELINE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core", "pipeline.py")
+
+# How often the main thread drains results posted by job worker threads.
+JOB_POLL_INTERVAL_MS = 100
+
 class InstagramArchiveApp(Tk):
     """Main application class for Instagram Archive Visual Analysis Tool."""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_jobs=MAX_CONCURRENT_JOBS):
         """Initialize the application window and setup basic configurations."""
         super().__init__()
         self.title("Preservr - Archive Visual Analysis Tool (Instagram)")
@@ -30,9 +45,40 @@ class InstagramArchiveApp(Tk):
         
         self.folder_selected = None
         self.json_files = {}
+        self.shard_counts = {}
         self.image_label = None
+        self.displayed_image = None
+        # Charts decoded off the main thread; the latest requested one is shown.
+        self.images = ImageCache()
+        self.requested_image = None
+        # Tile pyramids of charts opened in the zoom viewer, by path.
+        self.pyramids = {}
+
+        # Pipeline processes started ahead of time so jobs skip library start-up.
+        self.warm_pool = WarmWorkerPool()
+        # Process (re)building the selected archive's per-user activity index.
+        self.index_builder = ActivityIndexBuilder()
+        # Background analysis jobs and the status rows shown for them.
+        self.jobs = JobScheduler(max_concurrent=max_concurrent_jobs, warm_pool=self.warm_pool)
+        self.job_rows = {}
+        # Long-running pipeline job that re-runs analyses when archive files change.
+        self.watch_job = None
 
         self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(JOB_POLL_INTERVAL_MS, self._poll_jobs)
+        # Warm up once the window has drawn, so start-up is not delayed.
+        self.after_idle(self.warm_pool.start)
+
+    def on_close(self):
+        """Terminate any running analyses before closing the window."""
+        self.jobs.cancel_all()
+        self.warm_pool.close()
+        self.index_builder.cancel()
+        for pyramid in self.pyramids.values():
+            pyramid.cancel()
+        self.images.close()
+        self.destroy()
 
     def center_window(self, width, height):
         """Center the application window on the screen based on provided dimensions."""
@@ -55,9 +101,6 @@ class InstagramArchiveApp(Tk):
         self.image_frame.grid(row=1, column=0, columnspan=2, padx=20, pady=10)
         self.image_frame.grid_propagate(False)
         
-        # Spinner / Progress Indicator using ttk.Progressbar
-        self.spinner = ttk.Progressbar(self.image_frame, mode="indeterminate")
-        
         # Row 2: Bottom frame containing File Select info and Script Buttons.
         bottom_frame = Frame(self, bg=BG_COLOR)
         bottom_frame.grid(row=2, column=0, columnspan=2, padx=20, pady=10)
@@ -76,33 +119,53 @@ class InstagramArchiveApp(Tk):
             bd=0, highlightthickness=0
         )
         self.btn_select.pack(anchor="w", padx=5, pady=(0,5))
+        # Button to keep the charts up to date while the archive changes.
+        self.btn_watch = Button(
+            file_info_frame, text="Watch Folder", command=self.toggle_watch,
+            font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
+            activebackground="#d3d3d3", activeforeground="black",
+            bd=0, highlightthickness=0
+        )
+        self.btn_watch.pack(anchor="w", padx=5, pady=(0,5))
+        # Button to look up everything the archive records about one account.
+        self.btn_activity = Button(
+            file_info_frame, text="User Activity", command=self.show_user_activity,
+            font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
+            activebackground="#d3d3d3", activeforeground="black",
+            bd=0, highlightthickness=0
+        )
+        self.btn_activity.pack(anchor="w", padx=5, pady=(0,5))
+        # For large files, show a chart estimated from a sample while the exact one is computed.
+        self.preview_enabled = BooleanVar(value=True)
+        Checkbutton(file_info_frame, text="Quick preview for large files", variable=self.preview_enabled,
+                    font=DEFAULT_FONT, bg=BG_COLOR, fg="black", activebackground=BG_COLOR,
+                    bd=0, highlightthickness=0).pack(anchor="w", padx=5, pady=(0,5))
+        # Optional date range (e.g. 2024-01-01, 2024 or 90d); empty means the whole archive.
+        range_frame = Frame(file_info_frame, bg=BG_COLOR)
+        range_frame.pack(anchor="w", padx=5, pady=(0,5))
+        self.since_text = StringVar()
+        self.until_text = StringVar()
+        Label(range_frame, text="Since", font=DEFAULT_FONT, bg=BG_COLOR, fg="black").pack(side="left")
+        Entry(range_frame, textvariable=self.since_text, font=DEFAULT_FONT, width=11).pack(side="left", padx=(4,8))
+        Label(range_frame, text="Until", font=DEFAULT_FONT, bg=BG_COLOR, fg="black").pack(side="left")
+        Entry(range_frame, textvariable=self.until_text, font=DEFAULT_FONT, width=11).pack(side="left", padx=(4,0))
         # Label to display the selected folder info.
         self.folder_label = Label(file_info_frame, text="No folder selected", font=DEFAULT_FONT,
                                   bg=BG_COLOR, fg="black", anchor="w", justify="left", wraplength=400)
         self.folder_label.pack(anchor="w", padx=5)
 
-        # Right subframe: Script buttons arranged in a 3x2 grid.
+        # Right subframe: Script buttons arranged in columns of three.
         button_frame = Frame(bottom_frame, bg=BG_COLOR)
         button_frame.grid(row=0, column=1, sticky="ne", padx=(10,0))
         
-        # Get the directory for scripts based on this file's location.
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        self.script_names = {
-            "Most Liked Users (Stories)": os.path.join(parent_dir, "core", "most_liked_users_stories.py"),
-            "Most Liked Users (Posts)": os.path.join(parent_dir, "core", "most_liked_users_posts.py"),
-            "Most Liked Users (Top 5)": os.path.join(parent_dir, "core", "most_liked_users.py"),
-            "Top Post Topics": os.path.join(parent_dir, "core", "top_topics.py"),
-            "Follower Age/Gender Distribution": os.path.join(parent_dir, "core", "age_gender_distribution.py"),
-            "Followers/Following Analysis": os.path.join(parent_dir, "core", "followers_following.py"),
-            
-        }
+        # Button labels and analysis names come from the analysis registry.
+        self.script_names = {analysis.label: analysis.name for analysis in ANALYSES.values()}
 
         # Create button grid 
         self.script_buttons = {}
         row_idx, col_idx = 0, 0
-        for text, script in self.script_names.items():
-            btn = Button(button_frame, text=text, command=lambda s=script: self.run_script(s),
+        for text, analysis_name in self.script_names.items():
+            btn = Button(button_frame, text=text, command=lambda name=analysis_name: self.run_script(name),
                          font=DEFAULT_FONT, bd=0, highlightthickness=0,
                          fg="black", bg="#d3d3d3", activebackground="#c0c0c0")
             btn.grid(row=row_idx, column=col_idx, padx=5, pady=5, sticky="nsew")
@@ -116,48 +179,42 @@ class InstagramArchiveApp(Tk):
         for i in range(3):
             button_frame.grid_rowconfigure(i, weight=1)
         # Ensure the columns in the button frame expand evenly.
-        for i in range(2):
+        for i in range(col_idx + (row_idx > 0)):
             button_frame.grid_columnconfigure(i, weight=1)
 
+        # Row 3: One status row per queued or running analysis job.
+        self.jobs_frame = Frame(self, bg=BG_COLOR)
+        self.jobs_frame.grid(row=3, column=0, columnspan=2, padx=20, pady=(0, 10), sticky="ew")
+
     def select_folder(self):
         """Open a dialog for user to select Instagram archive folder and initialize file searching."""
         folder = filedialog.askdirectory()
         if folder:
+            if self.watch_job is not None:
+                self.jobs.cancel(self.watch_job)
             self.folder_selected = folder
             self.json_files = self._initialize_json_files()
             self._find_json_files()
             self._update_folder_display()
+            self.warm_pool.prepare(folder)
+            self.index_builder.start(folder)
 
     def _initialize_json_files(self):
         """Initialize empty dictionary for tracking required JSON files in the archive."""
-        return {
-            'liked_posts': None,
-            'post_comments': None,
-            'recommended_topics': None,
-            'story_likes': None,
-            'audience_insights': None,
-            'followers_1': None,
-            'following': None
-        }
+        return {key: None for key in DATASETS}
 
     def _find_json_files(self):
         """Search through selected folder to locate required JSON files."""
         if not self.folder_selected:
             return
-        file_mapping = {
-            'liked_posts.json': 'liked_posts',
-            'recommended_topics.json': 'recommended_topics',
-            'story_likes.json': 'story_likes',
-            'audience_insights.json': 'audience_insights',
-            'followers_1.json': 'followers_1',
-            'following.json': 'following'
-        }
 
         # Recursive search
-        for root_dir, _, files in os.walk(self.folder_selected):
-            for file in files:
-                if file in file_mapping and self.json_files[file_mapping[file]] is None:
-                    self.json_files[file_mapping[file]] = os.path.join(root_dir, file)
+        found = locate_files(self.folder_selected, list(DATASETS.values()))
+        for key, filename in DATASETS.items():
+            self.json_files[key] = found[filename]
+        # Number of files of each dataset split across numbered shards.
+        self.shard_counts = {key: len(find_numbered_files(self.folder_selected, shard_stem(key)))
+                             for key in SHARDED_DATASETS if self.json_files[key]}
 
     def _update_folder_display(self):
         """Update the UI to show which required files were found in the selected folder."""
@@ -166,11 +223,12 @@ class InstagramArchiveApp(Tk):
         file_status_lines = []
 
         for key, path in self.json_files.items():
-            if key == 'post_comments':  # Skip as before.
-                continue
             # Use simple checkmark characters.
             status = "\u2713" if path is not None else "\u2717"
-            display_name = f"{key}.json"
+            display_name = DATASETS[key]
+            if key in SHARDED_DATASETS:
+                shards = self.shard_counts.get(key, 0) if path is not None else 0
+                display_name = f"{shard_stem(key)}_N.json" + (f" ({shards} files)" if shards else "")
             file_status_lines.append(f"{status} {display_name}")
 
         # Show only the basename of the folder to avoid overly long text.
@@ -179,60 +237,73 @@ class InstagramArchiveApp(Tk):
         self.folder_label.config(text=status_text, fg="black")
         self.folder_label.config(text=status_text)
 
-    def run_script(self, script_path):
-        """Execute the selected analysis script in a separate thread and handle the UI feedback."""
+    def run_script(self, analysis_name):
+        """Queue the selected analysis as a background job."""
         if not self.folder_selected:
             self.show_directory_prompt()
             return
 
-        script_name_only = os.path.basename(script_path)
-        
-        # Check if required files exist before running the script
-        if not self.check_required_files(script_name_only):
+        # Check if required files exist before running the analysis
+        if not self.check_required_files(analysis_name):
             return
-            
-        # Mapping from script filenames to expected output image names.
-        
-        output_images = {
-            "most_liked_users_stories.py": "story_likes_visualization.png",
-            "most_liked_users_posts.py": "liked_posts_wordcloud.png",
-            "top_topics.py": "top_topics.png",
-            "age_gender_distribution.py": "age_gender_distribution.png",
-            "most_liked_users.py": "most_liked_users_barchart.png",
-        }
-
-        # Show spinner in the image frame and disable script buttons.
-        self.spinner.place(relx=0.5, rely=0.5, anchor="center")
-        self.spinner.start()
-        for btn in self.script_buttons.values():
-            btn.config(state="disabled")
-
-        # Run the selected script in a separate thread.
-        threading.Thread(target=self._run_script_thread,
-                         args=(script_path, script_name_only, output_images),
-                         daemon=True).start()
-
-    def check_required_files(self, script_name):
-        """Check if the required JSON files exist for a specific script."""
-        # Map scripts to their required JSON files
-        required_files_map = {
-            "most_liked_users_stories.py": ["story_likes"],
-            "most_liked_users_posts.py": ["liked_posts"],
-            "top_topics.py": ["recommended_topics"],
-            "age_gender_distribution.py": ["audience_insights"],
-            "most_liked_users.py": ["liked_posts"],
-            "followers_following.py": ["followers_1", "following"]
-        }
-        
-        required_keys = required_files_map.get(script_name, [])
-        missing_files = []
-        
-        for key in required_keys:
-            if not self.json_files.get(key):
-                missing_files.append(f"{key}.json")
-        
+
+        range_args = self.date_range_args()
+        if range_args is None:
+            return
+
+        # Queue the analysis as a background job; other analyses stay available.
+        analysis = ANALYSES[analysis_name]
+        pipeline_args = [self.folder_selected, analysis_name, *range_args]
+        if self.preview_enabled.get():
+            pipeline_args.append("--preview")
+        job = self.jobs.submit(analysis.label, [sys.executable, PIPELINE_SCRIPT, *pipeline_args],
+                               payload=(analysis_name, self.folder_selected), pipeline_args=pipeline_args)
+        self._add_job_row(job)
+
+    def toggle_watch(self):
+        """Start or stop re-running analyses whenever the archive's files change."""
+        if self.watch_job is not None:
+            self.jobs.cancel(self.watch_job)
+            return
+        if not self.folder_selected:
+            self.show_directory_prompt()
+            return
+
+        analysis_names = [name for name, analysis in ANALYSES.items()
+                          if not analysis.missing_files(self.json_files)]
+        if not analysis_names:
+            self.show_warning("None of the analyses can run with the files in this folder.")
+            return
+        range_args = self.date_range_args()
+        if range_args is None:
+            return
+        pipeline_args = [self.folder_selected, *analysis_names, *range_args, "--watch"]
+        self.watch_job = self.jobs.submit("Watching archive", [sys.executable, PIPELINE_SCRIPT, *pipeline_args],
+                                          payload=(None, self.folder_selected), pipeline_args=pipeline_args)
+        self._add_job_row(self.watch_job)
+        self.btn_watch.config(text="Stop Watching")
+
+    def date_range_args(self):
+        """Pipeline arguments for the Since/Until fields, or None (after telling the user) if they are invalid."""
+        since, until = self.since_text.get().strip(), self.until_text.get().strip()
+        try:
+            TimeWindow.parse(since, until)
+        except ValueError as e:
+            self.show_error(f"Invalid date range: {e}")
+            return None
+        args = []
+        if since:
+            args += ["--since", since]
+        if until:
+            args += ["--until", until]
+        return args
+
+    def check_required_files(self, analysis_name):
+        """Check if the required JSON files exist for a specific analysis."""
+        missing_files = ANALYSES[analysis_name].missing_files(self.json_files)
+
         if missing_files:
-            self.show_missing_files_error(script_name, missing_files)
+            self.show_missing_files_error(analysis_name, missing_files)
             return False
             
         return True
@@ -269,29 +340,122 @@ class InstagramArchiveApp(Tk):
         Button(error_window, text="OK", font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
                command=error_window.destroy, width=10).pack(pady=15)
                
-    def _run_script_thread(self, script_path, script_name_only, output_images):
-        """Background thread function that runs the selected script and handles its output."""
-        try:
-            subprocess.run([sys.executable, script_path, self.folder_selected], check=True)
-            if script_name_only == "followers_following.py":
-                txt_path = os.path.join(self.folder_selected, "OUTPUT_FOLDER", "follow_analysis.txt")
-                if not os.path.exists(txt_path):
-                    self.show_error("Analysis script ran but no output file was found.")
-                else:
-                    # Show instructions window for follow analysis
-                    self.after(0, self.show_follow_analysis_instructions)
+    def _add_job_row(self, job):
+        """Add a status row with a progress bar and cancel button for a job."""
+        row = Frame(self.jobs_frame, bg=BG_COLOR)
+        row.pack(fill="x", pady=2)
+        label = Label(row, text=f"{job.name}: {job.status}", font=DEFAULT_FONT,
+                      bg=BG_COLOR, fg="black", anchor="w", width=40)
+        label.pack(side="left")
+        bar = ttk.Progressbar(row, mode="indeterminate", length=300)
+        bar.pack(side="left", padx=10)
+        Button(row, text="Cancel", font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
+               command=lambda: self.jobs.cancel(job), bd=0,
+               highlightthickness=0).pack(side="left")
+        self.job_rows[job.job_id] = (row, label, bar)
+
+        # Only the button for this analysis is disabled while its job is active.
+        button = self.script_buttons.get(job.name)
+        if button is not None:
+            button.config(state="disabled")
+
+    def _poll_jobs(self):
+        """Drain job events posted by worker threads and update the UI on the main thread."""
+        for kind, job in self.jobs.poll():
+            if kind == "status":
+                self._update_job_row(job)
+            elif kind == "progress":
+                self._update_job_progress(job)
+            elif kind == "result":
+                self._handle_job_results(job)
+            elif kind == "finished":
+                self._handle_job_finished(job)
+        for path, entry, error in self.images.poll():
+            self._handle_decoded_image(path, entry, error)
+        self.after(JOB_POLL_INTERVAL_MS, self._poll_jobs)
+
+    def _update_job_row(self, job):
+        """Refresh the status text and animation of a job's row."""
+        widgets = self.job_rows.get(job.job_id)
+        if widgets is None:
+            return
+        _, label, bar = widgets
+        label.config(text=f"{job.name}: {job.status}")
+        if job.status == RUNNING:
+            bar.start()
+
+    def _update_job_progress(self, job):
+        """Switch a job's bar to determinate mode and show its stage and ETA."""
+        widgets = self.job_rows.get(job.job_id)
+        if widgets is None or job.progress is None:
+            return
+        _, label, bar = widgets
+        if str(bar.cget("mode")) != "determinate":
+            bar.stop()
+            bar.config(mode="determinate", maximum=100)
+        bar.config(value=job.fraction * 100)
+
+        stage_text = STAGE_LABELS.get(job.progress["stage"], job.progress["stage"])
+        eta = job.eta_seconds()
+        eta_text = f", about {int(eta) + 1}s left" if eta is not None and job.fraction >= 0.05 else ""
+        label.config(text=f"{job.name}: {stage_text} ({job.fraction:.0%}{eta_text})")
+
+    def _handle_job_results(self, job):
+        """Show preview charts and charts a watch job has just refreshed."""
+        while job.results:
+            result = job.results.popleft()
+            if result["status"] != "succeeded":
+                continue
+            images = [path for path in result["artifacts"] if path.endswith(".png")]
+            if result.get("preview"):
+                widgets = self.job_rows.get(job.job_id)
+                if widgets is not None:
+                    widgets[1].config(text=f"{job.name}: preview shown, computing exact chart")
+                if images:
+                    self.display_visualization(images[0])
+            # Refresh the chart on screen, or show the first one if none is displayed yet.
+            elif images and (self.displayed_image is None or self.displayed_image in images):
+                self.display_visualization(images[0])
+
+    def _handle_job_finished(self, job):
+        """Remove a finished job's row and show its output, errors or warnings."""
+        widgets = self.job_rows.pop(job.job_id, None)
+        if widgets is not None:
+            row, _, bar = widgets
+            bar.stop()
+            row.destroy()
+        button = self.script_buttons.get(job.name)
+        if button is not None:
+            button.config(state="normal")
+
+        analysis_name, folder = job.payload
+        if job is self.watch_job:
+            self.watch_job = None
+            self.btn_watch.config(text="Watch Folder")
+            if job.status == FAILED:
+                self.show_error(f"Watching stopped: {job.error}")
+            return
+        if job.status == CANCELLED:
+            return
+        if job.status == FAILED:
+            self.show_error(f"Error executing {job.name}: {job.error}")
+            return
+        if job.status != DONE:
+            return
+
+        # Output discovery comes from the artifacts the analysis declares.
+        artifact_paths = ANALYSES[analysis_name].artifact_paths(folder)
+        if analysis_name == "followers_following":
+            if not all(os.path.exists(path) for path in artifact_paths):
+                self.show_error("Analysis script ran but no output file was found.")
+            else:
+                self.show_follow_analysis(artifact_paths[0])
+        else:
+            images = [path for path in artifact_paths if path.endswith(".png")]
+            if images and os.path.exists(images[0]):
+                self.display_visualization(images[0])
             else:
-                output_image_name = output_images.get(script_name_only)
-                if output_image_name:
-                    output_image_path = os.path.join(self.folder_selected, "OUTPUT_FOLDER", output_image_name)
-                    if os.path.exists(output_image_path):
-                        self.after(0, lambda: self.display_visualization(output_image_path))
-                    else:
-                        self.show_warning("Visualization file not found in selected folder.")
-        except subprocess.CalledProcessError as e:
-            self.show_error(f"Error executing {script_name_only}: {e}")
-        finally:
-            self.after(0, self._finish_script_run)
+                self.show_warning("Visualization file not found in selected folder.")
 
     def show_directory_prompt(self):
         """Display a window prompting the user to specify a directory."""
@@ -335,64 +499,64 @@ class InstagramArchiveApp(Tk):
         # Wait for the window to be closed
         self.wait_window(prompt_window)
 
-    def show_follow_analysis_instructions(self):
-        """Display a window with instructions to open the OUTPUT_FOLDER."""
-        instruction_window = Toplevel(self)
-        instruction_window.title("Followers/Following Analysis")
-        instruction_window.configure(bg=BG_COLOR)
-        instruction_window.geometry("500x250")
-        
-        # Center the window on the screen
-        screen_width = instruction_window.winfo_screenwidth()
-        screen_height = instruction_window.winfo_screenheight()
-        x_position = (screen_width - 500) // 2
-        y_position = (screen_height - 250) // 2
-        instruction_window.geometry(f"500x250+{x_position}+{y_position}")
-        
-        # Add instructions
-        message = (
-            "The Followers/Following Analysis is complete!\n\n"
-            "Please open the 'OUTPUT_FOLDER' in your selected archive folder to view the follow_analysis.txt file with your results."
-        )
+    def show_follow_analysis(self, analysis_path):
+        """Open the in-app viewer for the followers/following results."""
+        output_folder = os.path.join(self.folder_selected, OUTPUT_FOLDER_NAME)
+        FollowAnalysisViewer(self, analysis_path, output_folder, font=DEFAULT_FONT, bg=BG_COLOR,
+                             on_open_user=self.show_user_activity)
 
-        Label(instruction_window, text=message, font=DEFAULT_FONT, bg=BG_COLOR, fg="black",
-              justify="center", wraplength=450, pady=20).pack(expand=True)
-        
-        output_path = os.path.join(self.folder_selected, "OUTPUT_FOLDER")
-        
-        # Create button frame to hold the buttons side by side
-        button_frame = Frame(instruction_window, bg=BG_COLOR)
-        button_frame.pack(pady=15)
-        
-        # Add button to close the window
-        Button(button_frame, text="OK", font=DEFAULT_FONT,
-               command=instruction_window.destroy, width=10).pack(side="left", padx=10)
-        
-        # Add button to open output folder if available
-        if os.path.exists(output_path):
-            Button(button_frame, text="Open Folder", font=DEFAULT_FONT,
-               command=lambda: os.startfile(output_path), width=10).pack(side="left", padx=10)
-
-    def _finish_script_run(self):
-        """Stop spinner animation and re-enable buttons after script execution completes."""
-        self.spinner.stop()
-        self.spinner.place_forget()
-        for btn in self.script_buttons.values():
-            btn.config(state="normal")
+    def show_user_activity(self, username=""):
+        """Open the drill-down of one account's activity, within the Since/Until range if one is set."""
+        if not self.folder_selected:
+            self.show_directory_prompt()
+            return
+        try:
+            window = TimeWindow.parse(self.since_text.get().strip(), self.until_text.get().strip())
+        except ValueError as e:
+            self.show_error(f"Invalid date range: {e}")
+            return
+        UserActivityViewer(self, self.folder_selected, self.json_files, self.index_builder, username, window,
+                           font=DEFAULT_FONT, bg=BG_COLOR)
 
     def display_visualization(self, image_path):
-        """Load and display the visualization image produced by an analysis script."""
-        try:
-            img = Image.open(image_path)
-            img = img.resize((800, 500), Image.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            if self.image_label is not None:
-                self.image_label.destroy()
-            self.image_label = Label(self.image_frame, image=photo, bg=CARD_BG)
-            self.image_label.image = photo  # keep a reference
+        """Show a visualization produced by an analysis, decoding it in the background if needed."""
+        self.requested_image = image_path
+        entry = self.images.get(image_path)
+        if entry is None:
+            self.images.request(image_path)
+        else:
+            self._show_image(entry)
+
+    def _handle_decoded_image(self, path, entry, error):
+        """Show a chart decoded by the image cache unless another one was requested since."""
+        if path != self.requested_image:
+            return
+        if error is not None:
+            self.show_error(f"Could not load visualization: {error}")
+        else:
+            self._show_image(entry)
+
+    def _show_image(self, entry):
+        """Put a decoded chart on screen, creating its PhotoImage on first use."""
+        if entry.photo is None:
+            entry.photo = ImageTk.PhotoImage(entry.image)
+        if self.image_label is None:
+            self.image_label = Label(self.image_frame, bg=CARD_BG, cursor="hand2")
             self.image_label.place(rely=0.5, relx=0.5, anchor="center")
-        except Exception as e:
-            self.show_error(f"Could not load visualization: {e}")
+            # Click the chart to explore it at full resolution.
+            self.image_label.bind("<Button-1>", lambda e: self.show_zoom_viewer())
+        self.image_label.config(image=entry.photo)
+        self.image_label.image = entry.photo  # keep a reference
+        self.displayed_image = entry.key[0]
+
+    def show_zoom_viewer(self):
+        """Open the chart on screen in the zoom viewer; its tiles are cut in the background on first use."""
+        if self.displayed_image is None:
+            return
+        pyramid = self.pyramids.get(self.displayed_image)
+        if pyramid is None:
+            pyramid = self.pyramids[self.displayed_image] = TilePyramid(self.displayed_image)
+        ZoomViewer(self, self.displayed_image, pyramid, font=DEFAULT_FONT, bg=BG_COLOR)
 
     def show_error(self, message):
         """Display an error message to the user."""
@@ -436,8 +600,8 @@ class InstagramArchiveApp(Tk):
         y_position = (screen_height - 200) // 2
         warning_window.geometry(f"450x200+{x_position}+{y_position}")
 
-        Label(error_window, text=message, font=DEFAULT_FONT, bg=BG_COLOR, fg="black",
+        Label(warning_window, text=message, font=DEFAULT_FONT, bg=BG_COLOR, fg="black",
               justify="center", wraplength=400, pady=20).pack(expand=True)
 
-        Button(error_window, text="OK", font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
-               command=error_window.destroy, width=10).pack(pady=15)
\ No newline at end of file
+        Button(warning_window, text="OK", font=DEFAULT_FONT, fg="black", bg="#d3d3d3",
+               command=warning_window.destroy, width=10).pack(pady=15)
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Preservr Archive Visual Analysis Tool - Tile Pyramid
+
+Description: Cuts a chart into a pyramid of fixed-size tiles for the zoom viewer.
+             Level 0 is the full 300-dpi image, and each further level halves the
+             previous one until the whole chart fits in a single tile. The pyramid
+             is built once per artifact by a background thread and written to a
+             tile cache folder next to OUTPUT_FOLDER. It is rebuilt only when the
+             chart is rewritten. The coarsest levels are written first, so the
+             viewer can show the whole chart while the detailed levels are still
+             being cut. Once built, a chart is never decoded again: the viewer
+             reads only the tiles it shows.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+from PIL import Image
+
+from ui.image_cache import cache_key
+
+TILE_SIZE = 256
+# Folder beside OUTPUT_FOLDER holding one tile pyramid per chart.
+TILE_FOLDER_NAME = "OUTPUT_TILES"
+MANIFEST_NAME = "pyramid.json"
+# Tiles are re-read often and written once; fast compression keeps building quick.
+TILE_COMPRESS_LEVEL = 1
+
+
+def tile_folder(image_path):
+    """The folder a chart's tiles are cached in: OUTPUT_TILES/<chart name> beside its OUTPUT_FOLDER."""
+    output_folder = os.path.dirname(os.path.abspath(image_path))
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(os.path.dirname(output_folder), TILE_FOLDER_NAME, name)
+
+
+def level_sizes(width, height, tile_size=TILE_SIZE):
+    """(width, height) of every level, from full size down to the first that fits in one tile."""
+    sizes = [(width, height)]
+    while max(sizes[-1]) > tile_size:
+        w, h = sizes[-1]
+        sizes.append(((w + 1) // 2, (h + 1) // 2))
+    return sizes
+
+
+class TilePyramid:
+    """
+    The tiles of one chart on disk. `start()` builds missing levels in the
+    background; the viewer asks `ready()` and `complete_levels` to find out
+    which tiles can already be read.
+    """
+
+    def __init__(self, image_path, tile_size=TILE_SIZE):
+        self.image_path = image_path
+        self.tile_size = tile_size
+        self.folder = tile_folder(image_path)
+        self.sizes = []
+        # Replaced, never mutated, so the viewer can read it while levels are added.
+        self.complete_levels = frozenset()
+        self.error = None
+        self._key = None
+        self._thread = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def levels(self):
+        return len(self.sizes)
+
+    @property
+    def width(self):
+        return self.sizes[0][0] if self.sizes else 0
+
+    @property
+    def height(self):
+        return self.sizes[0][1] if self.sizes else 0
+
+    def ready(self):
+        """True once the chart's size is known and at least one level can be shown."""
+        return bool(self.complete_levels)
+
+    def complete(self):
+        return bool(self.sizes) and len(self.complete_levels) == len(self.sizes)
+
+    def building(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Use the cached tiles if they match the chart, and build whatever is missing in the background."""
+        key = cache_key(self.image_path)
+        with self._lock:
+            if key is None:
+                self.error = FileNotFoundError(f"No such file: '{self.image_path}'")
+                return
+            if key == self._key and (self.complete() or self.building()):
+                return
+            if self.building():
+                # Still cutting an older version of the chart.
+                self._cancel.set()
+                self._thread.join()
+            self._key = key
+            self.error = None
+            if not self._load_manifest(key):
+                self.sizes, self.complete_levels = [], frozenset()
+            if self.complete():
+                return
+            self._cancel.clear()
+            self._thread = threading.Thread(target=self._build, args=(key,), daemon=True, name="tile-pyramid")
+            self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def grid(self, level):
+        """(columns, rows) of tiles at a level."""
+        w, h = self.sizes[level]
+        return -(-w // self.tile_size), -(-h // self.tile_size)
+
+    def best_level(self, level):
+        """The finest built level no finer than `level`, or None if nothing is built yet."""
+        built = [candidate for candidate in self.complete_levels if candidate >= level]
+        return min(built) if built else None
+
+    def tile_path(self, level, col, row):
+        return os.path.join(self.folder, str(level), f"{col}_{row}.png")
+
+    def read_tile(self, level, col, row):
+        """Decode one tile."""
+        with Image.open(self.tile_path(level, col, row)) as tile:
+            tile.load()
+            return tile
+
+    def _manifest_path(self):
+        return os.path.join(self.folder, MANIFEST_NAME)
+
+    def _load_manifest(self, key):
+        """Adopt a manifest written for this version of the chart; returns False if there is none."""
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if manifest.get("mtime_ns") != key[1] or manifest.get("tile_size") != self.tile_size:
+            return False
+        self.sizes = [tuple(size) for size in manifest["sizes"]]
+        self.complete_levels = frozenset(manifest["complete"])
+        return True
+
+    def _write_manifest(self, key):
+        manifest = {"source": os.path.basename(self.image_path), "mtime_ns": key[1], "tile_size": self.tile_size,
+                    "sizes": self.sizes, "complete": sorted(self.complete_levels)}
+        temporary = self._manifest_path() + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(temporary, self._manifest_path())
+
+    def _build(self, key):
+        try:
+            if not self.sizes:
+                # Tiles of an older version of the chart are useless now.
+                shutil.rmtree(self.folder, ignore_errors=True)
+            os.makedirs(self.folder, exist_ok=True)
+            with Image.open(self.image_path) as source:
+                source.load()
+                # Charts are drawn on an opaque background.
+                image = source.convert("RGB")
+            sizes = level_sizes(*image.size, self.tile_size)
+            # Every level is reduced from the next finer one; all but the full image are small.
+            images = [image]
+            for _ in sizes[1:]:
+                images.append(images[-1].reduce(2))
+            self.sizes = sizes
+            for level in reversed(range(len(sizes))):
+                if level not in self.complete_levels:
+                    self._write_level(level, images[level])
+                    if self._cancel.is_set():
+                        return
+                    self.complete_levels = self.complete_levels | {level}
+                    self._write_manifest(key)
+                images[level] = None
+        except Exception as e:
+            self.error = e
+
+    def _write_level(self, level, image):
+        folder = os.path.join(self.folder, str(level))
+        os.makedirs(folder, exist_ok=True)
+        cols, rows = self.grid(level)
+        for row in range(rows):
+            for col in range(cols):
+                if self._cancel.is_set():
+                    return
+                box = (col * self.tile_size, row * self.tile_size,
+                       min((col + 1) * self.tile_size, image.width), min((row + 1) * self.tile_size, image.height))
+                image.crop(box).save(self.tile_path(level, col, row), compress_level=TILE_COMPRESS_LEVEL)
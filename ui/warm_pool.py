@@ -0,0 +1,132 @@
+"""
+Preservr Archive Visual Analysis Tool - Warm Worker Pool
+
+Description: Keeps pipeline processes (core/worker.py) started ahead of time, so
+             that running an analysis does not wait for Python, matplotlib, pandas
+             and wordcloud to load. Workers are spawned from a background thread and
+             told to pre-parse the selected archive; every worker handed to a job is
+             replaced when that job finishes, so the next job finds a warm one too.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from core.progress import PROGRESS_ENV_VAR
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core", "worker.py")
+
+# Number of idle warm workers kept ready. Each holds its own copy of the parsed archive.
+WARM_WORKERS = 1
+
+
+class WarmWorkerPool:
+    """Idle warm worker processes, handed out to jobs one at a time."""
+
+    def __init__(self, size=WARM_WORKERS):
+        self.size = max(0, int(size))
+        self.folder_path = None
+        self._idle = []
+        # Workers being spawned; they count against `size` so fills never overshoot it.
+        self._spawning = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        # Commands are whole lines; keep writes from different threads apart.
+        self._send_lock = threading.Lock()
+
+    def start(self):
+        """Spawn workers until the pool is full, without blocking the caller."""
+        if self._closed:
+            return
+        threading.Thread(target=self._fill, daemon=True).start()
+
+    def prepare(self, folder_path):
+        """Have every idle worker (and every later one) pre-parse this archive."""
+        with self._lock:
+            self.folder_path = folder_path
+            workers = list(self._idle)
+        for process in workers:
+            self._send(process, {"prepare": folder_path})
+
+    def acquire(self):
+        """
+        Take an idle worker, or return None if none is ready (the job should
+        then start a process of its own). Call start() once the job is done to
+        replace it; warming a replacement while the job runs would compete with
+        it for the CPU.
+        """
+        with self._lock:
+            process = None
+            while self._idle:
+                candidate = self._idle.pop(0)
+                if candidate.poll() is None:
+                    process = candidate
+                    break
+        return process
+
+    def run(self, pipeline_args):
+        """
+        Start a pipeline run (core/pipeline.py arguments) on a warm worker and
+        return its process, or None if no warm worker could take it.
+        """
+        process = self.acquire()
+        if process is None:
+            return None
+        if not self._send(process, {"run": list(pipeline_args)}):
+            process.kill()
+            return None
+        with self._send_lock:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        return process
+
+    def close(self):
+        """Stop every idle worker; workers already running a job are left to it."""
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for process in workers:
+            process.terminate()
+
+    def _fill(self):
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._spawning >= self.size:
+                    return
+                self._spawning += 1
+            try:
+                process = self._spawn()
+            except OSError:
+                with self._lock:
+                    self._spawning -= 1
+                return
+            with self._lock:
+                self._spawning -= 1
+                if self._closed:
+                    process.terminate()
+                    return
+                self._idle.append(process)
+                folder_path = self.folder_path
+            if folder_path is not None:
+                self._send(process, {"prepare": folder_path})
+
+    @staticmethod
+    def _spawn():
+        env = dict(os.environ, **{PROGRESS_ENV_VAR: "1"})
+        return subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace", env=env)
+
+    def _send(self, process, command):
+        """Write one command line to a worker; returns False if it has gone away."""
+        with self._send_lock:
+            try:
+                process.stdin.write(json.dumps(command) + "\n")
+                process.stdin.flush()
+                return True
+            except (OSError, ValueError):
+                return False
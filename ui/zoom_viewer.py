@@ -0,0 +1,212 @@
+"""
+Preservr Archive Visual Analysis Tool - Zoom Viewer
+
+Description: Zoom and pan around a chart at up to its full 300-dpi resolution, so
+             word clouds with thousands of names stay readable. The chart is shown
+             from its tile pyramid (ui/tile_pyramid.py): each redraw works out which
+             tiles of the level closest to the current zoom are on screen and reads
+             only those, so memory stays flat however large the chart is. While the
+             pyramid is still being built, the finest level already written is shown
+             scaled up until the sharper one is ready.
+"""
+
+import math
+import os
+from collections import OrderedDict
+from tkinter import Toplevel, Frame, Button, Label, Canvas
+
+from PIL import Image, ImageTk
+
+from ui.tile_pyramid import TilePyramid
+
+# Zoom factor of one step (a button press or a mouse wheel notch).
+ZOOM_STEP = math.sqrt(2)
+# Most zoomed-in scale: screen pixels per chart pixel.
+MAX_SCALE = 4.0
+# Tiles kept ready to draw, as (level, column, row, scale) -> PhotoImage.
+PHOTO_CACHE_SIZE = 128
+# How often the viewer checks for newly built levels.
+BUILD_POLL_INTERVAL_MS = 150
+
+
+class ZoomViewer(Toplevel):
+    """Window showing one chart with mouse-wheel zoom and drag-to-pan."""
+
+    def __init__(self, master, image_path, pyramid=None, font=None, bg=None):
+        super().__init__(master)
+        self.title(f"Zoom - {os.path.basename(image_path)}")
+        if bg:
+            self.configure(bg=bg)
+        self.geometry("1000x700")
+        self.pyramid = pyramid or TilePyramid(image_path)
+        self.pyramid.start()
+        # Screen pixels per full-resolution chart pixel, and the chart point at the canvas' top left.
+        self.scale = None
+        self.origin = (0.0, 0.0)
+        # While the whole chart is shown, resizing the window refits it.
+        self._fitted = True
+        self._drag_start = None
+        self._photos = OrderedDict()
+        self._items = {}
+        self._shown_levels = None
+
+        toolbar = Frame(self, bg=bg)
+        toolbar.pack(fill="x", padx=10, pady=(10, 5))
+        Button(toolbar, text="-", font=font, width=3, command=lambda: self.zoom_by(1 / ZOOM_STEP)).pack(side="left")
+        Button(toolbar, text="+", font=font, width=3, command=lambda: self.zoom_by(ZOOM_STEP)).pack(side="left",
+                                                                                                  padx=(4, 0))
+        Button(toolbar, text="Fit", font=font, width=5, command=self.fit).pack(side="left", padx=(4, 0))
+        self.status = Label(toolbar, text="", font=font, bg=bg, anchor="w")
+        self.status.pack(side="left", fill="x", expand=True, padx=10)
+        Button(toolbar, text="Close", font=font, width=8, command=self.destroy).pack(side="right")
+
+        self.canvas = Canvas(self, bg="white", highlightthickness=0, cursor="fleur")
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<ButtonPress-1>", self._start_drag)
+        self.canvas.bind("<B1-Motion>", self._drag)
+        # Windows and macOS report wheel deltas; X11 reports buttons 4 and 5.
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom_by(ZOOM_STEP if e.delta > 0 else 1 / ZOOM_STEP,
+                                                                 e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_by(ZOOM_STEP, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_by(1 / ZOOM_STEP, e.x, e.y))
+        self.bind("<plus>", lambda e: self.zoom_by(ZOOM_STEP))
+        self.bind("<equal>", lambda e: self.zoom_by(ZOOM_STEP))
+        self.bind("<minus>", lambda e: self.zoom_by(1 / ZOOM_STEP))
+        self.bind("<Key-0>", lambda e: self.fit())
+
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.after(BUILD_POLL_INTERVAL_MS, self._poll_build)
+
+    def _canvas_size(self):
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+
+    def _fit_scale(self):
+        width, height = self._canvas_size()
+        return min(width / self.pyramid.width, height / self.pyramid.height)
+
+    def fit(self):
+        """Show the whole chart."""
+        if not self.pyramid.ready():
+            return
+        self.scale = None
+        self._fitted = True
+        self.redraw()
+
+    def zoom_by(self, factor, x=None, y=None):
+        """Zoom by `factor`, keeping the chart point under canvas position (x, y) in place."""
+        if self.scale is None:
+            return
+        width, height = self._canvas_size()
+        x = width / 2 if x is None else x
+        y = height / 2 if y is None else y
+        scale = min(max(self.scale * factor, self._fit_scale() / 2), MAX_SCALE)
+        self._fitted = False
+        point = (self.origin[0] + x / self.scale, self.origin[1] + y / self.scale)
+        self.scale = scale
+        self.origin = (point[0] - x / scale, point[1] - y / scale)
+        self.redraw()
+
+    def _start_drag(self, event):
+        self._drag_start = (event.x, event.y, self.origin)
+
+    def _drag(self, event):
+        if self._drag_start is None or self.scale is None:
+            return
+        x, y, (origin_x, origin_y) = self._drag_start
+        self._fitted = False
+        self.origin = (origin_x - (event.x - x) / self.scale, origin_y - (event.y - y) / self.scale)
+        self.redraw()
+
+    def _clamp_origin(self):
+        """Keep the chart on screen: centered along an axis where it fits, otherwise within its edges."""
+        width, height = self._canvas_size()
+        clamped = []
+        for origin, view, size in ((self.origin[0], width / self.scale, self.pyramid.width),
+                                   (self.origin[1], height / self.scale, self.pyramid.height)):
+            clamped.append((size - view) / 2 if view >= size else min(max(origin, 0.0), size - view))
+        self.origin = tuple(clamped)
+
+    def _photo(self, level, col, row, factor):
+        """A tile resized to its on-screen size, decoded only when not cached."""
+        key = (level, col, row, round(factor, 6))
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        tile = self.pyramid.read_tile(level, col, row)
+        left, top = col * self.pyramid.tile_size, row * self.pyramid.tile_size
+        size = (round((left + tile.width) * factor) - round(left * factor),
+                round((top + tile.height) * factor) - round(top * factor))
+        if size != tile.size:
+            tile = tile.resize((max(size[0], 1), max(size[1], 1)),
+                               Image.LANCZOS if factor < 1 else Image.BILINEAR)
+        photo = self._photos[key] = ImageTk.PhotoImage(tile)
+        while len(self._photos) > PHOTO_CACHE_SIZE:
+            self._photos.popitem(last=False)
+        return photo
+
+    def redraw(self):
+        """Place the tiles visible at the current zoom and drop the rest."""
+        if not self.pyramid.ready():
+            self.status.config(text="Preparing zoomable chart...")
+            return
+        width, height = self._canvas_size()
+        if width <= 1:
+            # Not laid out yet; <Configure> redraws once it is.
+            return
+        if self.scale is None or self._fitted:
+            self.scale = self._fit_scale()
+        self._clamp_origin()
+
+        wanted = min(max(int(math.floor(math.log2(1 / self.scale))), 0), self.pyramid.levels - 1)
+        level = self.pyramid.best_level(wanted)
+        # Screen pixels per pixel of the level being drawn.
+        factor = self.scale * 2 ** level
+        # Tile size on screen, and the canvas' top left in screen pixels of the whole level.
+        tile_size = self.pyramid.tile_size
+        step = tile_size * factor
+        cols, rows = self.pyramid.grid(level)
+        offset_x, offset_y = round(self.origin[0] * self.scale), round(self.origin[1] * self.scale)
+        first_col, first_row = max(int(offset_x // step), 0), max(int(offset_y // step), 0)
+        last_col = min(int((offset_x + width) // step), cols - 1)
+        last_row = min(int((offset_y + height) // step), rows - 1)
+
+        visible = set()
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                key = (level, col, row)
+                visible.add(key)
+                photo = self._photo(level, col, row, factor)
+                x, y = round(col * tile_size * factor) - offset_x, round(row * tile_size * factor) - offset_y
+                # The item keeps its PhotoImage alive even after the cache evicts it.
+                item = self._items.get(key)
+                if item is None:
+                    self._items[key] = (self.canvas.create_image(x, y, image=photo, anchor="nw"), photo)
+                else:
+                    self.canvas.coords(item[0], x, y)
+                    self.canvas.itemconfigure(item[0], image=photo)
+                    self._items[key] = (item[0], photo)
+        for key in [key for key in self._items if key not in visible]:
+            self.canvas.delete(self._items.pop(key)[0])
+
+        detail = "" if level == wanted else " (sharpening...)"
+        self.status.config(text=f"{self.scale:.0%}{detail}")
+        self._shown_levels = self.pyramid.complete_levels
+
+    def _poll_build(self):
+        """Redraw when the background build has written a level that was not shown yet."""
+        if not self.winfo_exists():
+            return
+        if self.pyramid.error is not None:
+            self.status.config(text=f"Could not prepare the chart: {self.pyramid.error}")
+            return
+        if self.pyramid.complete_levels != self._shown_levels:
+            self.redraw()
+        if not self.pyramid.complete():
+            self.after(BUILD_POLL_INTERVAL_MS, self._poll_build)
+
+    def destroy(self):
+        self._photos.clear()
+        self._items.clear()
+        super().destroy()